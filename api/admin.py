@@ -42,6 +42,7 @@ lista_modelos = [
     CentroCosto,
     # Actividad
     Actividad,
+    ResumenActividad,
     DatosActividad,
     Proyecto,
     Cliente,
@@ -51,6 +52,7 @@ lista_modelos = [
     # Ticket
     Ticket,
     TicketLog,
+    MetricaTicket,
     Prioridad,
     TipoTicket,
     EtapaTicket,
@@ -59,8 +61,13 @@ lista_modelos = [
     ArchivoTicket,
     Mensaje,
     ArchivoMensaje,
+    ContenidoArchivo,
+    CargaArchivo,
+    MiniaturaPendiente,
     Etiqueta,
     Origen,
+    # Correo
+    CorreoSaliente,
 ]
 
 for modelo in lista_modelos:
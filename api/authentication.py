@@ -0,0 +1,129 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from api.models import Colaborador
+from users.models import CustomUser
+
+# Claims que CustomTokenObtainPairSerializer agrega al token y que permiten autenticar sin consultar el usuario
+STATELESS_CLAIMS = ['email', 'is_verified', 'colaborador_id']
+
+# Clases de autenticación que cargan el usuario completo, para las vistas que lo necesitan (por ejemplo para
+# verificar la contraseña)
+FULL_USER_AUTHENTICATION_CLASSES = [JWTAuthentication, SessionAuthentication]
+
+
+class ClaimsUser(TokenUser):
+    """
+    La clase ClaimsUser es un usuario liviano construido desde los claims de un token ya validado, sin consultar la
+    base de datos. Expone los mismos atributos que usan las vistas sobre :class:`users.models.CustomUser`.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def is_verified(self):
+        return self.token.get('is_verified', False)
+
+    @cached_property
+    def colaborador_id(self):
+        return self.token.get('colaborador_id')
+
+    @cached_property
+    def colaborador(self):
+        """
+        Colaborador del usuario como instancia sin cargar, de la que solo se puede usar el ``id`` sin consultar la
+        base de datos.
+        """
+        if self.colaborador_id is None:
+            raise Colaborador.DoesNotExist
+        return Colaborador(pk=self.colaborador_id, usuario_id=self.id)
+
+    def __str__(self):
+        return self.email
+
+
+class RevocationCache:
+    """
+    La clase RevocationCache mantiene en memoria del proceso, por ``ttl`` segundos, si un usuario sigue activo. Así la
+    revocación (usuario desactivado o eliminado) se aplica a lo más ``ttl`` segundos después, con una consulta por
+    usuario y periodo en lugar de una por solicitud.
+
+    :param ttl: Segundos de validez de cada verificación.
+    :param max_entries: Cantidad máxima de usuarios en memoria antes de vaciar la tabla.
+    """
+
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def is_active(self, user_id):
+        """
+        Función que indica si el usuario sigue activo, consultando la base de datos solo si la verificación guardada
+        expiró.
+
+        :param user_id: Id del usuario.
+        :return: Booleano indicando si el usuario existe y está activo.
+        """
+        ahora = time.monotonic()
+        entrada = self._entries.get(user_id)
+        if entrada is not None and entrada[0] > ahora:
+            return entrada[1]
+
+        activo = CustomUser.objects.filter(pk=user_id, is_active=True).exists()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[user_id] = (ahora + self.ttl, activo)
+        return activo
+
+    def discard(self, user_id):
+        """
+        Función que elimina la verificación guardada de un usuario.
+
+        :param user_id: Id del usuario.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+revocation_cache = RevocationCache(getattr(settings, 'STATELESS_JWT_REVOCATION_TTL', 30))
+
+
+def discard_revocation(sender, instance, **kwargs):
+    """
+    Función receptora de señales de :class:`users.models.CustomUser`, que fuerza una nueva verificación del usuario
+    en este proceso al ser modificado o eliminado.
+    """
+    revocation_cache.discard(instance.pk)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    La clase StatelessJWTAuthentication es una autenticación JWT que confía en los claims firmados del token
+    (ver :data:`STATELESS_CLAIMS`) y retorna un :class:`ClaimsUser` en lugar de cargar el usuario en cada solicitud.
+    Los tokens emitidos antes de agregar los claims se autentican cargando el usuario, como en
+    :class:`JWTAuthentication`.
+
+    Se activa con la variable de entorno ``STATELESS_JWT_AUTH=True``.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in STATELESS_CLAIMS):
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+        if not revocation_cache.is_active(user.id):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,207 @@
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+# Cantidad máxima de elementos por solicitud en lote
+BULK_MAX_ITEMS = 1000
+
+# Señal enviada dentro de la transacción de un lote creado o actualizado (``bulk_create`` y ``bulk_update`` no envían
+# ``post_save``), con ``sender`` el modelo e ``instances`` la lista de objetos escritos
+bulk_saved = Signal()
+
+
+def bulk_item_serializer(serializer_class, partial=False):
+    """
+    Función que instancia el serializador de un elemento del lote, reemplazando sus relaciones
+    (``PrimaryKeyRelatedField``) por enteros para validarlas todas juntas con :func:`check_relations`, en lugar de
+    una consulta por elemento y relación.
+
+    :param serializer_class: Clase del ``ModelSerializer``.
+    :param partial: Indica si los campos requeridos se pueden omitir (actualización parcial).
+    :return: Tupla con el serializador y el diccionario ``source`` → QuerySet de cada relación reemplazada.
+    """
+    serializer = serializer_class(partial=partial)
+    relaciones = {}
+    for nombre, field in list(serializer.fields.items()):
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and not field.read_only:
+            relaciones[field.source] = field.get_queryset()
+            entero = serializers.IntegerField(required=field.required, allow_null=field.allow_null)
+            if field.source != nombre:
+                entero.source = field.source
+            serializer.fields[nombre] = entero
+    return serializer, relaciones
+
+
+def check_relations(items, relaciones, errores):
+    """
+    Función que verifica la existencia de las claves foráneas de todos los elementos con una consulta por relación.
+    Los errores se agregan a ``errores`` con el mensaje de ``PrimaryKeyRelatedField``.
+
+    :param items: Lista de diccionarios validados (``None`` para los elementos con errores).
+    :param relaciones: Diccionario ``source`` → QuerySet de cada relación.
+    :param errores: Lista de diccionarios de errores por elemento.
+    """
+    mensaje = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+    for source, queryset in relaciones.items():
+        ids = {item[source] for item in items if item is not None and item.get(source) is not None}
+        existentes = set(queryset.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+        for item, error in zip(items, errores):
+            if item is not None and item.get(source) is not None and item[source] not in existentes:
+                error.setdefault(source, []).append(mensaje.format(pk_value=item[source]))
+
+
+def validate_bulk(serializer_class, data, partial=False):
+    """
+    Función que valida en una pasada una lista de elementos: primero los campos de cada elemento y luego, en lote,
+    la existencia de las claves foráneas. Si algún elemento tiene errores se levanta :class:`ValidationError` con una
+    lista alineada a la entrada (``{}`` para los elementos válidos), igual que ``ListSerializer``.
+
+    :param serializer_class: Clase del ``ModelSerializer``.
+    :param data: Lista de diccionarios recibida.
+    :param partial: Indica si los campos requeridos se pueden omitir (actualización parcial).
+    :return: Lista de diccionarios validados, con las relaciones como ``<campo>_id``.
+    """
+    if not isinstance(data, list):
+        raise ValidationError({'non_field_errors': [_('Se esperaba una lista de elementos.')]})
+    if not data:
+        raise ValidationError({'non_field_errors': [_('La lista no puede estar vacía.')]})
+    if len(data) > BULK_MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [_('Máximo %d elementos por solicitud.') % BULK_MAX_ITEMS]})
+
+    serializer, relaciones = bulk_item_serializer(serializer_class, partial)
+    items, errores = [], []
+    for elemento in data:
+        try:
+            items.append(serializer.run_validation(elemento))
+            errores.append({})
+        except ValidationError as error:
+            items.append(None)
+            errores.append(error.detail)
+    check_relations(items, relaciones, errores)
+    if any(errores):
+        raise ValidationError(errores)
+
+    model = serializer_class.Meta.model
+    for item in items:
+        for source in relaciones:
+            if source in item:
+                item[model._meta.get_field(source).attname] = item.pop(source)
+    return items
+
+
+def parse_ids(data):
+    """
+    Función que valida la lista de ids de un lote.
+
+    :param data: Lista recibida (de ids, o de diccionarios con ``id``).
+    :return: Lista de ids.
+    """
+    if not isinstance(data, list) or not data:
+        raise ValidationError({'non_field_errors': [_('Se esperaba una lista de elementos.')]})
+    if len(data) > BULK_MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [_('Máximo %d elementos por solicitud.') % BULK_MAX_ITEMS]})
+    field = serializers.IntegerField()
+    ids, errores = [], []
+    for elemento in data:
+        try:
+            ids.append(field.run_validation(elemento.get('id') if isinstance(elemento, dict) else elemento))
+            errores.append({})
+        except ValidationError as error:
+            ids.append(None)
+            errores.append({'id': error.detail})
+    if any(errores):
+        raise ValidationError(errores)
+    if len(set(ids)) != len(ids):
+        raise ValidationError({'non_field_errors': [_('Los ids no se pueden repetir.')]})
+    return ids
+
+
+class BulkMixin:
+    """
+    La clase BulkMixin es un *mixin* para los ViewSets que agrega la ruta ``lote/``, para crear (``POST``), actualizar
+    (``PATCH``, cada elemento con su ``id``) o eliminar (``DELETE``, lista de ids) hasta :data:`BULK_MAX_ITEMS`
+    elementos en una sola solicitud. Los elementos se validan juntos (ver :func:`validate_bulk`) y se escriben en una
+    sola transacción con ``bulk_create``/``bulk_update``; si algún elemento tiene errores no se escribe ninguno y se
+    responde ``400`` con los errores de cada elemento.
+
+    Ejemplo:
+    ::
+        POST /api/actividad/actividades/lote/
+        [{"colaborador": 1, "fecha": "2021-03-01", "hora_inicio": "09:00", "datos_actividad": 1, "proyecto": 1}, ...]
+    """
+
+    def bulk_transaction(self):
+        """
+        Función que retorna el contexto de la transacción de cada lote. Los ViewSets la redefinen para agrupar
+        trabajo que se haría por cada objeto (por ejemplo receptores de ``post_delete``).
+        """
+        return transaction.atomic()
+
+    def bulk_existing(self, ids):
+        """
+        Función que obtiene, en una consulta, los objetos del lote dentro del queryset del ViewSet. Los ids que no
+        existen se informan como error del elemento.
+
+        :param ids: Lista de ids.
+        :return: Diccionario id → objeto.
+        """
+        objetos = self.filter_queryset(self.queryset.all()).in_bulk(ids)
+        errores = [{} if pk in objetos else {'id': [_('No encontrado.')]} for pk in ids]
+        if any(errores):
+            raise ValidationError(errores)
+        return objetos
+
+    def bulk_create(self, request):
+        serializer_class = self.get_serializer_class()
+        items = validate_bulk(serializer_class, request.data)
+        model = serializer_class.Meta.model
+        with self.bulk_transaction():
+            objetos = model.objects.bulk_create([model(**item) for item in items])
+            bulk_saved.send(sender=model, instances=objetos)
+        return Response(serializer_class(objetos, many=True).data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        serializer_class = self.get_serializer_class()
+        ids = parse_ids(request.data)
+        items = validate_bulk(serializer_class, request.data, partial=True)
+        model = serializer_class.Meta.model
+        campos = {campo for item in items for campo in item}
+        # bulk_update no llama a pre_save, por lo que los campos auto_now se actualizan aquí
+        auto_now = [
+            field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)
+        ]
+        ahora = timezone.now()
+        with self.bulk_transaction():
+            objetos = self.bulk_existing(ids)
+            for pk, item in zip(ids, items):
+                for campo, valor in item.items():
+                    setattr(objetos[pk], campo, valor)
+                for field in auto_now:
+                    setattr(objetos[pk], field.attname, ahora)
+            if campos:
+                model.objects.bulk_update(
+                    objetos.values(),
+                    [model._meta.get_field(campo).name for campo in campos] + [field.name for field in auto_now]
+                )
+                bulk_saved.send(sender=model, instances=list(objetos.values()))
+        return Response(serializer_class([objetos[pk] for pk in ids], many=True).data)
+
+    def bulk_destroy(self, request):
+        ids = parse_ids(request.data)
+        with self.bulk_transaction():
+            self.bulk_existing(ids)
+            self.filter_queryset(self.queryset.all()).filter(pk__in=ids).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='lote')
+    def lote(self, request):
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        if request.method == 'PATCH':
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from api import models
+
+# Tablas de consulta (catálogos) pequeñas y de baja frecuencia de cambio, servidas desde memoria
+CATALOG_MODELS = [
+    # Actividad
+    models.DatosActividad,
+    models.Proyecto,
+    models.Cliente,
+    models.TipoSoporte,
+    models.Modulo,
+    # Colaborador
+    models.Sexo,
+    models.EstadoCivil,
+    models.Nacionalidad,
+    models.Comuna,
+    models.Provincia,
+    models.Region,
+    models.Skill,
+    models.NivelSkill,
+    # Contrato
+    models.TipoContrato,
+    models.PrevisionAfp,
+    models.PrevisionSalud,
+    models.Banco,
+    models.TipoCuenta,
+    # Formación
+    models.TipoFormacion,
+    models.Carrera,
+    models.EstadoFormacion,
+    models.Institucion,
+    models.TipoInstitucion,
+    models.TipoOtroFormacion,
+    models.Diploma,
+    # Organización
+    models.Cargo,
+    models.Unidad,
+    models.AreaFuncional,
+    models.NivelResponsabilidad,
+    models.CentroCosto,
+    # Ticket
+    models.Prioridad,
+    models.TipoTicket,
+    models.EtapaTicket,
+    models.AreaTicket,
+    models.DificultadTicket,
+    models.Origen,
+]
+
+
+# Segundos que cada proceso reutiliza la versión de los catálogos antes de volver a leerla de la base de datos
+CATALOG_VERSION_TTL = 5
+
+
+def read_catalog_version():
+    """
+    Función que lee la versión actual de los catálogos de :class:`api.models.VersionCatalogos`, la misma en todos los
+    procesos. Es una consulta por llave primaria.
+
+    :return: Cadena de texto con la versión de los catálogos.
+    """
+    version = models.VersionCatalogos.objects.filter(pk=models.VersionCatalogos.FILA).values_list(
+        'version', flat=True
+    ).first()
+    if version is None:
+        version = models.VersionCatalogos.objects.get_or_create(pk=models.VersionCatalogos.FILA)[0].version
+    return str(version)
+
+
+class CatalogVersion:
+    """
+    La clase CatalogVersion mantiene en memoria del proceso la versión de los catálogos, leyéndola de la base de datos
+    (ver :func:`read_catalog_version`) como máximo una vez cada ``ttl`` segundos. Los cambios de catálogos hechos en
+    el proceso la descartan de inmediato (ver :func:`invalidate_catalogs`); los de otros procesos se ven a más tardar
+    tras ``ttl`` segundos.
+
+    :param ttl: Segundos que se reutiliza la versión leída.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        # Tupla (versión, instante de expiración), reemplazada de una vez para que la lean otros hilos
+        self._vigente = None
+
+    def get(self):
+        ahora = time.monotonic()
+        vigente = self._vigente
+        if vigente is None or ahora >= vigente[1]:
+            vigente = (read_catalog_version(), ahora + self.ttl)
+            self._vigente = vigente
+        return vigente[0]
+
+    def discard(self):
+        self._vigente = None
+
+
+catalog_version = CatalogVersion(CATALOG_VERSION_TTL)
+
+
+def get_catalog_version():
+    """
+    Función que retorna la versión actual de los catálogos (ver :class:`CatalogVersion`). La versión se guarda en la
+    base de datos para que sea la misma en todos los procesos (un cache local de cada proceso no recibiría las
+    invalidaciones de los demás), pero cada proceso la reutiliza por :data:`CATALOG_VERSION_TTL` segundos, por lo que
+    los listados de catálogos no consultan la base de datos.
+
+    :return: Cadena de texto con la versión de los catálogos.
+    """
+    return catalog_version.get()
+
+
+def invalidate_catalogs(**kwargs):
+    """
+    Función receptora de señales que genera una nueva versión de los catálogos, invalidando las copias en memoria de
+    todos los procesos. La versión se actualiza en la misma transacción que el cambio del catálogo, por lo que los
+    demás procesos la ven al confirmarse. La versión en memoria de este proceso se descarta de inmediato y de nuevo al
+    confirmarse, para que otro hilo no conserve la anterior leída mientras tanto.
+    """
+    actualizadas = models.VersionCatalogos.objects.filter(pk=models.VersionCatalogos.FILA).update(
+        version=F('version') + 1, modified=timezone.now()
+    )
+    if not actualizadas:
+        models.VersionCatalogos.objects.get_or_create(pk=models.VersionCatalogos.FILA, defaults={'version': 1})
+    catalog_version.discard()
+    transaction.on_commit(catalog_version.discard)
+
+
+class CatalogSnapshot:
+    """
+    La clase CatalogSnapshot representa una copia serializada de un catálogo para una versión dada.
+
+    :param version: Versión de los catálogos con la que se construyó la copia.
+    :param data: Datos serializados del catálogo.
+    :param digest: Hash del contenido.
+    :param etag: Hash del contenido en formato de la cabecera ``ETag``.
+    """
+
+    def __init__(self, version, data):
+        self.version = version
+        self.data = data
+        contenido = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+        self.digest = hashlib.sha1(contenido.encode()).hexdigest()
+        self.etag = quote_etag(self.digest)
+
+
+class CatalogCache:
+    """
+    La clase CatalogCache mantiene en memoria del proceso las copias serializadas de los catálogos, reconstruyéndolas
+    solo cuando cambia la versión (ver :func:`get_catalog_version`).
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+
+    def get(self, key, build):
+        """
+        Función que retorna la copia vigente del catálogo ``key``.
+
+        :param key: Identificador del catálogo.
+        :param build: Función sin argumentos que retorna los datos serializados del catálogo.
+        :return: Objeto :class:`CatalogSnapshot` vigente.
+        """
+        version = get_catalog_version()
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or snapshot.version != version:
+            snapshot = CatalogSnapshot(version, build())
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def discard(self, key):
+        """
+        Función que descarta la copia del catálogo ``key`` de este proceso, para reconstruirla en el siguiente uso.
+
+        :param key: Identificador del catálogo.
+        """
+        self._snapshots.pop(key, None)
+
+
+catalog_cache = CatalogCache()
+
+
+def snapshot_response(request, etag, data):
+    """
+    Función que construye la respuesta de una copia de catálogo con su cabecera ``ETag``, o una respuesta
+    ``304 Not Modified`` si la cabecera ``If-None-Match`` del cliente coincide.
+
+    :param request: Solicitud actual.
+    :param etag: Valor de la cabecera ``ETag`` de la copia.
+    :param data: Datos de la respuesta.
+    :return: Objeto :class:`Response` de DRF.
+    """
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if '*' in etags or etag in [valor[2:] if valor.startswith('W/') else valor for valor in etags]:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(data, headers=headers)
+
+
+class CatalogCacheMixin:
+    """
+    La clase CatalogCacheMixin es un *mixin* para los ViewSets de catálogos. El listado sin filtros se sirve desde
+    :data:`catalog_cache` sin consultar la base de datos, e incluye la cabecera ``ETag``; si el cliente envía
+    ``If-None-Match`` con el mismo valor, se responde ``304 Not Modified`` sin cuerpo.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if set(request.query_params) - {'format'}:
+            return super().list(request, *args, **kwargs)
+
+        snapshot = catalog_cache.get(
+            self.__class__.__name__,
+            lambda: list(self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data)
+        )
+        return snapshot_response(request, snapshot.etag, snapshot.data)
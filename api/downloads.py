@@ -0,0 +1,258 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q, Subquery, Value
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
+
+from api import models
+from api.storage import content_digest
+from api.ticket_history import user_colaborador_id
+
+# Modos de descarga: FileResponse de Django, X-Accel-Redirect de nginx o X-Sendfile de Apache/lighttpd
+DESCARGA_DJANGO = 'django'
+DESCARGA_NGINX = 'nginx'
+DESCARGA_SENDFILE = 'sendfile'
+
+_rango_re = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def can_view_all_tickets(user):
+    """
+    Función que indica si el usuario puede ver los archivos de todos los tickets: administradores y usuarios con el
+    permiso ``api.view_ticket``.
+    """
+    return user.is_superuser or user.is_staff or user.has_perm('api.view_ticket')
+
+
+def ticket_participation(colaborador_id, ticket_path=None):
+    """
+    Función que construye el filtro de los tickets en los que participa un colaborador: como asignado, solicitante,
+    validador o autor de algún mensaje.
+
+    :param colaborador_id: Id del colaborador.
+    :param ticket_path: Ruta al ticket desde el modelo consultado (por ejemplo ``mensaje__ticket``), o ``None`` si se
+        consulta :class:`api.models.Ticket`.
+    :return: Objeto :class:`Q`.
+    """
+    prefijo = f'{ticket_path}__' if ticket_path else ''
+    mensajes = models.Mensaje.objects.filter(
+        ticket=OuterRef(f'{ticket_path}_id' if ticket_path else 'pk'), autor_id=colaborador_id
+    )
+    return (
+        Q(**{f'{prefijo}asignado_id': colaborador_id}) |
+        Q(**{f'{prefijo}solicitante_id': colaborador_id}) |
+        Q(**{f'{prefijo}validador_id': colaborador_id}) |
+        Q(Exists(mensajes))
+    )
+
+
+def participant_queryset(queryset, user, ticket_path=None):
+    """
+    Función que restringe un QuerySet a los tickets en que participa el colaborador del usuario (ver
+    :func:`ticket_participation`). Los usuarios que pueden ver todos los tickets no se restringen y los usuarios sin
+    colaborador no ven ninguno.
+
+    :param queryset: QuerySet a restringir.
+    :param user: Usuario de la solicitud.
+    :param ticket_path: Ruta al ticket desde el modelo consultado, o ``None`` si se consulta
+        :class:`api.models.Ticket`.
+    :return: QuerySet restringido.
+    """
+    if can_view_all_tickets(user):
+        return queryset
+    colaborador_id = user_colaborador_id(user)
+    if colaborador_id is None:
+        return queryset.none()
+    return queryset.filter(ticket_participation(colaborador_id, ticket_path))
+
+
+def parse_range(valor, tamano):
+    """
+    Función que lee un encabezado ``Range`` de un solo rango de bytes (``bytes=inicio-fin``, ``bytes=inicio-`` o
+    ``bytes=-sufijo``). Los encabezados con varios rangos o inválidos se ignoran y se responde el archivo completo.
+
+    :param valor: Valor del encabezado, o ``None``.
+    :param tamano: Tamaño del archivo, en bytes.
+    :return: Tupla ``(inicio, fin)`` inclusiva, ``None`` sin rango, o ``False`` si el rango no se puede satisfacer.
+    """
+    coincidencia = _rango_re.match((valor or '').replace(' ', ''))
+    if coincidencia is None or coincidencia.group(1) == coincidencia.group(2) == '':
+        return None
+    inicio, fin = coincidencia.groups()
+    if inicio == '':
+        largo = int(fin)
+        if largo == 0:
+            return False
+        return max(tamano - largo, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        return False
+    return inicio, fin
+
+
+class RangeFile:
+    """
+    Archivo abierto limitado a un rango de bytes. La lectura no pasa de ``largo`` bytes, y ``fileno`` expone el
+    descriptor (posicionado al inicio del rango) para que el servidor WSGI envíe el rango con ``sendfile`` sin
+    copiarlo a Python (``wsgi.file_wrapper``, ej. gunicorn, lo limita con ``Content-Length``).
+    """
+
+    def __init__(self, archivo, inicio, largo):
+        self.archivo = archivo
+        self.restante = largo
+        archivo.seek(inicio)
+
+    def read(self, size=-1):
+        if self.restante <= 0:
+            return b''
+        size = self.restante if size is None or size < 0 else min(size, self.restante)
+        datos = self.archivo.read(size)
+        self.restante -= len(datos)
+        return datos
+
+    def fileno(self):
+        return self.archivo.fileno()
+
+    def tell(self):
+        return self.archivo.tell()
+
+    def close(self):
+        self.archivo.close()
+
+
+def file_etag(nombre, stat):
+    """
+    Función que retorna el ETag de un archivo: su SHA-256 para los archivos direccionados por contenido (ver
+    :mod:`api.storage`), o la fecha de modificación y el tamaño para los anteriores.
+    """
+    return quote_etag(content_digest(nombre) or f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+
+
+def attachment_response(request, storage, nombre, filename, disposition='attachment'):
+    """
+    Función que construye la respuesta de descarga de un archivo ya autorizado. Las solicitudes condicionales
+    (``If-None-Match``/``If-Modified-Since``) se responden con ``304`` sin abrir el archivo. Según
+    ``settings.ARCHIVOS_DESCARGA`` la transferencia se delega al proxy (``X-Accel-Redirect`` o ``X-Sendfile``, que
+    resuelven además los rangos) o se responde con :class:`FileResponse`, con soporte de ``Range``/``If-Range``.
+
+    :param request: Solicitud.
+    :param storage: Almacenamiento en disco del archivo.
+    :param nombre: Nombre del archivo en el almacenamiento.
+    :param filename: Nombre sugerido para la descarga.
+    :param disposition: ``attachment`` o ``inline`` (para mostrarlo en el navegador).
+    :return: Objeto :class:`HttpResponse`.
+    """
+    path = storage.path(nombre)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise NotFound()
+    etag = file_etag(nombre, stat)
+    modificado = int(stat.st_mtime)
+    condicional = get_conditional_response(request, etag=etag, last_modified=modificado)
+    if condicional is not None:
+        return condicional
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    modo = getattr(settings, 'ARCHIVOS_DESCARGA', DESCARGA_DJANGO)
+    if modo == DESCARGA_NGINX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(settings.ARCHIVOS_DESCARGA_PREFIJO.rstrip('/') + '/' + nombre)
+    elif modo == DESCARGA_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        rango = parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if rango and if_range and if_range != etag and parse_http_date_safe(if_range) != modificado:
+            rango = None
+        if rango is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        archivo = open(path, 'rb')
+        if rango:
+            inicio, fin = rango
+            response = FileResponse(RangeFile(archivo, inicio, fin - inicio + 1), status=206,
+                                    content_type=content_type)
+            response['Content-Range'] = f'bytes {inicio}-{fin}/{stat.st_size}'
+            response['Content-Length'] = fin - inicio + 1
+        else:
+            response = FileResponse(archivo, content_type=content_type)
+            response['Content-Length'] = stat.st_size
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Disposition'] = "{}; filename*=utf-8''{}".format(disposition, quote(filename))
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modificado)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class AttachmentDownloadMixin:
+    """
+    La clase AttachmentDownloadMixin es un *mixin* para los ViewSets de archivos de tickets y mensajes que agrega la
+    ruta ``<id>/descargar/``. Solo pueden descargar los administradores, los usuarios con el permiso
+    ``api.view_ticket`` y los colaboradores que participan en el ticket (ver :func:`ticket_participation`); la
+    autorización se resuelve en la misma consulta que obtiene el archivo. El listado y todas las acciones de detalle
+    (consulta, modificación y eliminación) se restringen de la misma forma.
+
+    Ejemplo (nginx, con ``ARCHIVOS_DESCARGA=nginx``):
+    ::
+        location /archivos-protegidos/ {
+            internal;
+            alias /ruta/a/MEDIA_ROOT/;
+        }
+    """
+    # Ruta al ticket desde el modelo de archivo
+    download_ticket_path = 'ticket'
+
+    def get_queryset(self):
+        return participant_queryset(super().get_queryset(), self.request.user, self.download_ticket_path)
+
+    def download_filename(self, pk, nombre, tipo=None):
+        # Los nombres direccionados por contenido no tienen extensión: se deduce del tipo de contenido
+        extension = os.path.splitext(nombre)[1] or (tipo and mimetypes.guess_extension(tipo)) or ''
+        return f'{self.basename}_{pk}{extension}'
+
+    def authorized_attachment(self, request, pk):
+        """
+        Función que obtiene el nombre del archivo en el almacenamiento y su tipo de contenido (ver
+        :class:`api.models.ContenidoArchivo`), si el usuario puede verlo.
+
+        :param request: Solicitud.
+        :param pk: Id del archivo.
+        :return: Tupla con el nombre del archivo en el almacenamiento y su tipo de contenido (o ``None``).
+        """
+        archivos = self.queryset.model.objects.filter(pk=pk).annotate(tipo=Subquery(
+            models.ContenidoArchivo.objects.filter(nombre=OuterRef('archivo')).values('tipo')[:1]
+        ))
+        if can_view_all_tickets(request.user):
+            archivos = archivos.annotate(autorizado=Value(True, output_field=BooleanField()))
+        else:
+            colaborador_id = user_colaborador_id(request.user)
+            if colaborador_id is None:
+                raise PermissionDenied()
+            archivos = archivos.annotate(autorizado=ExpressionWrapper(
+                ticket_participation(colaborador_id, self.download_ticket_path), output_field=BooleanField()
+            ))
+        archivo = archivos.values('archivo', 'autorizado', 'tipo').first()
+        if archivo is None:
+            raise NotFound()
+        if not archivo['autorizado']:
+            raise PermissionDenied()
+        return archivo['archivo'], archivo['tipo'] or None
+
+    @action(detail=True, methods=['get'], url_path='descargar')
+    def descargar(self, request, pk=None):
+        nombre, tipo = self.authorized_attachment(request, pk)
+        storage = self.queryset.model._meta.get_field('archivo').storage
+        return attachment_response(request, storage, nombre, self.download_filename(pk, nombre, tipo))
@@ -0,0 +1,246 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_fieldset(valor):
+    """
+    Función que interpreta un parámetro de lista de campos separados por coma (``?fields=id,nombre``).
+
+    :param valor: Valor del parámetro o ``None`` si no se recibió.
+    :return: Conjunto con los nombres de los campos, o ``None`` si no se recibió el parámetro.
+    """
+    if valor is None:
+        return None
+    return {campo.strip() for campo in valor.split(',') if campo.strip()}
+
+
+def declared_lookups(declarados, fields=None):
+    """
+    Función que retorna las relaciones declaradas en ``select_related_fields`` o ``prefetch_related_fields``. Las
+    relaciones se pueden declarar como lista (siempre se usan) o como diccionario campo → lista de relaciones (solo
+    se usan si el campo está en ``fields``).
+
+    :param declarados: Lista o diccionario de relaciones.
+    :param fields: Conjunto de campos solicitados, o ``None`` para todos.
+    :return: Lista de relaciones.
+    """
+    if isinstance(declarados, dict):
+        return [
+            lookup
+            for campo, lookups in declarados.items() if fields is None or campo in fields
+            for lookup in lookups
+        ]
+    return list(declarados)
+
+
+def selected_nested(serializer_class, fields=None, expand=None):
+    """
+    Función que retorna los serializadores anidados de ``serializer_class`` que se deben expandir: los que están en
+    ``fields`` (si se indicó) y en ``expand`` (si se indicó).
+
+    :param serializer_class: Clase del serializador.
+    :param fields: Conjunto de campos solicitados, o ``None`` para todos.
+    :param expand: Conjunto de relaciones a expandir, o ``None`` para todas.
+    :return: Diccionario campo → serializador anidado.
+    """
+    return {
+        campo: serializer_anidado
+        for campo, serializer_anidado in getattr(serializer_class, 'nested_serializers', {}).items()
+        if (fields is None or campo in fields) and (expand is None or campo in expand)
+    }
+
+
+def plan_related(serializer_class, prefix='', fields=None, expand=None):
+    """
+    plan_related es una función que recorre el árbol de serializadores anidados a partir de ``serializer_class`` y
+    construye las listas de relaciones para :meth:`QuerySet.select_related` y :meth:`QuerySet.prefetch_related`.
+
+    Cada serializador declara sus necesidades con los atributos de clase ``nested_serializers`` (campo → serializador
+    anidado), ``select_related_fields`` (relaciones adicionales usadas al serializar) y ``prefetch_related_fields``
+    (cadenas o funciones que reciben el prefijo y retornan un :class:`Prefetch`).
+
+    :param serializer_class: Clase del serializador raíz.
+    :param prefix: Prefijo de la ruta de relaciones para los serializadores anidados.
+    :param fields: Conjunto de campos solicitados del serializador raíz, o ``None`` para todos.
+    :param expand: Conjunto de relaciones a expandir del serializador raíz, o ``None`` para todas.
+    :return: Tupla con la lista de relaciones ``select_related`` y la lista de relaciones ``prefetch_related``.
+    """
+    select_related = [
+        prefix + campo for campo in declared_lookups(getattr(serializer_class, 'select_related_fields', []), fields)
+    ]
+    prefetch_related = []
+    for lookup in declared_lookups(getattr(serializer_class, 'prefetch_related_fields', []), fields):
+        prefetch_related.append(lookup(prefix) if callable(lookup) else prefix + lookup)
+
+    for campo, serializer_anidado in selected_nested(serializer_class, fields, expand).items():
+        select_related.append(prefix + campo)
+        select_anidado, prefetch_anidado = plan_related(serializer_anidado, f'{prefix}{campo}__')
+        select_related += select_anidado
+        prefetch_related += prefetch_anidado
+
+    return select_related, prefetch_related
+
+
+def model_field_name(model, nombre):
+    """
+    Función que retorna el nombre del campo concreto del modelo con nombre ``nombre``, o ``None`` si no existe o no
+    corresponde a una columna de la tabla.
+    """
+    try:
+        campo = model._meta.get_field(nombre)
+    except FieldDoesNotExist:
+        return None
+    return campo.name if campo.concrete and not campo.many_to_many else None
+
+
+def plan_only(serializer_class, fields, extra_fields=()):
+    """
+    plan_only es una función que calcula las columnas del modelo necesarias para serializar solo los campos
+    ``fields``, para usarlas con :meth:`QuerySet.only`. Los campos que no son columnas (por ejemplo propiedades del
+    modelo) deben declarar sus columnas en el atributo ``field_dependencies`` del serializador; si algún campo no se
+    puede resolver se retorna ``None`` y se cargan todas las columnas.
+
+    :param serializer_class: Clase del serializador.
+    :param fields: Conjunto de campos solicitados.
+    :param extra_fields: Campos adicionales del modelo que se deben cargar (por ejemplo el orden de la paginación).
+    :return: Lista de campos para :meth:`QuerySet.only`, o ``None``.
+    """
+    model = serializer_class.Meta.model
+    dependencias = getattr(serializer_class, 'field_dependencies', {})
+    declarados = serializer_class().fields
+    columnas = {model._meta.pk.name}
+    for nombre in fields:
+        if nombre in dependencias:
+            columnas.update(dependencias[nombre])
+            continue
+        if nombre not in declarados:
+            continue
+        source = declarados[nombre].source
+        columna = model_field_name(model, source.split('.')[0]) if source != '*' else None
+        if columna is None:
+            return None
+        columnas.add(columna)
+    for nombre in extra_fields:
+        columna = model_field_name(model, nombre)
+        if columna is not None:
+            columnas.add(columna)
+    return sorted(columnas)
+
+
+def plan_queryset(queryset, serializer_class, fields=None, expand=None, extra_fields=()):
+    """
+    plan_queryset es una función que aplica al ``queryset`` las relaciones obtenidas con :func:`plan_related`, de modo
+    que serializar cualquier cantidad de filas cueste un número constante de consultas. Si se indican ``fields``,
+    además se limitan las columnas consultadas con :func:`plan_only`.
+
+    :param queryset: QuerySet base del modelo del serializador.
+    :param serializer_class: Clase del serializador con el que se representarán las filas.
+    :param fields: Conjunto de campos solicitados, o ``None`` para todos.
+    :param expand: Conjunto de relaciones a expandir, o ``None`` para todas.
+    :param extra_fields: Campos adicionales del modelo que se deben cargar si se limitan las columnas.
+    :return: El QuerySet con ``select_related``, ``prefetch_related`` y ``only`` aplicados.
+    """
+    select_related, prefetch_related = plan_related(serializer_class, fields=fields, expand=expand)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if fields is not None:
+        # Las relaciones de select_related no se pueden diferir
+        only = plan_only(serializer_class, fields, [*extra_fields, *(campo.split('__')[0] for campo in select_related)])
+        if only is not None:
+            queryset = queryset.only(*only)
+    return queryset
+
+
+def restrict_serializer(serializer, fields=None, expand=None):
+    """
+    Función que quita de una instancia de serializador los campos no solicitados y las expansiones no solicitadas
+    (las relaciones no expandidas se representan con su llave primaria).
+
+    :param serializer: Instancia del serializador (el ``child`` en el caso de ``many=True``).
+    :param fields: Conjunto de campos solicitados, o ``None`` para todos.
+    :param expand: Conjunto de relaciones a expandir, o ``None`` para todas.
+    """
+    if fields is not None:
+        for nombre in list(serializer.fields):
+            if nombre not in fields:
+                serializer.fields.pop(nombre)
+    if hasattr(serializer, 'nested_serializers'):
+        serializer.nested_serializers = selected_nested(serializer, fields, expand)
+
+
+class NestedSerializerMixin:
+    """
+    La clase NestedSerializerMixin es un *mixin* para los serializadores que reemplaza en la respuesta cada campo de
+    ``nested_serializers`` por la representación de su serializador anidado (si el valor no es nulo).
+    """
+    nested_serializers = {}
+
+    def to_representation(self, instance):
+        response = super().to_representation(instance)
+        for campo, serializer_class in self.nested_serializers.items():
+            valor = getattr(instance, campo)
+            if valor is not None:
+                response[campo] = serializer_class(valor).data
+        return response
+
+
+class EagerLoadingMixin:
+    """
+    La clase EagerLoadingMixin es un *mixin* para los ViewSets que planifica las consultas de su ``queryset`` a partir
+    del serializador del ViewSet mediante :func:`plan_queryset`.
+
+    En las lecturas acepta además los parámetros ``?fields=`` (campos a incluir en la respuesta; el resto de las
+    columnas no se consulta) y ``?expand=`` (relaciones de ``nested_serializers`` a expandir; el resto se representa
+    con su llave primaria y no se une ni precarga). Sin estos parámetros la respuesta no cambia.
+
+    Ejemplo:
+    ::
+        GET /api/ticket/tickets/?fields=id,asunto,asignado&expand=asignado
+    """
+
+    def get_fieldset(self):
+        """
+        Función que retorna los campos y expansiones solicitados (ver :func:`parse_fieldset`). Solo aplica a lecturas.
+
+        :return: Tupla ``(fields, expand)``.
+        """
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None, None
+        return parse_fieldset(request.query_params.get('fields')), parse_fieldset(request.query_params.get('expand'))
+
+    def get_ordering_fields(self):
+        """
+        Función que retorna los campos usados para ordenar (paginación, orden del ViewSet y parámetro ``ordering``),
+        que se deben consultar aunque no se soliciten.
+
+        :return: Lista de nombres de campos.
+        """
+        ordenes = [getattr(self.paginator, 'ordering', None), getattr(self, 'ordering', None)]
+        if getattr(self, 'request', None) is not None:
+            ordenes.append(self.request.query_params.get('ordering', '').split(','))
+        campos = []
+        for orden in ordenes:
+            for campo in ([orden] if isinstance(orden, str) else orden or []):
+                if campo:
+                    campos.append(campo.lstrip('-').split('__')[0])
+        return campos
+
+    def get_queryset(self):
+        fields, expand = self.get_fieldset()
+        return plan_queryset(
+            super().get_queryset(),
+            self.get_serializer_class(),
+            fields,
+            expand,
+            self.get_ordering_fields() if fields is not None else ()
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields, expand = self.get_fieldset()
+        if fields is not None or expand is not None:
+            restrict_serializer(getattr(serializer, 'child', serializer), fields, expand)
+        return serializer
@@ -0,0 +1,173 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.eager_loading import restrict_serializer
+from api.fast_read import get_fast_read_serializer
+
+# Cantidad de filas leídas por cada viaje al cursor del servidor
+EXPORT_CHUNK_SIZE = 2000
+
+# Formatos de exportación: tipo de contenido y extensión del archivo
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+
+class Echo:
+    """
+    Pseudo-archivo cuyo ``write`` retorna el texto recibido, para que :mod:`csv` genere las líneas sin acumularlas.
+    """
+
+    def write(self, value):
+        return value
+
+
+def chunked(iterable, size):
+    """
+    Función que agrupa un iterable en listas de largo ``size`` (la última puede ser menor).
+
+    :param iterable: Iterable a agrupar.
+    :param size: Largo de cada grupo.
+    :return: Generador de listas.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_rows(queryset, serializer_class, fields=None, expand=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Función que recorre el QuerySet con un cursor del servidor (``.iterator(chunk_size=...)``) y retorna, por cada
+    grupo de ``chunk_size`` filas, su representación. Los serializadores admitidos por
+    :class:`api.fast_read.FastReadSerializer` se construyen a partir de :meth:`QuerySet.values`; el resto se serializa
+    por grupos, aplicando sobre cada grupo la precarga de relaciones del QuerySet (``.iterator()`` la ignora).
+
+    :param queryset: QuerySet filtrado y ordenado, planificado con :func:`api.eager_loading.plan_queryset`.
+    :param serializer_class: Clase del serializador.
+    :param fields: Conjunto de campos solicitados, o ``None`` para todos.
+    :param expand: Conjunto de relaciones a expandir, o ``None`` para todas.
+    :param chunk_size: Cantidad de filas por grupo.
+    :return: Tupla con la lista de llaves de la representación y el generador de listas de diccionarios.
+    """
+    try:
+        fast_serializer = get_fast_read_serializer(serializer_class, fields, expand)
+    except ImproperlyConfigured:
+        fast_serializer = None
+
+    if fast_serializer is not None:
+        keys = [key for key, _column, _converter in fast_serializer.columns]
+        columnas = fast_serializer.value_columns()
+        rows = queryset.select_related(None).prefetch_related(None).values(*columnas).iterator(chunk_size=chunk_size)
+        return keys, (fast_serializer.represent(chunk) for chunk in chunked(rows, chunk_size))
+
+    serializer = serializer_class(many=True)
+    restrict_serializer(serializer.child, fields, expand)
+    keys = [key for key, field in serializer.child.fields.items() if not field.write_only]
+    lookups = queryset._prefetch_related_lookups
+    objetos = queryset.prefetch_related(None).iterator(chunk_size=chunk_size)
+
+    def representar():
+        for chunk in chunked(objetos, chunk_size):
+            if lookups:
+                prefetch_related_objects(chunk, *lookups)
+            yield serializer.to_representation(chunk)
+    return keys, representar()
+
+
+def ndjson_lines(chunks):
+    """
+    Función que genera una línea JSON por elemento (*newline-delimited JSON*).
+
+    :param chunks: Generador de listas de diccionarios.
+    :return: Generador de líneas de texto.
+    """
+    encoder = JSONEncoder(ensure_ascii=False)
+    for chunk in chunks:
+        yield ''.join(f'{encoder.encode(item)}\n' for item in chunk)
+
+
+def csv_value(value):
+    """
+    Función que convierte un valor de la representación en una celda CSV: los objetos y listas (relaciones expandidas
+    o campos JSON) se escriben como JSON y ``None`` como celda vacía.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+    return value
+
+
+def csv_lines(keys, chunks):
+    """
+    Función que genera las líneas CSV, con la fila de encabezado a partir de las llaves de la representación.
+
+    :param keys: Lista de llaves (columnas).
+    :param chunks: Generador de listas de diccionarios.
+    :return: Generador de líneas de texto.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(keys)
+    for chunk in chunks:
+        yield ''.join(writer.writerow([csv_value(item.get(key)) for key in keys]) for item in chunk)
+
+
+class ExportMixin:
+    """
+    La clase ExportMixin es un *mixin* para los ViewSets con :class:`api.eager_loading.EagerLoadingMixin` que agrega
+    la ruta ``exportar/?formato=ndjson|csv``, con todas las filas del listado (mismos filtros y parámetros
+    ``?fields=``/``?expand=``) en una respuesta :class:`StreamingHttpResponse`. Las filas se leen con un cursor del
+    servidor y se escriben por grupos, por lo que la memoria usada no depende de la cantidad de filas.
+
+    Ejemplo:
+    ::
+        GET /api/actividad/actividades/exportar/?formato=csv&fields=id,colaborador,fecha,hora_inicio,hora_termino
+    """
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    def get_export_ordering(self):
+        """
+        Función que retorna el orden estable de la exportación: el de la paginación del ViewSet y la llave primaria.
+
+        :return: Lista de campos de orden.
+        """
+        ordering = getattr(self.paginator, 'ordering', None) or []
+        ordering = [ordering] if isinstance(ordering, str) else list(ordering)
+        if {'id', '-id', 'pk', '-pk'}.intersection(ordering):
+            return ordering
+        return ordering + ['-pk' if ordering and ordering[0].startswith('-') else 'pk']
+
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        formato = request.query_params.get('formato', 'ndjson')
+        if formato not in EXPORT_FORMATS:
+            return Response(
+                {'formato': [_('Formato no soportado, use: %s.') % ', '.join(EXPORT_FORMATS)]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, extension = EXPORT_FORMATS[formato]
+
+        fields, expand = self.get_fieldset()
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*self.get_export_ordering())
+        keys, chunks = export_rows(queryset, self.get_serializer_class(), fields, expand, self.export_chunk_size)
+
+        lines = csv_lines(keys, chunks) if formato == 'csv' else ndjson_lines(chunks)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{self.basename}.{extension}"'
+        return response
@@ -0,0 +1,259 @@
+from functools import lru_cache
+from operator import methodcaller
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api.catalogs import CATALOG_MODELS, catalog_cache
+from api.eager_loading import NestedSerializerMixin, model_field_name, plan_queryset, restrict_serializer
+
+# Campos de DRF cuyo to_representation retorna el mismo valor leído con values() (la llave primaria en el caso de las
+# relaciones), por lo que no es necesario llamarlo
+IDENTITY_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def is_iso_format(field, default_format):
+    """
+    Función que indica si un campo de fecha u hora de DRF se representa con el formato ISO 8601.
+    """
+    formato = getattr(field, 'format', default_format)
+    return isinstance(formato, str) and formato.lower() == ISO_8601
+
+
+class DateTimeConverter:
+    """
+    La clase DateTimeConverter convierte los valores de un ``DateTimeField`` de DRF con formato ISO 8601, igual que su
+    ``to_representation`` para fechas con zona horaria (las que retorna PostgreSQL con ``USE_TZ``). La zona horaria
+    actual se resuelve una vez por listado con :meth:`bind`, en lugar de una vez por valor.
+
+    :param field: Campo del serializador.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self, zona):
+        """
+        Función que retorna el conversor para la zona horaria indicada.
+
+        :param zona: Zona horaria actual.
+        :return: Función de conversión.
+        """
+        field = self.field
+
+        def convertir(valor):
+            if valor.tzinfo is None:
+                return field.to_representation(valor)
+            valor = valor.astimezone(zona).isoformat()
+            return valor[:-6] + 'Z' if valor.endswith('+00:00') else valor
+        return convertir
+
+
+def build_converter(field):
+    """
+    Función que retorna la función que convierte el valor de una columna en su representación según el campo de DRF,
+    o ``None`` si el valor no requiere conversión. Las fechas y horas con formato ISO 8601 usan conversores
+    equivalentes más livianos que ``to_representation``; el resto usa el ``to_representation`` del campo.
+
+    :param field: Campo del serializador.
+    :return: Función de conversión o ``None``.
+    """
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        if settings.USE_TZ and not hasattr(field, 'timezone') and is_iso_format(field, api_settings.DATETIME_FORMAT):
+            return DateTimeConverter(field)
+    elif isinstance(field, serializers.DateField):
+        if is_iso_format(field, api_settings.DATE_FORMAT):
+            return methodcaller('isoformat')
+    elif isinstance(field, serializers.TimeField):
+        if is_iso_format(field, api_settings.TIME_FORMAT):
+            return methodcaller('isoformat')
+    return field.to_representation
+
+
+class FastReadSerializer:
+    """
+    La clase FastReadSerializer genera la misma representación que un ``ModelSerializer`` (incluidos los
+    ``nested_serializers`` de :class:`api.eager_loading.NestedSerializerMixin`), pero a partir de las filas de
+    :meth:`QuerySet.values`, sin instanciar modelos ni recorrer los campos de DRF por fila.
+
+    El mapa columna → llave y la función de conversión de cada campo se calculan una sola vez por serializador. Los
+    serializadores anidados se resuelven una vez por cada id distinto de la página (los catálogos, desde
+    :data:`api.catalogs.catalog_cache`). Solo se admiten serializadores cuyos campos son columnas del modelo y que no
+    redefinen ``to_representation``; en otro caso se levanta :class:`ImproperlyConfigured`.
+
+    :param serializer_class: Clase del ``ModelSerializer``.
+    :param fields: Conjunto de campos solicitados, o ``None`` para todos.
+    :param expand: Conjunto de relaciones a expandir, o ``None`` para todas.
+    """
+
+    def __init__(self, serializer_class, fields=None, expand=None):
+        serializer = serializer_class()
+        if type(serializer).to_representation not in (
+            serializers.Serializer.to_representation,
+            NestedSerializerMixin.to_representation
+        ):
+            raise ImproperlyConfigured(f'{serializer_class.__name__} redefine to_representation.')
+        restrict_serializer(serializer, fields, expand)
+
+        model = serializer.Meta.model
+        nested_serializers = getattr(serializer, 'nested_serializers', {})
+        self.serializer_class = serializer_class
+        self.model = model
+        self.columns = []
+        self.nested = []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            column = model_field_name(model, field.source) if field.source != '*' else None
+            if column is None:
+                raise ImproperlyConfigured(
+                    f'{serializer_class.__name__}.{key} no corresponde a una columna de {model.__name__}.'
+                )
+            converter = build_converter(field)
+            self.columns.append((key, column, converter))
+            if key in nested_serializers:
+                self.nested.append((key, column, nested_serializers[key]))
+
+    def value_columns(self, extra_fields=()):
+        """
+        Función que retorna las columnas para :meth:`QuerySet.values`.
+
+        :param extra_fields: Campos adicionales del modelo (por ejemplo los del orden de la paginación).
+        :return: Lista de nombres de columnas.
+        """
+        columnas = [column for _key, column, _converter in self.columns]
+        for nombre in extra_fields:
+            columna = model_field_name(self.model, nombre)
+            if columna is not None and columna not in columnas:
+                columnas.append(columna)
+        return columnas
+
+    @staticmethod
+    def nested_map(serializer_class, ids):
+        """
+        Función que retorna la representación de los objetos anidados con los ids indicados. Los catálogos se leen de
+        :data:`api.catalogs.catalog_cache`; si la copia no tiene alguno de los ids (por ejemplo un objeto creado
+        después de construirla) esos se consultan y la copia se descarta para reconstruirla en el siguiente uso.
+
+        :param serializer_class: Clase del serializador anidado.
+        :param ids: Conjunto de ids a representar.
+        :return: Diccionario id → representación.
+        """
+        model = serializer_class.Meta.model
+        if model in CATALOG_MODELS:
+            key = f'fast_read:{serializer_class.__name__}'
+            representaciones = catalog_cache.get(
+                key,
+                lambda: {
+                    objeto.pk: serializer_class(objeto).data
+                    for objeto in plan_queryset(model.objects.all(), serializer_class)
+                }
+            ).data
+            faltantes = ids - representaciones.keys()
+            if not faltantes:
+                return representaciones
+            catalog_cache.discard(key)
+            ids = faltantes
+        else:
+            representaciones = {}
+        queryset = plan_queryset(model.objects.filter(pk__in=ids), serializer_class)
+        return {**representaciones, **{objeto.pk: serializer_class(objeto).data for objeto in queryset}}
+
+    def represent(self, rows):
+        """
+        Función que construye la representación de las filas.
+
+        :param rows: Lista de diccionarios obtenidos con :meth:`QuerySet.values` y :meth:`value_columns`.
+        :return: Lista de diccionarios, igual a ``serializer_class(instancias, many=True).data``.
+        """
+        rows = list(rows)
+        zona = timezone.get_current_timezone()
+        columns = [
+            (key, column, converter.bind(zona) if isinstance(converter, DateTimeConverter) else converter)
+            for key, column, converter in self.columns
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for key, column, converter in columns:
+                value = row[column]
+                item[key] = value if converter is None or value is None else converter(value)
+            data.append(item)
+
+        # Los serializadores anidados que comparten clase (por ejemplo asignado y solicitante) se resuelven juntos
+        por_serializador = {}
+        for key, column, serializer_class in self.nested:
+            por_serializador.setdefault(serializer_class, []).append((key, column))
+        for serializer_class, campos in por_serializador.items():
+            ids = {row[column] for row in rows for _key, column in campos} - {None}
+            representaciones = self.nested_map(serializer_class, ids) if ids else {}
+            for item, row in zip(data, rows):
+                for key, column in campos:
+                    if row[column] is not None:
+                        item[key] = representaciones[row[column]]
+        return data
+
+
+# Cantidad máxima de combinaciones de serializador, ``fields`` y ``expand`` construidas por proceso
+FAST_READ_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def declared_fields(serializer_class):
+    """
+    Función que retorna los nombres de los campos y de las relaciones anidadas declarados por un serializador.
+
+    :param serializer_class: Clase del serializador.
+    :return: Tupla con el conjunto de campos y el conjunto de relaciones de ``nested_serializers``.
+    """
+    return frozenset(serializer_class().fields), frozenset(getattr(serializer_class, 'nested_serializers', {}))
+
+
+@lru_cache(maxsize=FAST_READ_CACHE_SIZE)
+def _fast_read_serializer(serializer_class, fields, expand):
+    return FastReadSerializer(serializer_class, fields, expand)
+
+
+def get_fast_read_serializer(serializer_class, fields=None, expand=None):
+    """
+    Función que retorna el :class:`FastReadSerializer` de un serializador, construido una sola vez por proceso para
+    cada combinación de ``fields`` y ``expand``. Los nombres que el serializador no declara se descartan antes de
+    buscarlo (no cambian la respuesta), para que los parámetros del cliente no generen combinaciones sin límite.
+    """
+    campos, anidados = declared_fields(serializer_class)
+    return _fast_read_serializer(
+        serializer_class,
+        campos.intersection(fields) if fields is not None else None,
+        anidados.intersection(expand) if expand is not None else None
+    )
+
+
+class FastReadMixin:
+    """
+    La clase FastReadMixin es un *mixin* para los ViewSets con :class:`api.eager_loading.EagerLoadingMixin` cuyo
+    listado se construye con :class:`FastReadSerializer` a partir de :meth:`QuerySet.values`, con los mismos filtros,
+    orden, paginación y parámetros ``?fields=``/``?expand=``. La respuesta es idéntica a la del serializador del
+    ViewSet (ver ``api/tests.py``).
+    """
+
+    def list(self, request, *args, **kwargs):
+        fields, expand = self.get_fieldset()
+        fast_serializer = get_fast_read_serializer(self.get_serializer_class(), fields, expand)
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        queryset = queryset.values(*fast_serializer.value_columns(self.get_ordering_fields()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.represent(page))
+        return Response(fast_serializer.represent(queryset))
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from api.utils import Utils, get_email_template, preload_email_templates, render_emails
+
+
+class Command(BaseCommand):
+    """
+    Comando que mide el costo por mensaje de renderizar los correos de confirmación, comparando
+    ``render_to_string`` por mensaje contra la plantilla compilada y el renderizado en lote de :mod:`api.utils`.
+    No escribe en la base de datos.
+
+    Ejemplo:
+    ::
+        python manage.py benchmark_correos --cantidad 10000
+    """
+    help = 'Mide el costo por mensaje del renderizado de correos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cantidad', type=int, default=10000, help='Cantidad de mensajes a renderizar.')
+
+    def handle(self, *args, **options):
+        cantidad = options['cantidad']
+        template_name = 'emails/confirm-registration.html'
+        contexts = [
+            {'link_to_confirm': Utils.confirmation_link(f'token-{numero}')} for numero in range(cantidad)
+        ]
+
+        inicio = time.perf_counter()
+        for context in contexts:
+            render_to_string(template_name, context)
+        self.reportar('render_to_string', inicio, cantidad)
+
+        get_email_template.cache_clear()
+        inicio = time.perf_counter()
+        preload_email_templates()
+        render_emails(template_name, contexts)
+        self.reportar('plantilla compilada en lote', inicio, cantidad)
+
+    def reportar(self, nombre, inicio, cantidad):
+        total = time.perf_counter() - inicio
+        self.stdout.write(
+            f'{nombre}: {cantidad} mensajes en {total:.3f} s ({total / max(cantidad, 1) * 1e6:.1f} µs por mensaje)'
+        )
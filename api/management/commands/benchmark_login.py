@@ -0,0 +1,49 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.profiles import profile_cache_key
+from api.serializers import CustomTokenObtainPairSerializer
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Comando que mide la cantidad de consultas y la latencia por llamada del login
+    (:class:`api.serializers.CustomTokenObtainPairSerializer`), con el perfil fuera del cache (primer login) y dentro
+    del cache (logins siguientes). La latencia incluye la verificación de la contraseña.
+
+    Ejemplo:
+    ::
+        python manage.py benchmark_login --email some@email.com --password secret --iteraciones 50
+    """
+    help = 'Mide consultas y latencia por llamada del login.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', required=True, help='Correo de un usuario con colaborador asociado.')
+        parser.add_argument('--password', required=True, help='Contraseña del usuario.')
+        parser.add_argument('--iteraciones', type=int, default=50, help='Cantidad de logins por escenario.')
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.get(email=options['email'])
+        credenciales = {'email': options['email'], 'password': options['password']}
+
+        for nombre, limpiar_cache in [('sin cache', True), ('con cache', False)]:
+            consultas = 0
+            total = 0
+            for _iteracion in range(options['iteraciones']):
+                if limpiar_cache:
+                    cache.delete(profile_cache_key(user.pk))
+                inicio = time.perf_counter()
+                with CaptureQueriesContext(connection) as contexto:
+                    serializer = CustomTokenObtainPairSerializer(data=credenciales)
+                    serializer.is_valid(raise_exception=True)
+                total += time.perf_counter() - inicio
+                consultas += len(contexto.captured_queries)
+            iteraciones = max(options['iteraciones'], 1)
+            self.stdout.write(
+                f'{nombre}: {consultas / iteraciones:.1f} consultas y {total / iteraciones * 1000:.2f} ms por login'
+            )
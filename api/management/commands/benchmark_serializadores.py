@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import serializers
+from api.eager_loading import plan_queryset
+from api.fast_read import get_fast_read_serializer
+
+# Serializadores de los listados con lectura rápida (ver api.fast_read.FastReadMixin)
+SERIALIZADORES = [
+    serializers.TicketSerializer,
+    serializers.ActividadSerializer,
+    serializers.TicketLogSerializer,
+    serializers.MensajeSerializer,
+]
+
+
+class Command(BaseCommand):
+    """
+    Comando que compara el tiempo de serialización por cada 1.000 filas entre el serializador de DRF y
+    :class:`api.fast_read.FastReadSerializer`, usando las filas existentes en la base de datos. Las consultas se
+    ejecutan antes de medir, por lo que solo se compara el trabajo de serialización (incluidos los serializadores
+    anidados).
+
+    Ejemplo:
+    ::
+        python manage.py benchmark_serializadores --filas 1000 --repeticiones 5
+    """
+    help = 'Compara el tiempo de serialización de DRF con la lectura rápida.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1000, help='Cantidad máxima de filas por modelo.')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Cantidad de repeticiones por medición.')
+
+    def handle(self, *args, **options):
+        for serializer_class in SERIALIZADORES:
+            queryset = serializer_class.Meta.model.objects.order_by('-pk')[:options['filas']]
+            instancias = list(plan_queryset(queryset, serializer_class))
+            if not instancias:
+                self.stdout.write(f'{serializer_class.__name__}: sin filas')
+                continue
+            fast_serializer = get_fast_read_serializer(serializer_class)
+            filas = list(queryset.values(*fast_serializer.value_columns()))
+            # Primera llamada fuera de la medición, para cargar los catálogos anidados en memoria
+            fast_serializer.represent(filas)
+
+            drf = self.medir(lambda: serializer_class(instancias, many=True).data, options['repeticiones'])
+            rapido = self.medir(lambda: fast_serializer.represent(filas), options['repeticiones'])
+            por_mil = 1000 / len(instancias)
+            self.stdout.write(
+                f'{serializer_class.__name__} ({len(instancias)} filas): DRF {drf * por_mil * 1000:.1f} ms, '
+                f'rápido {rapido * por_mil * 1000:.1f} ms por 1.000 filas ({drf / rapido:.1f}x)'
+            )
+
+    @staticmethod
+    def medir(funcion, repeticiones):
+        mejor = None
+        for _repeticion in range(max(repeticiones, 1)):
+            inicio = time.perf_counter()
+            funcion()
+            total = time.perf_counter() - inicio
+            mejor = total if mejor is None else min(mejor, total)
+        return mejor
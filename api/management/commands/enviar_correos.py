@@ -0,0 +1,54 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from api.outbox import procesar_correos
+
+
+class Command(BaseCommand):
+    """
+    Comando que envía los correos pendientes de la bandeja de salida (:class:`api.models.CorreoSaliente`). Por
+    defecto procesa los correos pendientes y termina; con ``--loop`` queda como proceso de envío permanente, reusando
+    la conexión SMTP mientras existan correos por enviar.
+
+    Ejemplo:
+    ::
+        python manage.py enviar_correos --loop --interval 5 --batch-size 50
+    """
+    help = 'Envía los correos pendientes de la bandeja de salida.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Mantiene el proceso de envío en ejecución.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Segundos de espera cuando no hay correos pendientes.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Cantidad de correos por lote.')
+        parser.add_argument('--max-intentos', type=int, default=5,
+                            help='Cantidad de intentos antes de marcar un correo como fallido.')
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                try:
+                    enviados, errores = procesar_correos(
+                        connection=connection,
+                        batch_size=options['batch_size'],
+                        max_intentos=options['max_intentos']
+                    )
+                except Exception as error:
+                    self.stderr.write(f'Error al procesar la bandeja de salida: {error}')
+                    connection.close()
+                    enviados = errores = 0
+                    if not options['loop']:
+                        raise
+                if enviados or errores:
+                    self.stdout.write(f'Correos enviados: {enviados}, con error: {errores}')
+                    continue
+                if not options['loop']:
+                    break
+                # Sin correos pendientes se libera la conexión SMTP hasta el próximo lote
+                connection.close()
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from api.thumbnails import MINIATURA_MAX_INTENTOS, process_thumbnails
+
+
+class Command(BaseCommand):
+    """
+    Comando que genera las miniaturas pendientes de las imágenes de mensajes (:class:`api.models.MiniaturaPendiente`)
+    con un grupo de procesos, fuera del ciclo de la solicitud. Por defecto procesa la cola y termina; con ``--loop``
+    queda como proceso permanente.
+
+    Ejemplo:
+    ::
+        python manage.py generar_miniaturas --loop --workers 4 --batch-size 20
+    """
+    help = 'Genera las miniaturas pendientes de las imágenes de mensajes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Mantiene el proceso en ejecución.')
+        parser.add_argument('--interval', type=float, default=2,
+                            help='Segundos de espera cuando no hay miniaturas pendientes.')
+        parser.add_argument('--workers', type=int, default=2, help='Cantidad de procesos que generan miniaturas.')
+        parser.add_argument('--batch-size', type=int, default=20, help='Cantidad de imágenes por lote.')
+        parser.add_argument('--max-intentos', type=int, default=MINIATURA_MAX_INTENTOS,
+                            help='Cantidad de intentos antes de descartar una imagen.')
+
+    def handle(self, *args, **options):
+        executor = ProcessPoolExecutor(max_workers=options['workers'])
+        try:
+            while True:
+                try:
+                    generadas, errores = process_thumbnails(
+                        executor=executor,
+                        batch_size=options['batch_size'],
+                        max_intentos=options['max_intentos']
+                    )
+                except BrokenProcessPool as error:
+                    # Un proceso terminó abruptamente (por ejemplo sin memoria): se reemplaza el grupo
+                    self.stderr.write(f'Error en el grupo de procesos: {error}')
+                    executor.shutdown(wait=False)
+                    executor = ProcessPoolExecutor(max_workers=options['workers'])
+                    generadas = errores = 0
+                    if not options['loop']:
+                        raise
+                if generadas or errores:
+                    self.stdout.write(f'Miniaturas generadas: {generadas}, con error: {errores}')
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            executor.shutdown()
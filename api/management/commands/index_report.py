@@ -0,0 +1,128 @@
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api import models
+from api.models.ticket import ETAPA_TICKET_FINALIZADA
+
+INDICES_SIN_USO_SQL = '''
+    SELECT s.relname, s.indexrelname, s.idx_scan, pg_relation_size(s.indexrelid)
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = current_schema()
+      AND s.idx_scan <= %s
+      AND NOT i.indisunique
+      AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+'''
+
+LECTURAS_SECUENCIALES_SQL = '''
+    SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup
+    FROM pg_stat_user_tables
+    WHERE schemaname = current_schema()
+      AND seq_scan >= %s
+      AND seq_scan > COALESCE(idx_scan, 0)
+      AND n_live_tup >= %s
+    ORDER BY seq_tup_read DESC
+'''
+
+INDICES_EXISTENTES_SQL = '''
+    SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()
+'''
+
+PREDICADOS_SQL = '''
+    SELECT c.relname, pg_get_expr(i.indpred, i.indrelid)
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+      AND c.relname = ANY(%s)
+'''
+
+# Ids de etapa en el predicado de un índice parcial de tickets (por ejemplo "(etapa_ticket_id <> 4)")
+_etapa_re = re.compile(r'etapa_ticket_id\s*(?:<>|!=|=)\s*(\d+)')
+
+
+class Command(BaseCommand):
+    """
+    Comando que revisa las estadísticas de PostgreSQL (``pg_stat_user_indexes`` y ``pg_stat_user_tables``) y reporta
+    los índices sin uso, los índices declarados en los modelos que no existen en la base de datos, los índices
+    parciales de tickets abiertos cuyo predicado no coincide con ``ETAPA_TICKET_FINALIZADA`` y las tablas que se leen
+    principalmente de forma secuencial (candidatas a un índice faltante).
+
+    Ejemplo:
+    ::
+        python manage.py index_report --max-scans 0 --min-seq-scans 100
+    """
+    help = 'Reporta índices sin uso o faltantes a partir de las estadísticas de PostgreSQL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-scans', type=int, default=0,
+                            help='Cantidad máxima de lecturas para considerar un índice sin uso.')
+        parser.add_argument('--min-seq-scans', type=int, default=100,
+                            help='Cantidad mínima de lecturas secuenciales para reportar una tabla.')
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help='Cantidad mínima de filas para reportar una tabla con lecturas secuenciales.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write('Este comando solo está disponible para PostgreSQL.')
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(INDICES_SIN_USO_SQL, [options['max_scans']])
+            sin_uso = cursor.fetchall()
+            cursor.execute(LECTURAS_SECUENCIALES_SQL, [options['min_seq_scans'], options['min_rows']])
+            secuenciales = cursor.fetchall()
+            cursor.execute(INDICES_EXISTENTES_SQL)
+            existentes = {fila[0] for fila in cursor.fetchall()}
+            parciales = [indice.name for indice in models.Ticket._meta.indexes if indice.condition is not None]
+            cursor.execute(PREDICADOS_SQL, [parciales])
+            predicados = cursor.fetchall()
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Índices sin uso:'))
+        for tabla, indice, lecturas, peso in sin_uso:
+            self.stdout.write(f'  {tabla}.{indice}: {lecturas} lecturas, {peso // 1024} KB')
+        if not sin_uso:
+            self.stdout.write('  (ninguno)')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Índices declarados que no existen en la base de datos:'))
+        faltantes = [
+            (modelo._meta.db_table, indice.name)
+            for modelo in apps.get_models()
+            for indice in modelo._meta.indexes
+            if indice.name not in existentes
+        ]
+        for tabla, indice in faltantes:
+            self.stdout.write(self.style.WARNING(f'  {tabla}.{indice} (revisar migraciones pendientes)'))
+        if not faltantes:
+            self.stdout.write('  (ninguno)')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Índices parciales de tickets que no excluyen la etapa final ({ETAPA_TICKET_FINALIZADA}):'
+        ))
+        distintos = [
+            (indice, predicado) for indice, predicado in predicados
+            if {int(etapa) for etapa in _etapa_re.findall(predicado or '')} != {ETAPA_TICKET_FINALIZADA}
+        ]
+        for indice, predicado in distintos:
+            self.stdout.write(self.style.WARNING(
+                f'  {indice}: WHERE {predicado} (generar una migración que reemplace el índice)'
+            ))
+        if not models.EtapaTicket.objects.filter(pk=ETAPA_TICKET_FINALIZADA).exists():
+            self.stdout.write(self.style.WARNING(
+                f'  La etapa {ETAPA_TICKET_FINALIZADA} no existe (revisar ETAPA_TICKET_FINALIZADA y los datos iniciales)'
+            ))
+        elif not distintos:
+            self.stdout.write('  (ninguno)')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Tablas con lecturas principalmente secuenciales:'))
+        for tabla, lecturas_seq, filas_leidas, lecturas_idx, filas in secuenciales:
+            self.stdout.write(
+                f'  {tabla}: {lecturas_seq} lecturas secuenciales ({filas_leidas} filas leídas) contra '
+                f'{lecturas_idx} por índice, {filas} filas vivas'
+            )
+        if not secuenciales:
+            self.stdout.write('  (ninguna)')
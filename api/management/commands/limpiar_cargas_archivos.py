@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.uploads import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    """
+    Comando que elimina las cargas por partes de archivos (:class:`api.models.CargaArchivo`) abandonadas, es decir,
+    sin partes recibidas durante :data:`api.uploads.CARGA_EXPIRACION`, junto con sus archivos temporales. Se puede
+    programar periódicamente (por ejemplo con cron).
+
+    Ejemplo:
+    ::
+        python manage.py limpiar_cargas_archivos
+    """
+    help = 'Elimina las cargas por partes de archivos abandonadas.'
+
+    def handle(self, *args, **options):
+        eliminadas = purge_expired_uploads()
+        self.stdout.write(f'Cargas eliminadas: {eliminadas}')
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.storage import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    """
+    Comando que elimina del almacenamiento direccionado por contenido (:class:`api.storage.ContentAddressedStorage`)
+    los archivos sin referencias de :class:`api.models.ArchivoTicket` ni :class:`api.models.ArchivoMensaje`. Con
+    ``--recontar`` primero recalcula las referencias desde los archivos de tickets y mensajes.
+
+    Ejemplo:
+    ::
+        python manage.py recolectar_archivos --horas 24 --recontar
+    """
+    help = 'Elimina los archivos de tickets y mensajes sin referencias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=int, default=24,
+                            help='Horas que un archivo debe estar sin referencias antes de eliminarse.')
+        parser.add_argument('--recontar', action='store_true',
+                            help='Recalcula las referencias antes de eliminar.')
+
+    def handle(self, *args, **options):
+        if options['recontar']:
+            contenidos = recount_references()
+            self.stdout.write(f'Contenidos referenciados: {contenidos}')
+        eliminados, liberados = collect_garbage(timedelta(hours=options['horas']))
+        self.stdout.write(f'Archivos eliminados: {eliminados} ({liberados} bytes)')
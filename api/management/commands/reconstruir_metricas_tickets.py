@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.ticket_metrics import rebuild_ticket_metrics
+
+
+class Command(BaseCommand):
+    """
+    Comando que reconstruye las métricas de tickets (:class:`api.models.MetricaTicket`) desde el historial completo
+    de :class:`api.models.TicketLog`. Las métricas se mantienen al registrar cada cambio de etapa, por lo que este
+    comando solo es necesario para cargas masivas de historial o tras corregir datos con SQL.
+
+    Ejemplo:
+    ::
+        python manage.py reconstruir_metricas_tickets
+    """
+    help = 'Reconstruye las métricas de tickets desde el historial.'
+
+    def handle(self, *args, **options):
+        filas = rebuild_ticket_metrics()
+        self.stdout.write(f'Filas de métricas: {filas}')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.models import ResumenActividad
+from api.timesheets import rebuild_resumen
+
+
+class Command(BaseCommand):
+    """
+    Comando que reconstruye la tabla de resumen de actividades (:class:`api.models.ResumenActividad`) desde todas las
+    actividades. El resumen se mantiene solo al guardar o eliminar actividades, por lo que este comando solo es
+    necesario tras escrituras que no envían señales (por ejemplo ``QuerySet.update`` o cargas con SQL).
+
+    Ejemplo:
+    ::
+        python manage.py reconstruir_resumen_actividades
+    """
+    help = 'Reconstruye la tabla de resumen de actividades.'
+
+    def handle(self, *args, **options):
+        rebuild_resumen()
+        self.stdout.write(f'Filas de resumen: {ResumenActividad.objects.count()}')
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.utils import Utils, preload_email_templates
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Comando que registra en la bandeja de salida un nuevo correo de confirmación para todos los usuarios que aún no
+    verifican su correo electrónico. Los correos se renderizan y guardan en lotes; el envío lo realiza el comando
+    ``enviar_correos``.
+
+    Ejemplo:
+    ::
+        python manage.py reenviar_verificacion --batch-size 500
+    """
+    help = 'Reenvía el correo de confirmación a los usuarios no verificados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Cantidad de correos por lote.')
+        parser.add_argument('--secure', action='store_true', help='Genera los links de confirmación con https.')
+
+    def handle(self, *args, **options):
+        preload_email_templates()
+        total = 0
+        lote = []
+        usuarios = CustomUser.objects.filter(is_verified=False).order_by('pk')
+        for user in usuarios.iterator(chunk_size=options['batch_size']):
+            lote.append((user.email, str(RefreshToken.for_user(user))))
+            if len(lote) >= options['batch_size']:
+                total += len(Utils.validate_email_registration_batch(lote, options['secure']))
+                lote = []
+        if lote:
+            total += len(Utils.validate_email_registration_batch(lote, options['secure']))
+        self.stdout.write(f'Correos de confirmación registrados: {total}')
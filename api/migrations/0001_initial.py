@@ -0,0 +1,745 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:05
+
+import api.models.ticket
+import api.validators
+import datetime
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Actividad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='fecha')),
+                ('hora_inicio', models.TimeField(verbose_name='hora de inicio')),
+                ('hora_termino', models.TimeField(blank=True, null=True, verbose_name='hora de término')),
+                ('observaciones', models.TextField(blank=True, null=True, verbose_name='observaciones')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modificado')),
+            ],
+            options={
+                'verbose_name': 'actividad',
+                'verbose_name_plural': 'actividades',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivoMensaje',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.ImageField(upload_to=api.models.ticket.get_file_message_path, verbose_name='archivo')),
+            ],
+            options={
+                'verbose_name': 'archivo del mensaje',
+                'verbose_name_plural': 'archivos de los mensajes',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivoTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.FileField(upload_to=api.models.ticket.get_file_ticket_path, verbose_name='archivo')),
+            ],
+            options={
+                'verbose_name': 'archivo del ticket',
+                'verbose_name_plural': 'archivos de los tickets',
+            },
+        ),
+        migrations.CreateModel(
+            name='AreaFuncional',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'área funcional',
+                'verbose_name_plural': 'áreas funcionales',
+            },
+        ),
+        migrations.CreateModel(
+            name='AreaTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'área del ticket',
+                'verbose_name_plural': 'áreas de los tickets',
+            },
+        ),
+        migrations.CreateModel(
+            name='Banco',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'banco',
+                'verbose_name_plural': 'bancos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Cargo',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'cargo',
+                'verbose_name_plural': 'cargos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Carrera',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'carrera',
+                'verbose_name_plural': 'carreras',
+            },
+        ),
+        migrations.CreateModel(
+            name='CentroCosto',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'centro de costo',
+                'verbose_name_plural': 'centros de costos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Cliente',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'cliente',
+                'verbose_name_plural': 'clientes',
+            },
+        ),
+        migrations.CreateModel(
+            name='Colaborador',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run', models.CharField(max_length=11, unique=True, validators=[api.validators.validate_run], verbose_name='RUN')),
+                ('nombre', models.CharField(max_length=50, verbose_name='nombre')),
+                ('segundo_nombre', models.CharField(blank=True, max_length=50, null=True, verbose_name='segundo nombre')),
+                ('apellido_paterno', models.CharField(max_length=50, verbose_name='apellido paterno')),
+                ('apellido_materno', models.CharField(max_length=50, verbose_name='apellido materno')),
+                ('fecha_nacimiento', models.DateField(verbose_name='fecha de nacimiento')),
+                ('fecha_defuncion', models.DateField(blank=True, null=True, verbose_name='fecha de defunción')),
+                ('direccion', models.CharField(blank=True, max_length=200, null=True, verbose_name='dirección')),
+                ('telefono_fijo', models.CharField(blank=True, max_length=20, null=True, verbose_name='teléfono fijo')),
+                ('telefono_movil', models.CharField(blank=True, max_length=20, null=True, verbose_name='teléfono móvil')),
+                ('correo_personal', models.EmailField(default='', max_length=254, verbose_name='correo personal')),
+                ('fecha_ingreso', models.DateField(verbose_name='fecha de ingreso')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modificado')),
+            ],
+            options={
+                'verbose_name': 'colaborador',
+                'verbose_name_plural': 'colaboradores',
+            },
+        ),
+        migrations.CreateModel(
+            name='DatosContractuales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_inicio', models.DateField(verbose_name='fecha de inicio')),
+                ('fecha_termino', models.DateField(blank=True, null=True, verbose_name='fecha de termino')),
+                ('sueldo_base', models.PositiveIntegerField(blank=True, null=True, verbose_name='sueldo base')),
+                ('fecha_vencimiento', models.DateField(blank=True, null=True, verbose_name='fecha de vencimiento')),
+                ('numero_cuenta', models.CharField(blank=True, max_length=20, null=True, verbose_name='número de cuenta')),
+                ('banco', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.banco')),
+                ('colaborador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contrato', to='api.colaborador')),
+            ],
+            options={
+                'verbose_name': 'datos contractuales',
+                'verbose_name_plural': 'datos contractuales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DificultadTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=50, verbose_name='tipo')),
+                ('nivel', models.CharField(blank=True, max_length=50, null=True, verbose_name='nivel')),
+                ('rev_min', models.FloatField(blank=True, null=True, verbose_name='tiempo mínimo de revisión')),
+                ('rev_max', models.FloatField(blank=True, null=True, verbose_name='tiempo máximo de revisión')),
+                ('dev_min', models.FloatField(blank=True, null=True, verbose_name='tiempo mínimo de desarrollo')),
+                ('dev_max', models.FloatField(blank=True, null=True, verbose_name='tiempo máximo de desarrollo')),
+                ('area_ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.areaticket', verbose_name='área del ticket')),
+            ],
+            options={
+                'verbose_name': 'dificultad de ticket',
+                'verbose_name_plural': 'dificultades de los tickets',
+            },
+        ),
+        migrations.CreateModel(
+            name='Diploma',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'diploma',
+                'verbose_name_plural': 'diplomas',
+            },
+        ),
+        migrations.CreateModel(
+            name='EstadoCivil',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'estado civil',
+                'verbose_name_plural': 'estados civiles',
+            },
+        ),
+        migrations.CreateModel(
+            name='EstadoFormacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'estado de formación',
+                'verbose_name_plural': 'estados de formación',
+            },
+        ),
+        migrations.CreateModel(
+            name='EtapaTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'etapa del ticket',
+                'verbose_name_plural': 'etapa de los tickets',
+            },
+        ),
+        migrations.CreateModel(
+            name='Institucion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'institución',
+                'verbose_name_plural': 'instituciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='Modulo',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'módulo',
+                'verbose_name_plural': 'modulos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Nacionalidad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'nacionalidad',
+                'verbose_name_plural': 'nacionalidades',
+            },
+        ),
+        migrations.CreateModel(
+            name='NivelResponsabilidad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'nivel de responsabilidad',
+                'verbose_name_plural': 'niveles de responsabilidad',
+            },
+        ),
+        migrations.CreateModel(
+            name='NivelSkill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'nivel de skill',
+                'verbose_name_plural': 'niveles de skills',
+            },
+        ),
+        migrations.CreateModel(
+            name='Origen',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'origen',
+                'verbose_name_plural': 'orígenes',
+            },
+        ),
+        migrations.CreateModel(
+            name='PrevisionAfp',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'previsión de AFP',
+                'verbose_name_plural': 'previsiones de AFP',
+            },
+        ),
+        migrations.CreateModel(
+            name='PrevisionSalud',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'previsión de salud',
+                'verbose_name_plural': 'previsiones de salud',
+            },
+        ),
+        migrations.CreateModel(
+            name='Prioridad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+                ('valor', models.SmallIntegerField(unique=True, verbose_name='valor')),
+            ],
+            options={
+                'verbose_name': 'prioridad',
+                'verbose_name_plural': 'prioridades',
+            },
+        ),
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=5, unique=True, verbose_name='código')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'región',
+                'verbose_name_plural': 'regiones',
+            },
+        ),
+        migrations.CreateModel(
+            name='Sexo',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'sexo',
+                'verbose_name_plural': 'sexos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ticket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(blank=True, max_length=10, null=True, verbose_name='versión')),
+                ('fecha_limite', models.DateField(blank=True, null=True, verbose_name='fecha límite')),
+                ('ruta', models.URLField(blank=True, null=True)),
+                ('asunto', models.CharField(max_length=100)),
+                ('descripcion', models.TextField(verbose_name='descripción')),
+                ('fecha_solicitud', models.DateTimeField(default=datetime.datetime.now, verbose_name='fecha de solicitud')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modificado')),
+                ('asignado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_asignado', to='api.colaborador')),
+                ('dificultad_ticket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.dificultadticket', verbose_name='dificultad del ticket')),
+                ('etapa_ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.etapaticket', verbose_name='etapa del ticket')),
+                ('modulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.modulo', verbose_name='módulo')),
+                ('origen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.origen')),
+                ('prioridad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.prioridad')),
+                ('solicitante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_solicitante', to='api.colaborador')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TipoContrato',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo de contrato',
+                'verbose_name_plural': 'tipos de contrato',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoCuenta',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo de cuenta',
+                'verbose_name_plural': 'tipos de cuenta',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoFormacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo de formación',
+                'verbose_name_plural': 'tipos de formación',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoInstitucion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo de institución',
+                'verbose_name_plural': 'tipos de instituciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoOtroFormacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo otro de formación',
+                'verbose_name_plural': 'tipos otros de formación',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoSoporte',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo de soporte',
+                'verbose_name_plural': 'tipos de soportes',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, verbose_name='nombre')),
+            ],
+            options={
+                'verbose_name': 'tipo de ticket',
+                'verbose_name_plural': 'tipos de ticket',
+            },
+        ),
+        migrations.CreateModel(
+            name='Unidad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, verbose_name='nombre')),
+                ('area_funcional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.areafuncional', verbose_name='área funcional')),
+            ],
+            options={
+                'verbose_name': 'unidad',
+                'verbose_name_plural': 'unidades',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('historial', models.JSONField(default=dict, verbose_name='historial')),
+                ('observaciones', models.TextField(blank=True, null=True, verbose_name='observaciones')),
+                ('fecha_modificacion', models.DateTimeField(auto_now_add=True, verbose_name='fecha de modificación')),
+                ('responsable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.ticket')),
+            ],
+            options={
+                'verbose_name': 'historial del ticket',
+                'verbose_name_plural': 'historiales de los tickets',
+            },
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='tipo_ticket',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tipoticket', verbose_name='tipo de ticket'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='validador',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ticket_validador', to='api.colaborador'),
+        ),
+        migrations.CreateModel(
+            name='Proyecto',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, verbose_name='nombre')),
+                ('repositorio', models.URLField(blank=True, null=True, verbose_name='repositorio')),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.cliente')),
+            ],
+            options={
+                'verbose_name': 'proyecto',
+                'verbose_name_plural': 'proyectos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Provincia',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=5, unique=True, verbose_name='código')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.region', verbose_name='región')),
+            ],
+            options={
+                'verbose_name': 'provincia',
+                'verbose_name_plural': 'provincias',
+            },
+        ),
+        migrations.CreateModel(
+            name='PersonaContacto',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombres', models.CharField(max_length=100, verbose_name='nombres')),
+                ('apellido_paterno', models.CharField(max_length=100, verbose_name='apellido paterno')),
+                ('apellido_materno', models.CharField(blank=True, max_length=100, null=True, verbose_name='apellido materno')),
+                ('telefono', models.CharField(max_length=20, verbose_name='teléfono')),
+                ('colaborador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+            ],
+            options={
+                'verbose_name': 'persona de contacto',
+                'verbose_name_plural': 'personas de contacto',
+            },
+        ),
+        migrations.CreateModel(
+            name='OtroFormacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horas', models.DecimalField(decimal_places=1, max_digits=6, validators=[django.core.validators.MinValueValidator(0.0)], verbose_name='horas')),
+                ('colaborador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+                ('diploma', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.diploma')),
+                ('institucion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.institucion', verbose_name='institución')),
+                ('tipo_otro_formacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tipootroformacion', verbose_name='tipo otro de formación')),
+            ],
+            options={
+                'verbose_name': 'datos de formación otros',
+                'verbose_name_plural': 'datos de formaciones otros',
+            },
+        ),
+        migrations.AddField(
+            model_name='modulo',
+            name='proyecto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.proyecto'),
+        ),
+        migrations.CreateModel(
+            name='MesaAyuda',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('funcionario', models.CharField(max_length=200, verbose_name='funcionario')),
+                ('telefono', models.CharField(blank=True, max_length=20, null=True, verbose_name='teléfono')),
+                ('correo_electronico', models.EmailField(blank=True, max_length=254, null=True, verbose_name='correo electrónico')),
+                ('is_habil', models.BooleanField(verbose_name='horario hábil')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modificado')),
+                ('actividad', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='api.actividad')),
+                ('modulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.modulo', verbose_name='módulo')),
+                ('tipo_soporte', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tiposoporte')),
+            ],
+            options={
+                'verbose_name': 'atención de mesa de ayuda',
+                'verbose_name_plural': 'atenciones de mesa de ayuda',
+            },
+        ),
+        migrations.CreateModel(
+            name='Mensaje',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=100, verbose_name='asunto')),
+                ('descripcion', models.TextField(verbose_name='descripción')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modified')),
+                ('autor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.ticket')),
+            ],
+            options={
+                'verbose_name': 'mensaje',
+                'verbose_name_plural': 'mensajes',
+            },
+        ),
+        migrations.AddField(
+            model_name='institucion',
+            name='tipo_institucion',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tipoinstitucion', verbose_name='tipo de institución'),
+        ),
+        migrations.CreateModel(
+            name='Hijo',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombres', models.CharField(max_length=100, verbose_name='nombres')),
+                ('apellido_paterno', models.CharField(max_length=100, verbose_name='apellido paterno')),
+                ('apellido_materno', models.CharField(blank=True, max_length=100, verbose_name='apellido materno')),
+                ('run', models.CharField(blank=True, max_length=11, null=True, unique=True, validators=[api.validators.validate_run], verbose_name='RUN')),
+                ('fecha_nacimiento', models.DateField(verbose_name='fecha de nacimiento')),
+                ('colaborador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+            ],
+            options={
+                'verbose_name': 'hijo',
+                'verbose_name_plural': 'hijos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Etiqueta',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+                ('nivel_severidad', models.CharField(choices=[('info', 'Informativo'), ('success', 'Positivo'), ('warning', 'Precaución'), ('danger', 'Peligro')], default='info', max_length=50, verbose_name='nivel_severidad')),
+                ('mensajes', models.ManyToManyField(blank=True, to='api.Mensaje')),
+                ('tickets', models.ManyToManyField(blank=True, to='api.Ticket')),
+            ],
+            options={
+                'verbose_name': 'etiqueta',
+                'verbose_name_plural': 'etiquetas',
+            },
+        ),
+        migrations.CreateModel(
+            name='DatosOrganizacionales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cargo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.cargo')),
+                ('centro_costo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.centrocosto', verbose_name='centro de costo')),
+                ('datos_contractuales', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='organizacion', to='api.datoscontractuales')),
+                ('jefe_directo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='datos_subordinado', to='api.colaborador')),
+                ('nivel_responsabilidad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.nivelresponsabilidad', verbose_name='nivel de responsabilidad')),
+                ('unidad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.unidad')),
+            ],
+            options={
+                'verbose_name': 'datos organizacionales',
+                'verbose_name_plural': 'datos organizacionales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DatosFormacion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_termino', models.DateField(verbose_name='fecha de término')),
+                ('carrera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.carrera')),
+                ('colaborador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+                ('estado_formacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.estadoformacion', verbose_name='estado de formación')),
+                ('institucion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.institucion', verbose_name='institución')),
+                ('tipo_formacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tipoformacion', verbose_name='tipo de formación')),
+            ],
+            options={
+                'verbose_name': 'datos de formación',
+                'verbose_name_plural': 'datos de formaciones',
+            },
+        ),
+        migrations.AddField(
+            model_name='datoscontractuales',
+            name='prevision_afp',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.previsionafp', verbose_name='previsión de AFP'),
+        ),
+        migrations.AddField(
+            model_name='datoscontractuales',
+            name='prevision_salud',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.previsionsalud', verbose_name='previsión de salud'),
+        ),
+        migrations.AddField(
+            model_name='datoscontractuales',
+            name='tipo_contrato',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tipocontrato', verbose_name='tipo de contrato'),
+        ),
+        migrations.AddField(
+            model_name='datoscontractuales',
+            name='tipo_cuenta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.tipocuenta', verbose_name='tipo de cuenta'),
+        ),
+        migrations.CreateModel(
+            name='DatosActividad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+                ('descripcion', models.TextField(blank=True, null=True, verbose_name='descripcion')),
+                ('tiempo_maximo', models.SmallIntegerField(blank=True, null=True, verbose_name='tiempo_maximo')),
+                ('tiempo_minimo', models.SmallIntegerField(blank=True, null=True, verbose_name='tiempo_minimo')),
+                ('cargo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.cargo')),
+            ],
+            options={
+                'verbose_name': 'datos de actividad',
+                'verbose_name_plural': 'datos de actividades',
+            },
+        ),
+        migrations.CreateModel(
+            name='Comuna',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=5, unique=True, verbose_name='código')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+                ('provincia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.provincia')),
+            ],
+            options={
+                'verbose_name': 'comuna',
+                'verbose_name_plural': 'comunas',
+            },
+        ),
+        migrations.CreateModel(
+            name='ColaboradorSkill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('colaborador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+                ('nivel_skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.nivelskill', verbose_name='nivel de skill')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.skill')),
+            ],
+            options={
+                'verbose_name': 'skill del colaborador',
+                'verbose_name_plural': 'skills del colaborador',
+            },
+        ),
+        migrations.AddField(
+            model_name='colaborador',
+            name='comuna',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.comuna'),
+        ),
+        migrations.AddField(
+            model_name='colaborador',
+            name='estado_civil',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.estadocivil'),
+        ),
+        migrations.AddField(
+            model_name='colaborador',
+            name='nacionalidad',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='api.nacionalidad'),
+        ),
+        migrations.AddField(
+            model_name='colaborador',
+            name='sexo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.sexo'),
+        ),
+    ]
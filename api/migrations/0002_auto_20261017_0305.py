@@ -0,0 +1,52 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='colaborador',
+            name='usuario',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivoticket',
+            name='ticket',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.ticket'),
+        ),
+        migrations.AddField(
+            model_name='archivomensaje',
+            name='mensaje',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.mensaje'),
+        ),
+        migrations.AddField(
+            model_name='actividad',
+            name='colaborador',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.colaborador'),
+        ),
+        migrations.AddField(
+            model_name='actividad',
+            name='datos_actividad',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.datosactividad', verbose_name='datos de actividad'),
+        ),
+        migrations.AddField(
+            model_name='actividad',
+            name='proyecto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.proyecto'),
+        ),
+        migrations.AddConstraint(
+            model_name='unidad',
+            constraint=models.UniqueConstraint(fields=('nombre', 'area_funcional'), name='unique_unidad_area_funcional'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:06
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_auto_20261017_0305'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='actividad',
+            name='colaborador',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.colaborador'),
+        ),
+        migrations.AlterField(
+            model_name='datoscontractuales',
+            name='colaborador',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='contrato', to='api.colaborador'),
+        ),
+        migrations.AlterField(
+            model_name='mensaje',
+            name='ticket',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.ticket'),
+        ),
+        migrations.AlterField(
+            model_name='ticketlog',
+            name='ticket',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.ticket'),
+        ),
+        migrations.AddIndex(
+            model_name='actividad',
+            index=models.Index(fields=['colaborador', 'fecha'], name='actividad_colab_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividad',
+            index=models.Index(fields=['fecha'], name='actividad_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actividad',
+            index=models.Index(fields=['created'], name='actividad_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datoscontractuales',
+            index=models.Index(fields=['colaborador', 'fecha_inicio'], name='contrato_colab_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=models.Index(fields=['ticket', 'created'], name='mensaje_ticket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=models.Index(fields=['created'], name='mensaje_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created'], name='ticket_created_idx'),
+        ),
+        # Índices parciales de tickets abiertos: 4 es ETAPA_TICKET_FINALIZADA (api.models.ticket) al generar esta
+        # migración. Las migraciones congelan el valor, por lo que si la etapa final cambia de id se debe actualizar la
+        # constante y generar una migración nueva que reemplace estos índices; index_report advierte si el predicado
+        # de los índices en la base de datos no coincide con la constante.
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(_negated=True, etapa_ticket=4), fields=['asignado', 'fecha_limite'], name='ticket_abierto_asignado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(_negated=True, etapa_ticket=4), fields=['etapa_ticket', 'prioridad'], name='ticket_abierto_etapa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketlog',
+            index=models.Index(fields=['ticket', 'fecha_modificacion'], name='ticketlog_ticket_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketlog',
+            index=models.Index(fields=['fecha_modificacion'], name='ticketlog_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketlog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['historial'], name='ticketlog_historial_gin'),
+        ),
+    ]
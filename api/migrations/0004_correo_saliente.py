@@ -0,0 +1,40 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_indices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSaliente',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=200, verbose_name='asunto')),
+                ('mensaje', models.TextField(verbose_name='mensaje')),
+                ('mensaje_html', models.TextField(blank=True, null=True, verbose_name='mensaje HTML')),
+                ('remitente', models.EmailField(blank=True, max_length=254, null=True, verbose_name='remitente')),
+                ('destinatarios', models.JSONField(default=list, verbose_name='destinatarios')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=10, verbose_name='estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='intentos')),
+                ('siguiente_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='siguiente intento')),
+                ('ultimo_error', models.TextField(blank=True, null=True, verbose_name='último error')),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True, verbose_name='fecha de envío')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modificado')),
+            ],
+            options={
+                'verbose_name': 'correo saliente',
+                'verbose_name_plural': 'correos salientes',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='correosaliente',
+            index=models.Index(condition=models.Q(estado='pendiente'), fields=['siguiente_intento'], name='correo_pendiente_idx'),
+        ),
+    ]
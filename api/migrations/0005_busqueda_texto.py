@@ -0,0 +1,68 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def search_trigger_sql(table):
+    """
+    Función que construye el SQL del trigger que mantiene la columna ``search_vector`` de ``table`` a partir de
+    ``asunto`` (peso A) y ``descripcion`` (peso B), con la configuración de búsqueda en español, y que llena la
+    columna para las filas existentes.
+    """
+    vector = (
+        "setweight(to_tsvector('pg_catalog.spanish', coalesce({row}asunto, '')), 'A') || "
+        "setweight(to_tsvector('pg_catalog.spanish', coalesce({row}descripcion, '')), 'B')"
+    )
+    return f"""
+        CREATE FUNCTION {table}_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {vector.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF asunto, descripcion, search_vector ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_trigger();
+
+        UPDATE {table} SET search_vector = {vector.format(row='')};
+    """
+
+
+def drop_search_trigger_sql(table):
+    return f"""
+        DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table};
+        DROP FUNCTION IF EXISTS {table}_search_vector_trigger();
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_correo_saliente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mensaje',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='vector de búsqueda'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='vector de búsqueda'),
+        ),
+        migrations.RunSQL(search_trigger_sql('api_mensaje'), drop_search_trigger_sql('api_mensaje')),
+        migrations.RunSQL(search_trigger_sql('api_ticket'), drop_search_trigger_sql('api_ticket')),
+        migrations.AddIndex(
+            model_name='mensaje',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='mensaje_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='ticket_search_gin'),
+        ),
+    ]
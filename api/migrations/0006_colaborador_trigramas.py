@@ -0,0 +1,32 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:16
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_busqueda_texto'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['nombre'], name='colaborador_nombre_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['apellido_paterno'], name='colaborador_apellido_p_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['apellido_materno'], name='colaborador_apellido_m_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['run'], name='colaborador_run_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Carga inicial del resumen con las actividades existentes (misma agregación que api.timesheets.resumen_rows)
+RESUMEN_BACKFILL_SQL = """
+    INSERT INTO api_resumenactividad (
+        colaborador_id, fecha, proyecto_id, datos_actividad_id,
+        cantidad, minutos, sin_termino, bajo_minimo, sobre_maximo
+    )
+    SELECT a.colaborador_id, a.fecha, a.proyecto_id, a.datos_actividad_id,
+           COUNT(*),
+           COALESCE(SUM(a.duracion), 0),
+           COUNT(*) FILTER (WHERE a.hora_termino IS NULL),
+           COUNT(*) FILTER (WHERE a.duracion < d.tiempo_minimo),
+           COUNT(*) FILTER (WHERE a.duracion > d.tiempo_maximo)
+    FROM (
+        SELECT *, MOD((EXTRACT(EPOCH FROM (hora_termino - hora_inicio))::integer / 60) + 1440, 1440) AS duracion
+        FROM api_actividad
+    ) a
+    JOIN api_datosactividad d ON d.id = a.datos_actividad_id
+    GROUP BY a.colaborador_id, a.fecha, a.proyecto_id, a.datos_actividad_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_colaborador_trigramas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenActividad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='fecha')),
+                ('cantidad', models.PositiveIntegerField(default=0, verbose_name='cantidad')),
+                ('minutos', models.IntegerField(default=0, verbose_name='minutos')),
+                ('sin_termino', models.PositiveIntegerField(default=0, verbose_name='sin término')),
+                ('bajo_minimo', models.PositiveIntegerField(default=0, verbose_name='bajo el mínimo')),
+                ('sobre_maximo', models.PositiveIntegerField(default=0, verbose_name='sobre el máximo')),
+                ('colaborador', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.colaborador')),
+                ('datos_actividad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.datosactividad', verbose_name='datos de actividad')),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.proyecto')),
+            ],
+            options={
+                'verbose_name': 'resumen de actividades',
+                'verbose_name_plural': 'resúmenes de actividades',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='resumenactividad',
+            index=models.Index(fields=['fecha'], name='resumen_actividad_fecha_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumenactividad',
+            constraint=models.UniqueConstraint(fields=('colaborador', 'fecha', 'proyecto', 'datos_actividad'), name='resumen_actividad_unico'),
+        ),
+        migrations.RunSQL(RESUMEN_BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+
+def backfill_metricas(apps, schema_editor):
+    """
+    Carga inicial de las métricas con el historial existente (ver :func:`api.ticket_metrics.rebuild_ticket_metrics`).
+    """
+    from api.ticket_metrics import rebuild_ticket_metrics
+    rebuild_ticket_metrics()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_resumen_actividades'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaTicket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='fecha')),
+                ('entradas', models.IntegerField(default=0, verbose_name='entradas')),
+                ('salidas', models.IntegerField(default=0, verbose_name='salidas')),
+                ('segundos_en_etapa', models.BigIntegerField(default=0, verbose_name='segundos en la etapa')),
+                ('salidas_fuera_sla', models.IntegerField(default=0, verbose_name='salidas fuera de SLA')),
+                ('cerrados_fuera_plazo', models.IntegerField(default=0, verbose_name='cerrados fuera de plazo')),
+                ('area_ticket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.areaticket', verbose_name='área del ticket')),
+                ('etapa_ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.etapaticket', verbose_name='etapa del ticket')),
+                ('prioridad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.prioridad')),
+            ],
+            options={
+                'verbose_name': 'métrica de tickets',
+                'verbose_name_plural': 'métricas de tickets',
+            },
+        ),
+        migrations.CreateModel(
+            name='EstadoMetricaTicket',
+            fields=[
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estado_metrica', serialize=False, to='api.ticket')),
+                ('desde', models.DateTimeField(verbose_name='desde')),
+                ('area_ticket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.areaticket', verbose_name='área del ticket')),
+                ('etapa_ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.etapaticket', verbose_name='etapa del ticket')),
+                ('prioridad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.prioridad')),
+            ],
+            options={
+                'verbose_name': 'estado de métrica de ticket',
+                'verbose_name_plural': 'estados de métricas de tickets',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='metricaticket',
+            constraint=models.UniqueConstraint(fields=('fecha', 'etapa_ticket', 'prioridad', 'area_ticket'), name='metrica_ticket_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='metricaticket',
+            constraint=models.UniqueConstraint(condition=models.Q(area_ticket=None), fields=('fecha', 'etapa_ticket', 'prioridad'), name='metrica_ticket_sin_area_unica'),
+        ),
+        migrations.RunPython(backfill_metricas, migrations.RunPython.noop),
+    ]
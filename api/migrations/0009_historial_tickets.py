@@ -0,0 +1,23 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_metricas_tickets'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticketlog',
+            name='responsable',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.colaborador'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketlog',
+            index=models.Index(fields=['responsable', 'fecha_modificacion'], name='ticketlog_resp_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_historial_tickets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CargaArchivo',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=255, verbose_name='nombre')),
+                ('tamano', models.BigIntegerField(verbose_name='tamaño')),
+                ('recibido', models.BigIntegerField(default=0, verbose_name='recibido')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modificado')),
+                ('mensaje', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.mensaje')),
+                ('ticket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.ticket')),
+            ],
+            options={
+                'verbose_name': 'carga de archivo',
+                'verbose_name_plural': 'cargas de archivos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='cargaarchivo',
+            index=models.Index(fields=['modified'], name='carga_archivo_modified_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cargaarchivo',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('mensaje__isnull', True), ('ticket__isnull', False)), models.Q(('mensaje__isnull', False), ('ticket__isnull', True)), _connector='OR'), name='carga_archivo_destino'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:48
+
+import api.models.ticket
+import api.storage
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_cargas_archivos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContenidoArchivo',
+            fields=[
+                ('nombre', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='nombre')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+                ('tamano', models.BigIntegerField(verbose_name='tamaño')),
+                ('referencias', models.IntegerField(default=0, verbose_name='referencias')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='modificado')),
+            ],
+            options={
+                'verbose_name': 'contenido de archivo',
+                'verbose_name_plural': 'contenidos de archivos',
+            },
+        ),
+        migrations.AlterField(
+            model_name='archivomensaje',
+            name='archivo',
+            field=models.ImageField(storage=api.storage.ContentAddressedStorage(), upload_to=api.models.ticket.get_content_filename, verbose_name='archivo'),
+        ),
+        migrations.AlterField(
+            model_name='archivoticket',
+            name='archivo',
+            field=models.FileField(storage=api.storage.ContentAddressedStorage(), upload_to=api.models.ticket.get_content_filename, verbose_name='archivo'),
+        ),
+        migrations.AddIndex(
+            model_name='contenidoarchivo',
+            index=models.Index(condition=models.Q(referencias__lte=0), fields=['modified'], name='contenido_sin_ref_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.1.4 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_contenido_archivos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MiniaturaPendiente',
+            fields=[
+                ('nombre', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='nombre')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='intentos')),
+                ('ultimo_error', models.TextField(blank=True, null=True, verbose_name='último error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creado')),
+            ],
+            options={
+                'verbose_name': 'miniatura pendiente',
+                'verbose_name_plural': 'miniaturas pendientes',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='miniaturapendiente',
+            index=models.Index(fields=['created'], name='miniatura_pendiente_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.4 on 2026-10-17 04:05
+
+from django.db import migrations, models
+
+
+def crear_version(apps, schema_editor):
+    # Fila única con la versión de los catálogos (ver api.catalogs.get_catalog_version)
+    apps.get_model('api', 'VersionCatalogos').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_miniaturas_pendientes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionCatalogos',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='versión')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='modified')),
+            ],
+            options={
+                'verbose_name': 'versión de los catálogos',
+                'verbose_name_plural': 'versiones de los catálogos',
+            },
+        ),
+        migrations.RunPython(crear_version, migrations.RunPython.noop),
+    ]
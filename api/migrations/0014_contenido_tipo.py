@@ -0,0 +1,30 @@
+# Generated by Django 3.1.4 on 2026-10-17 04:08
+
+import mimetypes
+
+from django.db import migrations, models
+
+
+def cargar_tipos(apps, schema_editor):
+    # Los nombres anteriores conservaban la extensión del original
+    ContenidoArchivo = apps.get_model('api', 'ContenidoArchivo')
+    for contenido in ContenidoArchivo.objects.filter(tipo=''):
+        tipo = mimetypes.guess_type(contenido.nombre)[0]
+        if tipo:
+            ContenidoArchivo.objects.filter(pk=contenido.pk).update(tipo=tipo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_version_catalogos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contenidoarchivo',
+            name='tipo',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='tipo de contenido'),
+        ),
+        migrations.RunPython(cargar_tipos, migrations.RunPython.noop),
+    ]
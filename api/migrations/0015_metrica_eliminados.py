@@ -0,0 +1,18 @@
+# Generated by Django 3.1.4 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_contenido_tipo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='metricaticket',
+            name='eliminados',
+            field=models.IntegerField(default=0, verbose_name='eliminados'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.4 on 2026-10-17 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_metrica_eliminados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuscripcionTiempoReal',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canal', models.CharField(max_length=50, verbose_name='canal')),
+                ('proceso', models.CharField(max_length=32, verbose_name='proceso')),
+                ('expira', models.DateTimeField(verbose_name='expira')),
+            ],
+            options={
+                'verbose_name': 'suscripción en tiempo real',
+                'verbose_name_plural': 'suscripciones en tiempo real',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='suscripciontiemporeal',
+            index=models.Index(fields=['expira'], name='suscripcion_expira_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='suscripciontiemporeal',
+            constraint=models.UniqueConstraint(fields=('canal', 'proceso'), name='suscripcion_tiempo_real_unica'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.4 on 2026-10-17 04:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0016_suscripciones_tiempo_real'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cargaarchivo',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -4,3 +4,5 @@ from api.models.contrato import *
 from api.models.organizacion import *
 from api.models.actividad import *
 from api.models.ticket import *
+from api.models.correo import *
+from api.models.catalogo import *
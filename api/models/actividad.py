@@ -60,7 +60,7 @@ class Actividad(models.Model):
         actividad_elegida.save()
 
     """
-    colaborador = models.ForeignKey('Colaborador', on_delete=models.CASCADE)
+    colaborador = models.ForeignKey('Colaborador', on_delete=models.CASCADE, db_index=False)
     fecha = models.DateField(_('fecha'))
     hora_inicio = models.TimeField(_('hora de inicio'))
     hora_termino = models.TimeField(_('hora de término'), blank=True, null=True)
@@ -75,9 +75,16 @@ class Actividad(models.Model):
         Clase meta encargada de la información general para el funcionamiento en Django.
 
         :param verbose_name_plural: Cadena de texto con la versión en plural del nombre del objeto.
+        :param indexes: Lista de índices de clase :class:`django.models.Index` para las búsquedas por colaborador y
+            fecha.
         """
         verbose_name = _('actividad')
         verbose_name_plural = _('actividades')
+        indexes = [
+            models.Index(fields=['colaborador', 'fecha'], name='actividad_colab_fecha_idx'),
+            models.Index(fields=['fecha'], name='actividad_fecha_idx'),
+            models.Index(fields=['created'], name='actividad_created_idx'),
+        ]
 
     def __str__(self):
         """
@@ -94,6 +101,73 @@ class Actividad(models.Model):
             self.fecha.isoformat()
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Función que construye la instancia leída desde la base de datos, guardando los valores cargados en
+        ``_loaded_values`` para conocer, al guardar, el día y colaborador anteriores (ver :mod:`api.timesheets`).
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class ResumenActividad(models.Model):
+    """
+    El modelo ResumenActividad es la tabla de resumen de :class:`Actividad`, con una fila por colaborador, día,
+    proyecto y datos de actividad. Se mantiene de forma incremental desde :mod:`api.timesheets` al guardar o eliminar
+    actividades, y es la fuente de los reportes de horas, por lo que estos no recorren la tabla de actividades.
+
+    :param colaborador: Clave foránea al modelo :class:`Colaborador`.
+    :param fecha: Campo de fecha del día resumido.
+    :param proyecto: Clave foránea al modelo :class:`Proyecto`.
+    :param datos_actividad: Clave foránea al modelo :class:`DatosActividad`.
+    :param cantidad: Campo numérico con la cantidad de actividades.
+    :param minutos: Campo numérico con la suma de la duración en minutos de las actividades con hora de término.
+    :param sin_termino: Campo numérico con la cantidad de actividades sin hora de término.
+    :param bajo_minimo: Campo numérico con la cantidad de actividades de duración menor a
+        :attr:`DatosActividad.tiempo_minimo`.
+    :param sobre_maximo: Campo numérico con la cantidad de actividades de duración mayor a
+        :attr:`DatosActividad.tiempo_maximo`.
+    """
+    colaborador = models.ForeignKey('Colaborador', on_delete=models.CASCADE, db_index=False)
+    fecha = models.DateField(_('fecha'))
+    proyecto = models.ForeignKey('Proyecto', on_delete=models.CASCADE)
+    datos_actividad = models.ForeignKey('DatosActividad', on_delete=models.CASCADE, verbose_name='datos de actividad')
+    cantidad = models.PositiveIntegerField(_('cantidad'), default=0)
+    minutos = models.IntegerField(_('minutos'), default=0)
+    sin_termino = models.PositiveIntegerField(_('sin término'), default=0)
+    bajo_minimo = models.PositiveIntegerField(_('bajo el mínimo'), default=0)
+    sobre_maximo = models.PositiveIntegerField(_('sobre el máximo'), default=0)
+
+    class Meta:
+        """
+        Clase meta encargada de la información general para el funcionamiento en Django.
+
+        :param verbose_name_plural: Cadena de texto con la versión en plural del nombre del objeto.
+        :param constraints: Restricción de unicidad de la llave del resumen (su índice sirve las búsquedas por
+            colaborador y fecha).
+        :param indexes: Índice por fecha para los reportes por período.
+        """
+        verbose_name = _('resumen de actividades')
+        verbose_name_plural = _('resúmenes de actividades')
+        constraints = [
+            models.UniqueConstraint(fields=['colaborador', 'fecha', 'proyecto', 'datos_actividad'],
+                                    name='resumen_actividad_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha'], name='resumen_actividad_fecha_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Función que retorna una representación visual en cadena de texto para la llamada del modelo por algunas.
+        funciones de Django.
+
+        :return: Cadena de texto con el colaborador, fecha y minutos del resumen.
+        """
+        return f'{self.colaborador_id} - {self.fecha.isoformat()} - {self.minutos} minutos'
+
 
 class DatosActividad(models.Model):
     """
@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class VersionCatalogos(models.Model):
+    """
+    El modelo VersionCatalogos guarda, en una única fila, la versión de los catálogos servidos desde memoria (ver
+    :mod:`api.catalogs`). Al estar en la base de datos es la misma para todos los procesos, cualquiera sea el cache
+    configurado, y el cambio de versión se confirma junto con la escritura del catálogo.
+
+    :param version: Campo numérico con la versión, que aumenta con cada cambio en un catálogo.
+    :param modified: Campo de fecha y hora del último cambio (Auto generado).
+    """
+    # Id de la única fila
+    FILA = 1
+
+    version = models.PositiveBigIntegerField(_('versión'), default=0)
+    modified = models.DateTimeField(_('modified'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('versión de los catálogos')
+        verbose_name_plural = _('versiones de los catálogos')
+
+    def __str__(self):
+        return str(self.version)
@@ -1,10 +1,49 @@
+from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.utils.translation import gettext_lazy as _
 
 from api.validators import validate_run
 
 
+def last_contrato_prefetch(prefix=''):
+    """
+    Función que construye el :class:`Prefetch` que resuelve, en una sola consulta, el último
+    :class:`DatosContractuales` de cada colaborador junto a sus datos organizacionales y cargo.
+
+    :param prefix: Prefijo de la ruta hacia el colaborador (por ejemplo ``'asignado__'`` desde un Ticket).
+    :return: :class:`Prefetch` que deja el resultado en el atributo ``prefetched_last_contrato``.
+    """
+    datos_contractuales = apps.get_model('api', 'DatosContractuales')
+    ultimo_contrato = datos_contractuales.objects.filter(
+        colaborador=OuterRef('colaborador')
+    ).order_by('-fecha_inicio', '-pk').values('pk')[:1]
+    return Prefetch(
+        f'{prefix}contrato',
+        queryset=datos_contractuales.objects.filter(
+            pk=Subquery(ultimo_contrato)
+        ).select_related('organizacion__cargo'),
+        to_attr='prefetched_last_contrato'
+    )
+
+
+class ColaboradorQuerySet(models.QuerySet):
+    """
+    La clase ColaboradorQuerySet agrega al administrador de :class:`Colaborador` atajos de consultas optimizadas.
+    """
+
+    def with_last_contrato(self):
+        """
+        Función que precarga el último contrato de cada colaborador (ver :func:`last_contrato_prefetch`), evitando
+        las consultas por fila de :attr:`Colaborador.last_contrato`.
+
+        :return: QuerySet con la precarga aplicada.
+        """
+        return self.prefetch_related(last_contrato_prefetch())
+
+
 class Colaborador(models.Model):
     """
     El modelo Colaborador es una representación con datos personalizados del usuario del sistema. Agrega valores
@@ -101,14 +140,23 @@ class Colaborador(models.Model):
     created = models.DateTimeField(_('creado'), auto_now_add=True)
     modified = models.DateTimeField(_('modificado'), auto_now=True)
 
+    objects = ColaboradorQuerySet.as_manager()
+
     class Meta:
         """
         Clase meta encargada de la información general para el funcionamiento en Django.
 
         :param verbose_name_plural: Cadena de texto con la versión en plural del nombre del objeto.
+        :param indexes: Índices de trigramas (``pg_trgm``) para la búsqueda aproximada por nombre, apellidos y RUN.
         """
         verbose_name = _('colaborador')
         verbose_name_plural = _('colaboradores')
+        indexes = [
+            GinIndex(fields=['nombre'], name='colaborador_nombre_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['apellido_paterno'], name='colaborador_apellido_p_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['apellido_materno'], name='colaborador_apellido_m_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['run'], name='colaborador_run_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         """
@@ -134,7 +182,10 @@ class Colaborador(models.Model):
 
     @property
     def last_contrato(self):
-        return self.contrato.order_by("fecha_inicio").last()
+        if hasattr(self, 'prefetched_last_contrato'):
+            # Precargado con ColaboradorQuerySet.with_last_contrato o last_contrato_prefetch
+            return self.prefetched_last_contrato[0] if self.prefetched_last_contrato else None
+        return self.contrato.order_by('-fecha_inicio', '-pk').first()
 
 
 class Sexo(models.Model):
@@ -64,7 +64,7 @@ class DatosContractuales(models.Model):
         datos_contractuales_elegidos.save()
 
     """
-    colaborador = models.ForeignKey('Colaborador', on_delete=models.CASCADE, related_name='contrato')
+    colaborador = models.ForeignKey('Colaborador', on_delete=models.CASCADE, related_name='contrato', db_index=False)
     fecha_inicio = models.DateField(_('fecha de inicio'))
     fecha_termino = models.DateField(_('fecha de termino'), blank=True, null=True)
     sueldo_base = models.PositiveIntegerField(_('sueldo base'), blank=True, null=True)
@@ -86,9 +86,14 @@ class DatosContractuales(models.Model):
         Clase meta encargada de la información general para el funcionamiento en Django.
 
         :param verbose_name_plural: Cadena de texto con la versión en plural del nombre del objeto.
+        :param indexes: Lista de índices de clase :class:`django.models.Index` para obtener el último contrato del
+            colaborador.
         """
         verbose_name = _('datos contractuales')
         verbose_name_plural = _('datos contractuales')
+        indexes = [
+            models.Index(fields=['colaborador', 'fecha_inicio'], name='contrato_colab_inicio_idx'),
+        ]
 
     def __str__(self):
         """
@@ -0,0 +1,77 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class CorreoSaliente(models.Model):
+    """
+    El modelo CorreoSaliente es la bandeja de salida de correos del sistema. Las vistas solo registran el correo y el
+    comando ``python manage.py enviar_correos`` se encarga de enviarlos en lotes, con reintentos.
+
+    :param asunto: Campo de texto con el asunto del correo (largo máximo: 200 caracteres).
+    :param mensaje: Campo de texto con el cuerpo en texto plano del correo.
+    :param mensaje_html: Campo de texto con el cuerpo HTML del correo (opcional).
+    :param remitente: Campo de texto con el remitente; si está vacío se usa ``DEFAULT_FROM_EMAIL`` (opcional).
+    :param destinatarios: Campo JSON con la lista de destinatarios.
+    :param estado: Campo de texto con el estado del envío (ver :class:`CorreoSaliente.Estado`).
+    :param intentos: Campo numérico con la cantidad de intentos de envío realizados.
+    :param siguiente_intento: Campo de fecha y hora desde la cual se puede intentar el envío.
+    :param ultimo_error: Campo de texto con el último error de envío (opcional).
+    :param fecha_envio: Campo de fecha y hora del envío exitoso (opcional).
+    :param created: Campo de fecha y hora de la fecha de creación del correo (Auto generado).
+    :param modified: Campo de fecha y hora de la última fecha de modificación del correo (Auto generado).
+
+    **Ejemplos de uso**
+
+    *Registro de un correo en la bandeja de salida*
+
+    Ejemplo:
+    ::
+        CorreoSaliente.objects.create(
+            asunto='Asunto',
+            mensaje='Cuerpo del correo',
+            destinatarios=['some@email.com']
+        )
+    """
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'pendiente', _('Pendiente')
+        ENVIADO = 'enviado', _('Enviado')
+        FALLIDO = 'fallido', _('Fallido')
+
+    asunto = models.CharField(_('asunto'), max_length=200)
+    mensaje = models.TextField(_('mensaje'))
+    mensaje_html = models.TextField(_('mensaje HTML'), blank=True, null=True)
+    remitente = models.EmailField(_('remitente'), blank=True, null=True)
+    destinatarios = models.JSONField(_('destinatarios'), default=list)
+    estado = models.CharField(_('estado'), max_length=10, choices=Estado.choices, default=Estado.PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(_('intentos'), default=0)
+    siguiente_intento = models.DateTimeField(_('siguiente intento'), default=timezone.now)
+    ultimo_error = models.TextField(_('último error'), blank=True, null=True)
+    fecha_envio = models.DateTimeField(_('fecha de envío'), blank=True, null=True)
+    created = models.DateTimeField(_('creado'), auto_now_add=True)
+    modified = models.DateTimeField(_('modificado'), auto_now=True)
+
+    class Meta:
+        """
+        Clase meta encargada de la información general para el funcionamiento en Django.
+
+        :param verbose_name_plural: Cadena de texto con la versión en plural del nombre del objeto.
+        :param indexes: Índice parcial sobre los correos pendientes, usado por el comando de envío.
+        """
+        verbose_name = _('correo saliente')
+        verbose_name_plural = _('correos salientes')
+        indexes = [
+            models.Index(fields=['siguiente_intento'], name='correo_pendiente_idx',
+                         condition=Q(estado='pendiente')),
+        ]
+
+    def __str__(self):
+        """
+        Función que retorna una representación visual en cadena de texto para la llamada del modelo por algunas
+        funciones de Django.
+
+        :return: Cadena de texto con asunto, destinatarios y estado.
+        """
+        return '{} - {} - {}'.format(self.asunto, ', '.join(self.destinatarios), self.get_estado_display())
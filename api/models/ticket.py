@@ -1,9 +1,40 @@
 import os
+import uuid
 from datetime import datetime
 
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from api.storage import content_storage
+
+# Identificador de la etapa 'Finalización' (ver fixtures/ticket.json), que marca un ticket como cerrado. Es parte del
+# predicado de los índices parciales de Ticket (ver api/migrations/0003_indices.py): si cambia se debe generar una
+# migración que los reemplace
+ETAPA_TICKET_FINALIZADA = 4
+
+# Identificadores de las etapas 'Revisión' y 'Desarrollo' (ver fixtures/ticket.json), cuyos tiempos máximos están en
+# DificultadTicket (rev_max y dev_max, en horas)
+ETAPA_TICKET_REVISION = 1
+ETAPA_TICKET_DESARROLLO = 2
+
+
+def get_content_filename(instance, filename):
+    """
+    Método que retorna el nombre original del archivo a guardar. Los archivos de tickets y mensajes se guardan con el
+    nombre de su contenido (ver :class:`api.storage.ContentAddressedStorage`); del original solo se usa la extensión,
+    para el tipo de contenido.
+
+    :param instance: Valor defecto para el contexto actual
+    :param filename: Nombre del archivo a guardar
+    :return: Cadena de texto con el nombre del archivo
+    """
+    return filename
+
 
 def get_file_ticket_path(instance, filename):
     """
@@ -77,21 +108,69 @@ class Ticket(models.Model):
     fecha_solicitud = models.DateTimeField(_('fecha de solicitud'), default=datetime.now)
     created = models.DateTimeField(_('creado'), auto_now_add=True)
     modified = models.DateTimeField(_('modificado'), auto_now=True)
+    # Mantenido por un trigger de la base de datos a partir de asunto y descripcion (ver api.search)
+    search_vector = SearchVectorField(_('vector de búsqueda'), null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created'], name='ticket_created_idx'),
+            GinIndex(fields=['search_vector'], name='ticket_search_gin'),
+            models.Index(
+                fields=['asignado', 'fecha_limite'],
+                name='ticket_abierto_asignado_idx',
+                condition=~Q(etapa_ticket=ETAPA_TICKET_FINALIZADA)
+            ),
+            models.Index(
+                fields=['etapa_ticket', 'prioridad'],
+                name='ticket_abierto_etapa_idx',
+                condition=~Q(etapa_ticket=ETAPA_TICKET_FINALIZADA)
+            ),
+        ]
 
     def __str__(self):
         return f'{self.id} - {self.asunto[:50]} - {self.etapa_ticket.nombre}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Función que construye la instancia leída desde la base de datos, guardando los valores cargados en
+        ``_loaded_values`` para calcular los cambios al guardar sin volver a consultarla (ver
+        :mod:`api.ticket_history`).
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class TicketLog(models.Model):
-    ticket = models.ForeignKey('Ticket', on_delete=models.CASCADE)
+    """
+    El modelo TicketLog es el historial de solo inserción de los cambios de un :class:`Ticket`. Se registra
+    automáticamente al guardar un ticket (ver :mod:`api.ticket_history`), con ``historial`` en el formato
+    ``{"campo": [anterior, nuevo]}``. Las consultas por ticket o por responsable y rango de fechas usan los índices
+    compuestos con ``fecha_modificacion``.
+
+    :param ticket: Clave foránea al modelo :class:`Ticket`.
+    :param historial: Campo JSON con los cambios por campo.
+    :param responsable: Clave foránea al modelo :class:`Colaborador` que hizo el cambio (vacío para los cambios sin
+        usuario, por ejemplo desde comandos).
+    :param observaciones: Campo de texto con observaciones del cambio (opcional).
+    :param fecha_modificacion: Campo de fecha y hora del cambio (Auto generado).
+    """
+    ticket = models.ForeignKey('Ticket', on_delete=models.CASCADE, db_index=False)
     historial = models.JSONField(_('historial'), default=dict)
-    responsable = models.ForeignKey('Colaborador', on_delete=models.CASCADE)
+    responsable = models.ForeignKey('Colaborador', on_delete=models.CASCADE, db_index=False, blank=True, null=True)
     observaciones = models.TextField(_('observaciones'), blank=True, null=True)
     fecha_modificacion = models.DateTimeField(_('fecha de modificación'), auto_now_add=True)
 
     class Meta:
         verbose_name = _('historial del ticket')
         verbose_name_plural = _('historiales de los tickets')
+        indexes = [
+            models.Index(fields=['ticket', 'fecha_modificacion'], name='ticketlog_ticket_fecha_idx'),
+            models.Index(fields=['fecha_modificacion'], name='ticketlog_fecha_idx'),
+            models.Index(fields=['responsable', 'fecha_modificacion'], name='ticketlog_resp_fecha_idx'),
+            GinIndex(fields=['historial'], name='ticketlog_historial_gin'),
+        ]
 
     def __str__(self):
         return 'Ticket {} - Fecha de cambio {}'.format(
@@ -100,6 +179,80 @@ class TicketLog(models.Model):
         )
 
 
+class MetricaTicket(models.Model):
+    """
+    El modelo MetricaTicket guarda los contadores diarios de flujo de tickets por etapa, prioridad y área, mantenidos
+    de forma incremental desde :mod:`api.ticket_metrics` al registrar cambios de etapa en :class:`TicketLog`. Los
+    reportes suman estas filas, por lo que su costo depende de la cantidad de grupos y no de tickets.
+
+    :param fecha: Campo de fecha del día del contador.
+    :param etapa_ticket: Clave foránea al modelo :class:`EtapaTicket`.
+    :param prioridad: Clave foránea al modelo :class:`Prioridad`.
+    :param area_ticket: Clave foránea al modelo :class:`AreaTicket` (de la dificultad del ticket, opcional).
+    :param entradas: Campo numérico con la cantidad de tickets que entraron a la etapa.
+    :param salidas: Campo numérico con la cantidad de tickets que salieron de la etapa.
+    :param segundos_en_etapa: Campo numérico con la suma del tiempo en la etapa de los tickets que salieron.
+    :param salidas_fuera_sla: Campo numérico con la cantidad de salidas cuyo tiempo en la etapa superó el máximo de
+        :class:`DificultadTicket` (``rev_max`` o ``dev_max``).
+    :param cerrados_fuera_plazo: Campo numérico con la cantidad de entradas a la etapa final posteriores a
+        ``fecha_limite`` del ticket.
+    :param eliminados: Campo numérico con la cantidad de tickets abiertos en la etapa que se eliminaron ese día. Se
+        registran aparte de ``salidas`` para no alterar el historial ni los tiempos en la etapa.
+    """
+    fecha = models.DateField(_('fecha'))
+    etapa_ticket = models.ForeignKey('EtapaTicket', on_delete=models.CASCADE, verbose_name='etapa del ticket')
+    prioridad = models.ForeignKey('Prioridad', on_delete=models.CASCADE)
+    area_ticket = models.ForeignKey('AreaTicket', on_delete=models.CASCADE, blank=True, null=True,
+                                    verbose_name='área del ticket')
+    entradas = models.IntegerField(_('entradas'), default=0)
+    salidas = models.IntegerField(_('salidas'), default=0)
+    segundos_en_etapa = models.BigIntegerField(_('segundos en la etapa'), default=0)
+    salidas_fuera_sla = models.IntegerField(_('salidas fuera de SLA'), default=0)
+    cerrados_fuera_plazo = models.IntegerField(_('cerrados fuera de plazo'), default=0)
+    eliminados = models.IntegerField(_('eliminados'), default=0)
+
+    class Meta:
+        verbose_name = _('métrica de tickets')
+        verbose_name_plural = _('métricas de tickets')
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'etapa_ticket', 'prioridad', 'area_ticket'],
+                                    name='metrica_ticket_unica'),
+            models.UniqueConstraint(fields=['fecha', 'etapa_ticket', 'prioridad'], condition=Q(area_ticket=None),
+                                    name='metrica_ticket_sin_area_unica'),
+        ]
+
+    def __str__(self):
+        return f'{self.fecha.isoformat()} - etapa {self.etapa_ticket_id} - prioridad {self.prioridad_id}'
+
+
+class EstadoMetricaTicket(models.Model):
+    """
+    El modelo EstadoMetricaTicket guarda, por ticket, el grupo de :class:`MetricaTicket` en el que entró a su etapa
+    actual y desde cuándo, para registrar la salida en el mismo grupo y calcular el tiempo en la etapa sin recorrer
+    el historial.
+
+    :param ticket: Clave foránea al modelo :class:`Ticket` (relación uno a uno, llave primaria).
+    :param etapa_ticket: Clave foránea al modelo :class:`EtapaTicket`.
+    :param prioridad: Clave foránea al modelo :class:`Prioridad`.
+    :param area_ticket: Clave foránea al modelo :class:`AreaTicket` (opcional).
+    :param desde: Campo de fecha y hora de entrada a la etapa.
+    """
+    ticket = models.OneToOneField('Ticket', on_delete=models.CASCADE, primary_key=True,
+                                  related_name='estado_metrica')
+    etapa_ticket = models.ForeignKey('EtapaTicket', on_delete=models.CASCADE, verbose_name='etapa del ticket')
+    prioridad = models.ForeignKey('Prioridad', on_delete=models.CASCADE)
+    area_ticket = models.ForeignKey('AreaTicket', on_delete=models.CASCADE, blank=True, null=True,
+                                    verbose_name='área del ticket')
+    desde = models.DateTimeField(_('desde'))
+
+    class Meta:
+        verbose_name = _('estado de métrica de ticket')
+        verbose_name_plural = _('estados de métricas de tickets')
+
+    def __str__(self):
+        return f'Ticket {self.ticket_id} - etapa {self.etapa_ticket_id} desde {self.desde}'
+
+
 class Prioridad(models.Model):
     """
     El modelo Prioridad es una representación de las prioridades puede tener el modelo :class:`Ticket`.
@@ -264,7 +417,7 @@ class DificultadTicket(models.Model):
 
 class ArchivoTicket(models.Model):
     ticket = models.ForeignKey('Ticket', on_delete=models.CASCADE)
-    archivo = models.FileField(_('archivo'), upload_to=get_file_ticket_path)
+    archivo = models.FileField(_('archivo'), upload_to=get_content_filename, storage=content_storage)
 
     class Meta:
         verbose_name = _('archivo del ticket')
@@ -279,18 +432,35 @@ class ArchivoTicket(models.Model):
             self.archivo[-50:]
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Función que construye la instancia leída desde la base de datos, guardando el nombre del archivo cargado en
+        ``_archivo_cargado`` para contar las referencias a su contenido (ver :mod:`api.storage`).
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._archivo_cargado = dict(zip(field_names, values)).get('archivo')
+        return instance
+
 
 class Mensaje(models.Model):
-    ticket = models.ForeignKey('Ticket', on_delete=models.CASCADE)
+    ticket = models.ForeignKey('Ticket', on_delete=models.CASCADE, db_index=False)
     asunto = models.CharField(_('asunto'), max_length=100)
     descripcion = models.TextField(_('descripción'))
     autor = models.ForeignKey('Colaborador', models.CASCADE)
     created = models.DateTimeField(_('created'), auto_now_add=True)
     modified = models.DateTimeField(_('modified'), auto_now=True)
+    # Mantenido por un trigger de la base de datos a partir de asunto y descripcion (ver api.search)
+    search_vector = SearchVectorField(_('vector de búsqueda'), null=True, editable=False)
 
     class Meta:
         verbose_name = _('mensaje')
         verbose_name_plural = _('mensajes')
+        indexes = [
+            models.Index(fields=['ticket', 'created'], name='mensaje_ticket_created_idx'),
+            models.Index(fields=['created'], name='mensaje_created_idx'),
+            GinIndex(fields=['search_vector'], name='mensaje_search_gin'),
+        ]
 
     def __str__(self):
         return f'Ticket: {self.ticket.id} - Mensaje: {self.asunto}'
@@ -298,7 +468,7 @@ class Mensaje(models.Model):
 
 class ArchivoMensaje(models.Model):
     mensaje = models.ForeignKey('Mensaje', on_delete=models.CASCADE)
-    archivo = models.ImageField(_('archivo'), upload_to=get_file_message_path)
+    archivo = models.ImageField(_('archivo'), upload_to=get_content_filename, storage=content_storage)
 
     class Meta:
         verbose_name = _('archivo del mensaje')
@@ -313,6 +483,154 @@ class ArchivoMensaje(models.Model):
             self.archivo[-50:]
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Función que construye la instancia leída desde la base de datos, guardando el nombre del archivo cargado en
+        ``_archivo_cargado`` para contar las referencias a su contenido (ver :mod:`api.storage`).
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._archivo_cargado = dict(zip(field_names, values)).get('archivo')
+        return instance
+
+
+class ContenidoArchivo(models.Model):
+    """
+    El modelo ContenidoArchivo cuenta las referencias de :class:`ArchivoTicket` y :class:`ArchivoMensaje` a cada
+    archivo del almacenamiento direccionado por contenido (ver :class:`api.storage.ContentAddressedStorage`). Se
+    mantiene con receptores de señales y el comando ``recolectar_archivos`` elimina los archivos sin referencias.
+
+    :param nombre: Campo de texto con el nombre del archivo en el almacenamiento (llave primaria).
+    :param sha256: Campo de texto con el SHA-256 del contenido.
+    :param tamano: Campo numérico con el tamaño del archivo, en bytes.
+    :param tipo: Campo de texto con el tipo de contenido, según el nombre con que se subió por primera vez (el
+        nombre en el almacenamiento no tiene extensión).
+    :param referencias: Campo numérico con la cantidad de archivos de tickets y mensajes que lo usan.
+    :param created: Campo de fecha y hora de creación (Auto generado).
+    :param modified: Campo de fecha y hora del último cambio de referencias o del último guardado que lo reutilizó.
+    """
+    nombre = models.CharField(_('nombre'), max_length=100, primary_key=True)
+    sha256 = models.CharField(_('SHA-256'), max_length=64, db_index=True)
+    tamano = models.BigIntegerField(_('tamaño'))
+    tipo = models.CharField(_('tipo de contenido'), max_length=100, blank=True, default='')
+    referencias = models.IntegerField(_('referencias'), default=0)
+    created = models.DateTimeField(_('creado'), auto_now_add=True)
+    modified = models.DateTimeField(_('modificado'), default=timezone.now)
+
+    class Meta:
+        verbose_name = _('contenido de archivo')
+        verbose_name_plural = _('contenidos de archivos')
+        indexes = [
+            models.Index(fields=['modified'], name='contenido_sin_ref_idx', condition=Q(referencias__lte=0)),
+        ]
+
+    def __str__(self):
+        return f'{self.nombre} ({self.referencias})'
+
+
+class CargaArchivo(models.Model):
+    """
+    El modelo CargaArchivo es una carga por partes de un :class:`ArchivoTicket` o :class:`ArchivoMensaje` en curso
+    (ver :mod:`api.uploads`). Las partes se escriben directamente en un archivo temporal del almacenamiento y
+    ``recibido`` indica desde qué byte continuar si la carga se interrumpe. Al completarse se crea el archivo del
+    ticket o mensaje y se elimina la carga.
+
+    :param id: Identificador aleatorio de la carga (llave primaria).
+    :param ticket: Clave foránea al modelo :class:`Ticket` (para cargas de :class:`ArchivoTicket`).
+    :param mensaje: Clave foránea al modelo :class:`Mensaje` (para cargas de :class:`ArchivoMensaje`).
+    :param usuario: Clave foránea al modelo :class:`users.models.CustomUser` que inició la carga, el único que puede
+        continuarla o cancelarla (vacío para las cargas anteriores, que solo expiran).
+    :param nombre: Campo de texto con el nombre original del archivo.
+    :param tamano: Campo numérico con el tamaño total del archivo, en bytes.
+    :param recibido: Campo numérico con la cantidad de bytes recibidos.
+    :param sha256: Campo de texto con el SHA-256 esperado del archivo completo (opcional).
+    :param created: Campo de fecha y hora de inicio de la carga (Auto generado).
+    :param modified: Campo de fecha y hora de la última parte recibida (Auto generado).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ticket = models.ForeignKey('Ticket', on_delete=models.CASCADE, blank=True, null=True)
+    mensaje = models.ForeignKey('Mensaje', on_delete=models.CASCADE, blank=True, null=True)
+    usuario = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, blank=True, null=True, related_name='+')
+    nombre = models.CharField(_('nombre'), max_length=255)
+    tamano = models.BigIntegerField(_('tamaño'))
+    recibido = models.BigIntegerField(_('recibido'), default=0)
+    sha256 = models.CharField(_('SHA-256'), max_length=64, blank=True)
+    created = models.DateTimeField(_('creado'), auto_now_add=True)
+    modified = models.DateTimeField(_('modificado'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('carga de archivo')
+        verbose_name_plural = _('cargas de archivos')
+        constraints = [
+            models.CheckConstraint(
+                check=Q(ticket__isnull=False, mensaje__isnull=True) | Q(ticket__isnull=True, mensaje__isnull=False),
+                name='carga_archivo_destino'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['modified'], name='carga_archivo_modified_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nombre} - {self.recibido}/{self.tamano}'
+
+
+class MiniaturaPendiente(models.Model):
+    """
+    El modelo MiniaturaPendiente es la cola de imágenes de :class:`ArchivoMensaje` cuyas miniaturas aún no se generan
+    (ver :mod:`api.thumbnails`). La procesa el comando ``generar_miniaturas`` fuera del ciclo de la solicitud. Se
+    identifica por el nombre del archivo de origen, por lo que una misma imagen adjunta varias veces se procesa una
+    sola vez.
+
+    :param nombre: Campo de texto con el nombre de la imagen en el almacenamiento (llave primaria).
+    :param intentos: Campo numérico con la cantidad de intentos fallidos.
+    :param ultimo_error: Campo de texto con el último error (opcional).
+    :param created: Campo de fecha y hora de ingreso a la cola (Auto generado).
+    """
+    nombre = models.CharField(_('nombre'), max_length=100, primary_key=True)
+    intentos = models.PositiveSmallIntegerField(_('intentos'), default=0)
+    ultimo_error = models.TextField(_('último error'), blank=True, null=True)
+    created = models.DateTimeField(_('creado'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('miniatura pendiente')
+        verbose_name_plural = _('miniaturas pendientes')
+        indexes = [
+            models.Index(fields=['created'], name='miniatura_pendiente_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nombre} ({self.intentos} intentos)'
+
+
+class SuscripcionTiempoReal(models.Model):
+    """
+    El modelo SuscripcionTiempoReal registra los canales de tickets con conexiones abiertas en cada proceso ASGI (ver
+    :class:`api.realtime.PostgresBroker`), para que los procesos que escriben solo construyan y notifiquen los eventos
+    de los canales con interesados. Cada proceso renueva sus filas mientras tiene conexiones; las de procesos
+    terminados se descartan al expirar.
+
+    :param canal: Campo de texto con el nombre del canal (ver :func:`api.realtime.ticket_channel`).
+    :param proceso: Campo de texto con el identificador del broker del proceso.
+    :param expira: Campo de fecha y hora hasta la que la fila es válida sin renovarse.
+    """
+    canal = models.CharField(_('canal'), max_length=50)
+    proceso = models.CharField(_('proceso'), max_length=32)
+    expira = models.DateTimeField(_('expira'))
+
+    class Meta:
+        verbose_name = _('suscripción en tiempo real')
+        verbose_name_plural = _('suscripciones en tiempo real')
+        constraints = [
+            models.UniqueConstraint(fields=['canal', 'proceso'], name='suscripcion_tiempo_real_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['expira'], name='suscripcion_expira_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.canal} ({self.proceso})'
+
 
 class Etiqueta(models.Model):
     """
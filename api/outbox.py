@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import CorreoSaliente
+
+# Espera base y máxima (en segundos) entre reintentos de envío
+ESPERA_BASE = 30
+ESPERA_MAXIMA = 60 * 60
+
+
+def encolar_correo(subject, message, recipient_list, from_email=None, html_message=None):
+    """
+    encolar_correo es una función equivalente a :func:`django.core.mail.send_mail` que, en lugar de enviar el correo,
+    lo registra en la bandeja de salida (:class:`api.models.CorreoSaliente`) para que el comando ``enviar_correos``
+    lo envíe fuera del ciclo de la solicitud.
+
+    :param subject: Asunto del correo.
+    :param message: Cuerpo en texto plano del correo.
+    :param recipient_list: Lista de destinatarios.
+    :param from_email: Remitente (opcional, por defecto ``DEFAULT_FROM_EMAIL``).
+    :param html_message: Cuerpo HTML del correo (opcional).
+    :return: El modelo :class:`api.models.CorreoSaliente` creado.
+    """
+    correo, = encolar_correos([{
+        'subject': subject,
+        'message': message,
+        'recipient_list': recipient_list,
+        'from_email': from_email,
+        'html_message': html_message,
+    }])
+    return correo
+
+
+def encolar_correos(correos, batch_size=1000):
+    """
+    encolar_correos es la versión en lote de :func:`encolar_correo`, que registra todos los correos con
+    ``bulk_create``.
+
+    :param correos: Lista de diccionarios con los argumentos de :func:`encolar_correo`.
+    :param batch_size: Cantidad de filas por inserción.
+    :return: Lista de :class:`api.models.CorreoSaliente` creados.
+    """
+    return CorreoSaliente.objects.bulk_create([
+        CorreoSaliente(
+            asunto=correo['subject'],
+            mensaje=correo['message'],
+            mensaje_html=correo.get('html_message'),
+            remitente=correo.get('from_email'),
+            destinatarios=list(correo['recipient_list'])
+        )
+        for correo in correos
+    ], batch_size=batch_size)
+
+
+def espera_reintento(intentos):
+    """
+    Función que calcula la espera exponencial antes del siguiente intento de envío.
+
+    :param intentos: Cantidad de intentos realizados.
+    :return: Objeto :class:`timedelta` con la espera.
+    """
+    return timedelta(seconds=min(ESPERA_BASE * 2 ** (intentos - 1), ESPERA_MAXIMA))
+
+
+def construir_mensaje(correo, connection):
+    """
+    Función que construye el mensaje de Django a partir de un :class:`api.models.CorreoSaliente`.
+
+    :param correo: Correo de la bandeja de salida.
+    :param connection: Conexión de correo con la que se enviará.
+    :return: Objeto :class:`EmailMultiAlternatives`.
+    """
+    mensaje = EmailMultiAlternatives(
+        subject=correo.asunto,
+        body=correo.mensaje,
+        from_email=correo.remitente,
+        to=correo.destinatarios,
+        connection=connection
+    )
+    if correo.mensaje_html:
+        mensaje.attach_alternative(correo.mensaje_html, 'text/html')
+    return mensaje
+
+
+def procesar_correos(connection=None, batch_size=50, max_intentos=5):
+    """
+    procesar_correos es una función que envía un lote de correos pendientes reutilizando una misma conexión SMTP.
+    Las filas se bloquean con ``SELECT ... FOR UPDATE SKIP LOCKED``, por lo que se pueden ejecutar varios procesos de
+    envío en paralelo. Los correos con error se reprograman con espera exponencial hasta ``max_intentos``, y luego
+    quedan en estado fallido.
+
+    :param connection: Conexión de correo administrada por quien llama, que se mantiene abierta entre lotes
+        (opcional, por defecto se abre y cierra una conexión para el lote).
+    :param batch_size: Cantidad máxima de correos a enviar.
+    :param max_intentos: Cantidad máxima de intentos por correo.
+    :return: Tupla con la cantidad de correos enviados y con error.
+    """
+    enviados = errores = 0
+    with transaction.atomic():
+        lote = list(
+            CorreoSaliente.objects.select_for_update(skip_locked=True).filter(
+                estado=CorreoSaliente.Estado.PENDIENTE,
+                siguiente_intento__lte=timezone.now()
+            ).order_by('siguiente_intento')[:batch_size]
+        )
+        if not lote:
+            return enviados, errores
+
+        conexion_propia = connection is None
+        connection = connection or get_connection()
+        connection.open()
+        for correo in lote:
+            correo.intentos += 1
+            try:
+                connection.send_messages([construir_mensaje(correo, connection)])
+            except Exception as error:
+                errores += 1
+                correo.ultimo_error = str(error)
+                if correo.intentos >= max_intentos:
+                    correo.estado = CorreoSaliente.Estado.FALLIDO
+                else:
+                    correo.siguiente_intento = timezone.now() + espera_reintento(correo.intentos)
+                # La conexión puede haber quedado inválida, se reabre para el resto del lote
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+            else:
+                enviados += 1
+                correo.estado = CorreoSaliente.Estado.ENVIADO
+                correo.fecha_envio = timezone.now()
+                correo.ultimo_error = None
+            correo.modified = timezone.now()
+        CorreoSaliente.objects.bulk_update(
+            lote, ['estado', 'intentos', 'siguiente_intento', 'ultimo_error', 'fecha_envio', 'modified']
+        )
+        if conexion_propia:
+            connection.close()
+    return enviados, errores
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class CreatedCursorPagination(CursorPagination):
+    """
+    La clase CreatedCursorPagination es la paginación por cursor (*keyset*) para las tablas grandes del sistema. A
+    diferencia de la paginación por número de página, no ejecuta ``COUNT`` ni ``OFFSET``: cada página filtra a partir
+    del último valor de ``ordering`` visto, por lo que su costo depende solo del tamaño de página.
+
+    El cursor guarda la posición según el primer campo del orden y, para las filas con el mismo valor, cuántas ya se
+    entregaron; por eso el orden termina siempre en la llave primaria, que lo hace determinístico aunque el primer
+    campo se repita (también cuando el orden viene del parámetro ``ordering`` del ViewSet).
+
+    :param page_size: Cantidad de elementos por página por defecto.
+    :param page_size_query_param: Parámetro de consulta para cambiar el tamaño de página.
+    :param max_page_size: Tamaño de página máximo permitido.
+    :param ordering: Campos por los cuales se ordena y construye el cursor, terminando en la llave primaria.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-created', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        if not {'id', '-id', 'pk', '-pk'}.intersection(ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('page_size', self.page_size),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['page_size'] = {'type': 'integer', 'example': self.page_size}
+        return response_schema
+
+
+class IdCursorPagination(CreatedCursorPagination):
+    """
+    Paginación por cursor sobre la clave primaria, para listados en orden de registro.
+    """
+    ordering = 'id'
+
+
+class FechaModificacionCursorPagination(CreatedCursorPagination):
+    """
+    Paginación por cursor sobre ``fecha_modificacion``, usada por :class:`api.models.TicketLog`.
+    """
+    ordering = ('-fecha_modificacion', '-id')
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+
+from api import models
+from api.catalogs import get_catalog_version
+
+# Segundos que se mantiene en cache el perfil de un colaborador (se invalida antes ante cualquier cambio)
+PROFILE_TIMEOUT = 60 * 60
+
+
+def profile_cache_key(user_id):
+    """
+    Función que construye la llave del perfil de un usuario en el cache de Django. La llave incluye la versión de los
+    catálogos, ya que el perfil contiene datos de catálogos (por ejemplo el nombre del cargo).
+
+    :param user_id: Id del usuario.
+    :return: Cadena de texto con la llave.
+    """
+    return f'api:perfil:{get_catalog_version()}:{user_id}'
+
+
+def load_colaborador(user):
+    """
+    Función que carga el :class:`api.models.Colaborador` de un usuario con su último contrato, datos organizacionales
+    y cargo. Para un colaborador con contrato basta una sola consulta, que parte desde el último contrato; solo si no
+    tiene contratos se consulta el colaborador por separado.
+
+    :param user: Usuario ya cargado, que se reutiliza como ``colaborador.usuario``.
+    :return: Objeto :class:`api.models.Colaborador` listo para :class:`api.serializers.ColaboradorSerializer`.
+    """
+    contrato = models.DatosContractuales.objects.select_related(
+        'colaborador', 'organizacion__cargo'
+    ).filter(colaborador__usuario_id=user.pk).order_by('-fecha_inicio', '-pk').first()
+    if contrato is None:
+        colaborador = models.Colaborador.objects.get(usuario_id=user.pk)
+        colaborador.prefetched_last_contrato = []
+    else:
+        colaborador = contrato.colaborador
+        colaborador.prefetched_last_contrato = [contrato]
+    colaborador.usuario = user
+    return colaborador
+
+
+def get_colaborador_profile(user):
+    """
+    Función que retorna el perfil serializado del colaborador de un usuario, desde el cache si está disponible. El
+    perfil se guarda también en el objeto del usuario, por lo que en un login (que lo usa al crear el token y en la
+    respuesta) se obtiene una sola vez.
+
+    :param user: Usuario autenticado.
+    :return: Diccionario con los datos de :class:`api.serializers.ColaboradorSerializer`.
+    """
+    # Importación local para evitar la dependencia circular con api.serializers
+    from api.serializers import ColaboradorSerializer
+
+    perfil = getattr(user, '_perfil_colaborador', None)
+    if perfil is not None:
+        return perfil
+    key = profile_cache_key(user.pk)
+    perfil = cache.get(key)
+    if perfil is None:
+        perfil = dict(ColaboradorSerializer(load_colaborador(user)).data)
+        cache.set(key, perfil, PROFILE_TIMEOUT)
+    user._perfil_colaborador = perfil
+    return perfil
+
+
+def invalidate_profiles(user_ids):
+    """
+    Función que elimina del cache los perfiles de los usuarios indicados.
+
+    :param user_ids: Lista de ids de usuarios.
+    """
+    cache.delete_many([profile_cache_key(user_id) for user_id in user_ids if user_id is not None])
+
+
+def invalidate_user_profile(sender, instance, **kwargs):
+    """
+    Función receptora de señales de :class:`users.models.CustomUser`. Se ignoran los guardados que no tocan el correo,
+    como la actualización de ``last_login`` en cada login.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'email' in update_fields:
+        invalidate_profiles([instance.pk])
+
+
+def invalidate_colaborador_profile(sender, instance, **kwargs):
+    """
+    Función receptora de señales de :class:`api.models.Colaborador`.
+    """
+    invalidate_profiles([instance.usuario_id])
+
+
+def invalidate_contrato_profile(sender, instance, **kwargs):
+    """
+    Función receptora de señales de :class:`api.models.DatosContractuales`.
+    """
+    invalidate_profiles(
+        models.Colaborador.objects.filter(pk=instance.colaborador_id).values_list('usuario_id', flat=True)
+    )
+
+
+def invalidate_organizacion_profile(sender, instance, **kwargs):
+    """
+    Función receptora de señales de :class:`api.models.DatosOrganizacionales`.
+    """
+    invalidate_profiles(
+        models.DatosContractuales.objects.filter(
+            pk=instance.datos_contractuales_id
+        ).values_list('colaborador__usuario_id', flat=True)
+    )
@@ -0,0 +1,534 @@
+import asyncio
+import json
+import os
+import re
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+from http import HTTPStatus
+from operator import attrgetter
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Value
+from django.db.models.functions import Now
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from api import models
+from api.authentication import StatelessJWTAuthentication
+from api.downloads import can_view_all_tickets, ticket_participation
+from api.ticket_history import user_colaborador_id
+
+# Ruta de los eventos de un ticket: WebSocket (ws://.../tiempo-real/tickets/<id>/) o SSE (GET con text/event-stream)
+RUTA_TIEMPO_REAL = re.compile(r'^/tiempo-real/tickets/(?P<ticket_id>\d+)/$')
+
+# Eventos pendientes por conexión; una conexión que no alcanza a leerlos se cierra y el cliente debe reconectarse
+EVENTOS_MAX_PENDIENTES = 100
+
+# Segundos entre comentarios de SSE, para que los proxies no cierren la conexión inactiva
+SSE_KEEPALIVE = 15
+
+# Canal de PostgreSQL de PostgresBroker y tamaño máximo de su payload (el límite de NOTIFY es 8000 bytes)
+PG_CANAL = 'api_tiempo_real'
+PG_MAX_PAYLOAD = 7900
+
+# Segundos de validez de las filas de SuscripcionTiempoReal de un proceso, entre sus renovaciones y que los demás
+# procesos reutilizan la lista de canales con interesados (ver PostgresBroker)
+INTERES_TTL = 30
+INTERES_RENOVACION = 10
+INTERES_CACHE = 2
+
+# Códigos de cierre de WebSocket según el estado HTTP equivalente (4000 + estado)
+WS_CIERRE_DESBORDE = 4008
+
+
+def ticket_channel(ticket_id):
+    """
+    Función que construye el nombre del canal de eventos de un ticket.
+    """
+    return f'ticket:{ticket_id}'
+
+
+class Subscription:
+    """
+    La clase Subscription es la cola de eventos de una conexión, asociada al *event loop* que la atiende. Los eventos
+    se pueden entregar desde cualquier hilo; si la cola se llena la suscripción queda desbordada y la conexión se
+    cierra, en lugar de acumular eventos en memoria.
+    """
+
+    def __init__(self, canal, loop, max_pendientes=EVENTOS_MAX_PENDIENTES):
+        self.canal = canal
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pendientes)
+        self.desbordada = False
+
+    def put(self, evento):
+        try:
+            self.loop.call_soon_threadsafe(self._put, evento)
+        except RuntimeError:
+            # El event loop ya terminó
+            pass
+
+    def _put(self, evento):
+        try:
+            self.queue.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+
+class InProcessBroker:
+    """
+    La clase InProcessBroker distribuye los eventos entre las conexiones del mismo proceso. Sirve cuando la API y los
+    canales en tiempo real corren en un único proceso ASGI; con varios procesos (o con la API bajo WSGI) se debe usar
+    :class:`PostgresBroker` u otro broker con la misma interfaz (``subscribe``, ``unsubscribe``, ``publish`` y
+    ``has_subscribers``), configurado en ``settings.TIEMPO_REAL_BROKER``.
+    """
+
+    def __init__(self):
+        self._suscripciones = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, canal):
+        """
+        Función que suscribe al canal a quien la llama, desde el *event loop* de la conexión.
+
+        :param canal: Nombre del canal (ver :func:`ticket_channel`).
+        :return: Objeto :class:`Subscription`.
+        """
+        suscripcion = Subscription(canal, asyncio.get_event_loop())
+        with self._lock:
+            self._suscripciones[canal].add(suscripcion)
+        return suscripcion
+
+    def unsubscribe(self, suscripcion):
+        with self._lock:
+            suscripciones = self._suscripciones.get(suscripcion.canal)
+            if suscripciones is not None:
+                suscripciones.discard(suscripcion)
+                if not suscripciones:
+                    del self._suscripciones[suscripcion.canal]
+
+    def has_subscribers(self, canal):
+        """
+        Función que indica si conviene construir los eventos del canal: ``False`` solo si se sabe que nadie los
+        recibirá.
+        """
+        return canal in self._suscripciones
+
+    def publish(self, canal, evento):
+        """
+        Función que publica un evento en el canal. Se puede llamar desde cualquier hilo.
+
+        :param canal: Nombre del canal.
+        :param evento: Diccionario serializable como JSON.
+        """
+        self.deliver(canal, evento)
+
+    def deliver(self, canal, evento):
+        with self._lock:
+            suscripciones = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscripciones:
+            suscripcion.put(evento)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    La clase PostgresBroker distribuye los eventos entre procesos con ``NOTIFY``/``LISTEN`` de PostgreSQL, sin
+    servicios adicionales. Cada proceso con conexiones abiertas mantiene un hilo que escucha :data:`PG_CANAL` con una
+    conexión propia y entrega los eventos a sus suscriptores. Los eventos que superan el límite de ``NOTIFY`` se
+    envían sin ``datos``, y el cliente los obtiene de la API.
+
+    El mismo hilo registra los canales del proceso en :class:`api.models.SuscripcionTiempoReal` (al cambiar y cada
+    :data:`INTERES_RENOVACION` segundos), y los procesos que escriben solo serializan y notifican los eventos de los
+    canales registrados, leídos en una consulta cada :data:`INTERES_CACHE` segundos. Una conexión nueva en otro
+    proceso puede no recibir los eventos de esos primeros segundos, por lo que el cliente debe leer el estado del
+    ticket desde la API después de conectarse.
+    """
+
+    def __init__(self, alias='default'):
+        super().__init__()
+        self.alias = alias
+        self.proceso = uuid.uuid4().hex
+        self._escucha = None
+        self._registrados = set()
+        self._interes = (None, frozenset())
+        # Tubería para despertar al hilo de escucha cuando cambian los canales del proceso
+        self._despertar, self._aviso = os.pipe()
+        os.set_blocking(self._aviso, False)
+
+    def subscribe(self, canal):
+        suscripcion = super().subscribe(canal)
+        with self._lock:
+            if self._escucha is None or not self._escucha.is_alive():
+                self._escucha = threading.Thread(target=self.listen, name='tiempo-real-listen', daemon=True)
+                self._escucha.start()
+            nuevo = canal not in self._registrados
+        if nuevo:
+            try:
+                os.write(self._aviso, b'.')
+            except BlockingIOError:
+                # El hilo ya tiene avisos pendientes
+                pass
+        return suscripcion
+
+    def has_subscribers(self, canal):
+        """
+        Función que indica si el canal tiene suscriptores en este proceso o registrados por otro (ver
+        :class:`api.models.SuscripcionTiempoReal`).
+        """
+        if canal in self._suscripciones:
+            return True
+        leido, canales = self._interes
+        if leido is None or time.monotonic() - leido >= INTERES_CACHE:
+            canales = frozenset(models.SuscripcionTiempoReal.objects.filter(
+                expira__gt=Now()
+            ).values_list('canal', flat=True).distinct())
+            self._interes = (time.monotonic(), canales)
+        return canal in canales
+
+    def register_interest(self, conexion, canales):
+        """
+        Función que reemplaza los canales registrados por este proceso, renovando su expiración, y elimina las filas
+        expiradas de procesos terminados.
+
+        :param conexion: Conexión de psycopg2 en modo *autocommit*.
+        :param canales: Conjunto de nombres de canales con suscriptores en el proceso.
+        """
+        tabla = models.SuscripcionTiempoReal._meta.db_table
+        with conexion.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {tabla} WHERE proceso = %s AND NOT (canal = ANY(%s))', [self.proceso, list(canales)]
+            )
+            if canales:
+                cursor.execute(
+                    f'INSERT INTO {tabla} (canal, proceso, expira) '
+                    f'SELECT canal, %s, now() + make_interval(secs => %s) FROM unnest(%s::varchar[]) AS canal '
+                    f'ON CONFLICT (canal, proceso) DO UPDATE SET expira = EXCLUDED.expira',
+                    [self.proceso, INTERES_TTL, list(canales)]
+                )
+            cursor.execute(f'DELETE FROM {tabla} WHERE expira < now()')
+        self._registrados = set(canales)
+
+    def publish(self, canal, evento):
+        payload = json.dumps({'canal': canal, 'evento': evento}, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > PG_MAX_PAYLOAD:
+            payload = json.dumps({'canal': canal, 'evento': {**evento, 'datos': None}}, cls=DjangoJSONEncoder)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [PG_CANAL, payload])
+
+    def listen(self):
+        """
+        Función del hilo de escucha: registra los canales del proceso, reconecta ante errores y termina cuando el
+        proceso no tiene suscriptores.
+        """
+        wrapper = connections[self.alias]
+        while True:
+            conexion = None
+            try:
+                conexion = wrapper.get_new_connection(wrapper.get_connection_params())
+                conexion.autocommit = True
+                with conexion.cursor() as cursor:
+                    cursor.execute(f'LISTEN {PG_CANAL}')
+                renovado = None
+                while True:
+                    listos = select.select([conexion, self._despertar], [], [], 5)[0]
+                    if self._despertar in listos:
+                        os.read(self._despertar, 1024)
+                    if conexion in listos:
+                        conexion.poll()
+                        while conexion.notifies:
+                            mensaje = json.loads(conexion.notifies.pop(0).payload)
+                            self.deliver(mensaje['canal'], mensaje['evento'])
+                    with self._lock:
+                        canales = set(self._suscripciones)
+                    if (canales != self._registrados or renovado is None
+                            or time.monotonic() - renovado >= INTERES_RENOVACION):
+                        self.register_interest(conexion, canales)
+                        renovado = time.monotonic()
+                    if not canales:
+                        with self._lock:
+                            # Una suscripción nueva durante el registro se registra en la vuelta siguiente
+                            if not self._suscripciones:
+                                self._escucha = None
+                                return
+            except Exception:
+                self._registrados = set()
+                time.sleep(1)
+            finally:
+                if conexion is not None:
+                    conexion.close()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """
+    Función que retorna el broker del proceso, de la clase indicada en ``settings.TIEMPO_REAL_BROKER`` (por defecto
+    :class:`InProcessBroker`).
+    """
+    return import_string(getattr(settings, 'TIEMPO_REAL_BROKER', 'api.realtime.InProcessBroker'))()
+
+
+def event_sources():
+    """
+    Función que retorna, por modelo, el tipo de evento, el serializador y cómo obtener el id del ticket.
+    """
+    # Importación local para evitar la dependencia circular con api.serializers
+    from api import serializers
+
+    return {
+        models.Mensaje: ('mensaje', serializers.MensajeSerializer, attrgetter('ticket_id')),
+        models.ArchivoMensaje: ('archivo_mensaje', serializers.ArchivoMensajeSerializer, archivo_ticket_id),
+        models.TicketLog: ('ticket_log', serializers.TicketLogSerializer, attrgetter('ticket_id')),
+    }
+
+
+def archivo_ticket_id(instance):
+    if 'mensaje' in instance._state.fields_cache:
+        return instance.mensaje.ticket_id
+    return models.Mensaje.objects.filter(pk=instance.mensaje_id).values_list('ticket_id', flat=True).first()
+
+
+def publish_event(instance, accion):
+    """
+    Función que publica el evento de un objeto en el canal de su ticket cuando la transacción actual se confirma, por
+    lo que nunca se publican cambios revertidos. El objeto se serializa en el momento del cambio, y solo si el canal
+    tiene suscriptores (ver ``has_subscribers``).
+
+    :param instance: Instancia de :class:`api.models.Mensaje`, :class:`api.models.ArchivoMensaje` o
+        :class:`api.models.TicketLog`.
+    :param accion: ``creado``, ``actualizado`` o ``eliminado``.
+    """
+    tipo, serializer_class, get_ticket_id = event_sources()[type(instance)]
+    ticket_id = get_ticket_id(instance)
+    if ticket_id is None:
+        return
+    broker = get_broker()
+    canal = ticket_channel(ticket_id)
+    if not broker.has_subscribers(canal):
+        return
+    evento = {
+        'tipo': tipo,
+        'accion': accion,
+        'ticket': ticket_id,
+        'id': instance.pk,
+        'datos': None if accion == 'eliminado' else serializer_class(instance).data,
+    }
+    # Se normaliza a JSON para que el evento no dependa del objeto ni de la transacción
+    evento = json.loads(json.dumps(evento, cls=DjangoJSONEncoder))
+    transaction.on_commit(lambda: broker.publish(canal, evento))
+
+
+def publish_saved(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.Mensaje`, :class:`api.models.ArchivoMensaje` y
+    :class:`api.models.TicketLog` que publica el evento en el canal del ticket.
+    """
+    if not raw:
+        publish_event(instance, 'creado' if created else 'actualizado')
+
+
+def publish_deleted(sender, instance, **kwargs):
+    """
+    Receptor de ``post_delete`` de :class:`api.models.Mensaje` y :class:`api.models.ArchivoMensaje` que publica la
+    eliminación en el canal del ticket.
+    """
+    publish_event(instance, 'eliminado')
+
+
+def publish_bulk_saved(sender, instances, **kwargs):
+    """
+    Receptor de :data:`api.bulk.bulk_saved` de :class:`api.models.TicketLog` que publica los eventos del lote.
+    """
+    for instance in instances:
+        publish_event(instance, 'creado')
+
+
+def ticket_access(token, ticket_id):
+    """
+    Función que autentica un token JWT y verifica que su usuario pueda ver el ticket, con las mismas reglas que la
+    descarga de archivos (ver :func:`api.downloads.can_view_all_tickets`).
+
+    :param token: Token de acceso.
+    :param ticket_id: Id del ticket.
+    :return: Tupla con el estado HTTP equivalente y la expiración del token (timestamp).
+    """
+    close_old_connections()
+    try:
+        autenticacion = StatelessJWTAuthentication() if settings.STATELESS_JWT_AUTH else JWTAuthentication()
+        try:
+            validado = autenticacion.get_validated_token(token)
+            user = autenticacion.get_user(validado)
+        except (InvalidToken, AuthenticationFailed):
+            return 401, None
+        tickets = models.Ticket.objects.filter(pk=ticket_id)
+        if can_view_all_tickets(user):
+            tickets = tickets.annotate(autorizado=Value(True, output_field=BooleanField()))
+        else:
+            colaborador_id = user_colaborador_id(user)
+            if colaborador_id is None:
+                return 403, None
+            tickets = tickets.annotate(autorizado=ExpressionWrapper(
+                ticket_participation(colaborador_id), output_field=BooleanField()
+            ))
+        # La participación es NULL (no falsa) si el ticket no tiene validador
+        ticket = tickets.values_list('pk', 'autorizado').first()
+        if ticket is None:
+            return 404, None
+        return (200 if ticket[1] else 403), validado.get('exp')
+    finally:
+        close_old_connections()
+
+
+def request_token(scope):
+    """
+    Función que obtiene el token de acceso de la conexión: del encabezado ``Authorization: Bearer <token>`` o, para
+    los clientes de navegador que no pueden enviar encabezados (``WebSocket`` y ``EventSource``), del parámetro
+    ``?token=``.
+    """
+    for nombre, valor in scope.get('headers', []):
+        if nombre == b'authorization':
+            partes = valor.decode('latin1').split()
+            if len(partes) == 2 and partes[0].lower() == 'bearer':
+                return partes[1]
+    tokens = parse_qs(scope.get('query_string', b'').decode()).get('token')
+    return tokens[0] if tokens else None
+
+
+async def wait_disconnect(receive, tipo):
+    while (await receive())['type'] != tipo:
+        pass
+
+
+async def next_event(suscripcion, desconexion, timeout):
+    """
+    Función que espera el siguiente evento de la suscripción, la desconexión del cliente o ``timeout`` segundos.
+
+    :return: El evento, o ``None`` si no hubo evento.
+    """
+    lectura = asyncio.ensure_future(suscripcion.queue.get())
+    await asyncio.wait({lectura, desconexion}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    if lectura.done():
+        return lectura.result()
+    lectura.cancel()
+    return None
+
+
+async def websocket_events(scope, receive, send, ticket_id):
+    """
+    Aplicación ASGI del canal WebSocket de un ticket. El servidor solo envía eventos (un JSON por mensaje); los
+    mensajes del cliente se ignoran. Se cierra con código ``4000 + estado`` si el token no es válido (``4401``), no
+    tiene acceso (``4403``) o el ticket no existe (``4404``), cuando el token expira (``4401``) y cuando el cliente no
+    alcanza a leer los eventos (:data:`WS_CIERRE_DESBORDE`).
+    """
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    estado, expira = await sync_to_async(ticket_access)(request_token(scope), ticket_id)
+    # Se acepta antes de cerrar para que el cliente reciba el código de cierre (un rechazo llega como HTTP 403)
+    await send({'type': 'websocket.accept'})
+    if estado != 200:
+        await send({'type': 'websocket.close', 'code': 4000 + estado})
+        return
+
+    broker = get_broker()
+    suscripcion = broker.subscribe(ticket_channel(ticket_id))
+    desconexion = asyncio.ensure_future(wait_disconnect(receive, 'websocket.disconnect'))
+    try:
+        while not desconexion.done():
+            restante = expira - time.time() if expira else None
+            if restante is not None and restante <= 0:
+                await send({'type': 'websocket.close', 'code': 4401})
+                break
+            evento = await next_event(suscripcion, desconexion, restante)
+            if suscripcion.desbordada:
+                await send({'type': 'websocket.close', 'code': WS_CIERRE_DESBORDE})
+                break
+            if evento is not None:
+                await send({'type': 'websocket.send', 'text': json.dumps(evento)})
+    finally:
+        broker.unsubscribe(suscripcion)
+        desconexion.cancel()
+
+
+async def sse_events(scope, receive, send, ticket_id):
+    """
+    Aplicación ASGI del canal SSE (``text/event-stream``) de un ticket, para clientes sin WebSocket. Cada evento se
+    envía con su tipo como ``event`` y el JSON como ``data``. La respuesta termina cuando el token expira o el cliente
+    no alcanza a leer los eventos; ``EventSource`` se reconecta automáticamente.
+    """
+    estado, expira = await sync_to_async(ticket_access)(request_token(scope), ticket_id)
+    if estado != 200:
+        await send({
+            'type': 'http.response.start', 'status': estado, 'headers': [(b'content-type', b'application/json')]
+        })
+        await send({'type': 'http.response.body', 'body': json.dumps({'detail': HTTPStatus(estado).phrase}).encode()})
+        return
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # nginx no debe acumular la respuesta
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': b': conectado\n\n', 'more_body': True})
+
+    broker = get_broker()
+    suscripcion = broker.subscribe(ticket_channel(ticket_id))
+    desconexion = asyncio.ensure_future(wait_disconnect(receive, 'http.disconnect'))
+    try:
+        while not desconexion.done():
+            restante = expira - time.time() if expira else SSE_KEEPALIVE
+            if restante <= 0 or suscripcion.desbordada:
+                break
+            evento = await next_event(suscripcion, desconexion, min(restante, SSE_KEEPALIVE))
+            if evento is not None:
+                cuerpo = f'event: {evento["tipo"]}\ndata: {json.dumps(evento)}\n\n'
+            else:
+                cuerpo = ': ping\n\n'
+            if not desconexion.done():
+                await send({'type': 'http.response.body', 'body': cuerpo.encode(), 'more_body': True})
+        if not desconexion.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        broker.unsubscribe(suscripcion)
+        desconexion.cancel()
+
+
+def realtime_application(django_application):
+    """
+    Función que envuelve la aplicación ASGI de Django con los canales en tiempo real de :data:`RUTA_TIEMPO_REAL`:
+    WebSocket y SSE (``GET``). El resto de las solicitudes HTTP las atiende Django, y las conexiones WebSocket a otras
+    rutas se rechazan.
+
+    Ejemplo:
+    ::
+        const socket = new WebSocket(`wss://host/tiempo-real/tickets/${id}/?token=${access}`);
+        socket.onmessage = (mensaje) => console.log(JSON.parse(mensaje.data));
+
+    :param django_application: Aplicación de :func:`django.core.asgi.get_asgi_application`.
+    :return: Aplicación ASGI.
+    """
+
+    async def application(scope, receive, send):
+        coincidencia = RUTA_TIEMPO_REAL.match(scope.get('path', ''))
+        if scope['type'] == 'websocket':
+            if coincidencia is None:
+                await receive()
+                await send({'type': 'websocket.close', 'code': 4404})
+                return
+            return await websocket_events(scope, receive, send, int(coincidencia.group('ticket_id')))
+        if scope['type'] == 'http' and coincidencia is not None and scope['method'] == 'GET':
+            return await sse_events(scope, receive, send, int(coincidencia.group('ticket_id')))
+        return await django_application(scope, receive, send)
+
+    return application
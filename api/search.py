@@ -0,0 +1,237 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import Case, CharField, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Concat, Greatest, Replace
+from django.db.models.lookups import PostgresOperatorLookup
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api import models
+
+# Configuración de búsqueda de PostgreSQL usada por los triggers de search_vector (ver migración 0005)
+SEARCH_CONFIG = 'spanish'
+
+# Caracteres escapados en los fragmentos de los resultados, igual que django.utils.html.escape
+HTML_ESCAPES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')]
+
+# Cantidad de resultados por defecto y máxima de una búsqueda
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Cantidad de sugerencias por defecto y máxima del autocompletado de colaboradores
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+# Campos de nombre comparados por trigramas en el autocompletado de colaboradores
+TYPEAHEAD_NAME_FIELDS = ['nombre', 'apellido_paterno', 'apellido_materno']
+
+
+class TrigramWordSimilar(PostgresOperatorLookup):
+    """
+    Lookup ``<campo>__trigram_word_similar=<texto>`` que usa el operador ``%>`` de ``pg_trgm``: el texto es similar a
+    alguna parte del campo (por ejemplo ``'Maldo'`` y ``'Maldonado'``). A diferencia de ``icontains``, que genera
+    ``UPPER(campo) LIKE``, este operador usa los índices ``gin_trgm_ops`` del campo.
+    """
+    lookup_name = 'trigram_word_similar'
+    postgres_operator = '%%>'
+
+
+CharField.register_lookup(TrigramWordSimilar)
+
+
+def build_search_query(texto):
+    """
+    Función que construye la consulta de texto completo con la sintaxis de buscadores web (``"frase exacta"``,
+    ``or``, ``-excluir``).
+
+    :param texto: Texto ingresado por el usuario.
+    :return: Objeto :class:`SearchQuery`.
+    """
+    return SearchQuery(texto, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def escape_html(campo):
+    """
+    Función que construye la expresión SQL que escapa el HTML de un campo de texto (ver :data:`HTML_ESCAPES`).
+
+    :param campo: Nombre del campo.
+    :return: Expresión de texto.
+    """
+    expresion = F(campo)
+    for caracter, entidad in HTML_ESCAPES:
+        expresion = Replace(expresion, Value(caracter), Value(entidad))
+    return expresion
+
+
+def search_headline(query):
+    """
+    Función que construye el fragmento de la descripción con las coincidencias de ``query`` marcadas con ``<mark>``.
+    La descripción se escapa antes de marcarla, por lo que el fragmento es HTML seguro: el único marcado es
+    ``<mark>``.
+
+    :param query: Objeto :class:`SearchQuery`.
+    :return: Objeto :class:`SearchHeadline`.
+    """
+    return SearchHeadline(
+        escape_html('descripcion'),
+        query,
+        config=SEARCH_CONFIG,
+        start_sel='<mark>',
+        stop_sel='</mark>',
+        max_fragments=2,
+        min_words=10,
+        max_words=30
+    )
+
+
+def annotate_search(queryset, query):
+    """
+    Función que agrega al QuerySet la relevancia (``rank``) y un fragmento de la descripción con las coincidencias
+    marcadas con ``<mark>`` (``snippet``), ordenando por relevancia.
+
+    :param queryset: QuerySet de un modelo con ``search_vector`` y ``descripcion``.
+    :param query: Objeto :class:`SearchQuery`.
+    :return: QuerySet anotado y ordenado.
+    """
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), query),
+        snippet=search_headline(query)
+    ).order_by('-rank', '-created')
+
+
+def search_tickets(queryset, texto):
+    """
+    Función que busca tickets por asunto y descripción, o por el asunto y descripción de sus mensajes. Los tickets
+    encontrados se obtienen como la unión (``UNION``) de los que coinciden directamente y de los que tienen algún
+    mensaje que coincide, de modo que cada conjunto use el índice GIN de su tabla. La relevancia es la mayor entre la
+    del ticket y la de su mensaje más relevante; si el ticket solo coincide por sus mensajes, el fragmento
+    (``snippet``) es el de ese mensaje.
+
+    :param queryset: QuerySet de :class:`api.models.Ticket`.
+    :param texto: Texto a buscar.
+    :return: QuerySet anotado con ``rank`` y ``snippet``.
+    """
+    query = build_search_query(texto)
+    mensajes = models.Mensaje.objects.filter(search_vector=query)
+    encontrados = models.Ticket.objects.filter(search_vector=query).values('pk').union(mensajes.values('ticket'))
+    mejor_mensaje = mensajes.filter(ticket=OuterRef('pk')).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', '-created')
+
+    return queryset.filter(pk__in=encontrados).annotate(
+        rank=Greatest(
+            SearchRank(F('search_vector'), query),
+            Coalesce(Subquery(mejor_mensaje.values('rank')[:1]), Value(0.0), output_field=FloatField())
+        ),
+        snippet=Case(
+            When(search_vector=query, then=search_headline(query)),
+            default=Subquery(mejor_mensaje.annotate(snippet=search_headline(query)).values('snippet')[:1]),
+            output_field=CharField()
+        )
+    ).order_by('-rank', '-created')
+
+
+def search_mensajes(queryset, texto):
+    """
+    Función que busca mensajes por asunto y descripción.
+
+    :param queryset: QuerySet de :class:`api.models.Mensaje`.
+    :param texto: Texto a buscar.
+    :return: QuerySet anotado con ``rank`` y ``snippet``.
+    """
+    query = build_search_query(texto)
+    return annotate_search(queryset.filter(search_vector=query), query)
+
+
+def parse_limit(valor, default, maximo):
+    """
+    Función que interpreta el parámetro ``limit`` de una búsqueda, acotándolo entre 1 y ``maximo``.
+
+    :param valor: Valor recibido (puede ser ``None``).
+    :param default: Valor por defecto si no se recibe o no es un número.
+    :param maximo: Valor máximo permitido.
+    :return: Número entero con el límite.
+    """
+    try:
+        return max(min(int(valor), maximo), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_run(texto):
+    """
+    Función que retorna el RUN sin puntos, guion ni espacios y en mayúsculas, o ``None`` si el texto no tiene forma
+    de RUN (solo dígitos y un posible dígito verificador K).
+
+    :param texto: Texto ingresado por el usuario.
+    :return: Cadena de texto normalizada o ``None``.
+    """
+    normalizado = texto.replace('.', '').replace('-', '').replace(' ', '').upper()
+    if normalizado and normalizado.rstrip('K').isdigit():
+        return normalizado
+    return None
+
+
+def typeahead_colaboradores(texto, limit=TYPEAHEAD_LIMIT):
+    """
+    Función que retorna sugerencias de colaboradores por nombre, apellidos o RUN. Un texto con forma de RUN se busca
+    por prefijo; en otro caso cada palabra debe ser similar por trigramas a una parte del nombre o de alguno de los
+    apellidos (ver :class:`TrigramWordSimilar`), y los resultados se ordenan por similitud con el nombre completo.
+    Ambas búsquedas usan índices de :class:`api.models.Colaborador`.
+
+    :param texto: Texto ingresado por el usuario.
+    :param limit: Cantidad máxima de sugerencias.
+    :return: Lista de diccionarios con ``id``, ``full_name`` y ``run``.
+    """
+    queryset = models.Colaborador.objects.all()
+    run = normalize_run(texto)
+    if run is not None:
+        queryset = queryset.filter(run__startswith=run).order_by('run')
+    else:
+        for palabra in texto.split():
+            condicion = Q()
+            for campo in TYPEAHEAD_NAME_FIELDS:
+                condicion |= Q(**{f'{campo}__trigram_word_similar': palabra})
+            queryset = queryset.filter(condicion)
+        nombre_completo = Concat('nombre', Value(' '), 'apellido_paterno', Value(' '), 'apellido_materno')
+        queryset = queryset.annotate(
+            similitud=TrigramSimilarity(nombre_completo, texto)
+        ).order_by('-similitud', 'apellido_paterno', 'pk')
+
+    return [
+        {
+            'id': colaborador['id'],
+            'full_name': f"{colaborador['nombre']} {colaborador['apellido_paterno']} {colaborador['apellido_materno']}",
+            'run': colaborador['run'],
+        }
+        for colaborador in queryset.values('id', 'nombre', 'apellido_paterno', 'apellido_materno', 'run')[:limit]
+    ]
+
+
+class SearchMixin:
+    """
+    La clase SearchMixin es un *mixin* para ViewSets que agrega la ruta ``buscar/?q=<texto>&limit=<n>``, con los
+    resultados de ``search_function`` ordenados por relevancia y serializados con ``search_serializer_class``. Los
+    filtros del ViewSet (por ejemplo ``?ticket=``) se aplican antes de la búsqueda.
+
+    Ejemplo:
+    ::
+        class MensajeViewSet(SearchMixin, viewsets.ModelViewSet):
+            search_function = staticmethod(search_mensajes)
+            search_serializer_class = serializers.MensajeSearchSerializer
+    """
+    search_function = None
+    search_serializer_class = None
+
+    @action(detail=False, methods=['get'], url_path='buscar')
+    def buscar(self, request):
+        texto = request.query_params.get('q', '').strip()
+        if not texto:
+            return Response({'q': [_('Este campo es requerido.')]}, status=status.HTTP_400_BAD_REQUEST)
+        limit = parse_limit(request.query_params.get('limit'), SEARCH_LIMIT, SEARCH_MAX_LIMIT)
+
+        # Se parte del queryset base, sin la precarga de relaciones del serializador completo
+        queryset = self.filter_queryset(self.queryset.defer('search_vector'))
+        resultados = self.search_function(queryset, texto)[:limit]
+        return Response(self.search_serializer_class(resultados, many=True).data)
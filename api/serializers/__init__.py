@@ -1,3 +1,4 @@
+from api.serializers.reportes import *
 from api.serializers.actividad import *
 from api.serializers.colaborador import *
 from api.serializers.contrato import *
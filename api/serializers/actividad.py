@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
 from api import models
+from api.serializers.reportes import DimensionesField, RangoFechasSerializer
+from api.timesheets import RESUMEN_DIMENSIONES, RESUMEN_PERIODOS
 
 
 class ActividadSerializer(serializers.ModelSerializer):
@@ -9,6 +11,20 @@ class ActividadSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ResumenActividadParametrosSerializer(RangoFechasSerializer):
+    """
+    Parámetros de consulta del reporte de horas (ver :func:`api.timesheets.timesheet_report`): ``agrupar`` es una
+    lista separada por comas de dimensiones, y cada dimensión acepta además un id para filtrar.
+    """
+    agrupar = DimensionesField(choices=RESUMEN_DIMENSIONES, required=False, default=['colaborador'])
+    periodo = serializers.ChoiceField(choices=list(RESUMEN_PERIODOS), required=False)
+    colaborador = serializers.IntegerField(required=False)
+    proyecto = serializers.IntegerField(required=False)
+    cliente = serializers.IntegerField(required=False)
+    datos_actividad = serializers.IntegerField(required=False)
+    cargo = serializers.IntegerField(required=False)
+
+
 class DatosActividadSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.DatosActividad
@@ -4,7 +4,7 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from api.models import Colaborador
-from api.serializers import ColaboradorSerializer
+from api.profiles import get_colaborador_profile
 from users.models import CustomUser
 
 
@@ -141,12 +141,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def create(self, validated_data):
         pass
 
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Claims usados por api.authentication.StatelessJWTAuthentication para autenticar sin consultar el usuario
+        token['email'] = user.email
+        token['is_verified'] = user.is_verified
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token['colaborador_id'] = get_colaborador_profile(user)['id']
+        return token
+
     def validate(self, attrs):
         data = super(CustomTokenObtainPairSerializer, self).validate(attrs)
 
         data.update({'user_email': self.user.email})
-        colaborador = Colaborador.objects.get(usuario_id=self.user.id)
-        colaborador_serializer = ColaboradorSerializer(colaborador)
-        data.update({'colaborador': colaborador_serializer.data})
+        data.update({'colaborador': get_colaborador_profile(self.user)})
 
         return data
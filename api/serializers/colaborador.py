@@ -35,6 +35,12 @@ class ColaboradorSerializer(serializers.ModelSerializer):
     last_contrato = serializers.PrimaryKeyRelatedField(read_only=True)
     full_name = serializers.ReadOnlyField()
     usuario = serializers.SlugRelatedField(queryset=CustomUser.objects.all(), slug_field='email')
+    select_related_fields = {'usuario': ['usuario']}
+    prefetch_related_fields = {'last_contrato': [models.last_contrato_prefetch]}
+    field_dependencies = {
+        'full_name': ['nombre', 'apellido_paterno', 'apellido_materno'],
+        'last_contrato': [],
+    }
 
     class Meta:
         model = models.Colaborador
@@ -65,7 +71,8 @@ class ColaboradorSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         response = super().to_representation(instance)
-        response["last_contrato"] = self.LocalContratoSerializer(instance.last_contrato).data
+        if 'last_contrato' in self.fields:
+            response["last_contrato"] = self.LocalContratoSerializer(instance.last_contrato).data
         return response
 
 
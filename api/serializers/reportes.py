@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+
+class DimensionesField(serializers.CharField):
+    """
+    Campo con una lista separada por comas de dimensiones de agrupación de un reporte, validadas contra
+    ``choices``. Retorna la lista sin repetidos.
+    """
+
+    def __init__(self, choices, **kwargs):
+        self.choices = list(choices)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        dimensiones = [dimension.strip() for dimension in super().to_internal_value(data).split(',')]
+        dimensiones = list(dict.fromkeys(dimension for dimension in dimensiones if dimension))
+        invalidas = [dimension for dimension in dimensiones if dimension not in self.choices]
+        if invalidas:
+            raise serializers.ValidationError(
+                _('Dimensiones no válidas: %(invalidas)s. Use: %(validas)s.') % {
+                    'invalidas': ', '.join(invalidas),
+                    'validas': ', '.join(self.choices),
+                }
+            )
+        if not dimensiones:
+            raise serializers.ValidationError(_('Debe indicar al menos una dimensión.'))
+        return dimensiones
+
+
+class RangoFechasSerializer(serializers.Serializer):
+    """
+    Serializador base de los parámetros de reportes con rango de fechas ``desde``/``hasta`` (inclusivas): valida que
+    ``desde`` no sea posterior a ``hasta`` y, si la subclase define ``rango_max_dias``, que el rango no lo supere. Con
+    ``rango_dias`` el rango es obligatorio en el resultado: por defecto termina hoy y abarca esa cantidad de días.
+    """
+    # Días del rango por defecto (None: sin rango por defecto) y máximos (None: sin límite)
+    rango_dias = None
+    rango_max_dias = None
+
+    desde = serializers.DateField(required=False)
+    hasta = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if self.rango_dias is not None:
+            attrs.setdefault('hasta', timezone.localdate())
+            attrs.setdefault('desde', attrs['hasta'] - timedelta(days=self.rango_dias - 1))
+        desde, hasta = attrs.get('desde'), attrs.get('hasta')
+        if desde and hasta and desde > hasta:
+            raise serializers.ValidationError({'hasta': _('Debe ser posterior o igual a desde.')})
+        if self.rango_max_dias is not None and desde and hasta and (hasta - desde).days >= self.rango_max_dias:
+            raise serializers.ValidationError({
+                'desde': _('El rango no puede superar %d días.') % self.rango_max_dias
+            })
+        return attrs
@@ -1,7 +1,15 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
 from api import models
-from api.serializers import ColaboradorSerializer, ModuloSerializer
+from api.eager_loading import NestedSerializerMixin
+from api.serializers import ColaboradorSerializer, DimensionesField, ModuloSerializer, RangoFechasSerializer
+from api.ticket_metrics import METRICA_DIMENSIONES, METRICA_PERIODOS
+from api.thumbnails import MINIATURA_TAMANOS
+from api.ticket_history import tracked_fields
+from api.ticket_stages import TIEMPO_ETAPA_DIAS, TIEMPO_ETAPA_DIMENSIONES, TIEMPO_ETAPA_MAX_DIAS
+from api.uploads import CARGA_MAX_TAMANO
 
 
 class TicketLogSerializer(serializers.ModelSerializer):
@@ -9,6 +17,21 @@ class TicketLogSerializer(serializers.ModelSerializer):
         model = models.TicketLog
         fields = '__all__'
 
+    def validate_historial(self, value):
+        # Mismo formato que el historial automático de api.ticket_history: {"campo": [anterior, nuevo]}
+        if not isinstance(value, dict) or not all(
+            isinstance(cambio, list) and len(cambio) == 2 for cambio in value.values()
+        ):
+            raise serializers.ValidationError(_('Use el formato {"campo": [anterior, nuevo]}.'))
+        # Los cambios de campos del ticket solo los registra la captura automática, ya que de ellos dependen las
+        # métricas (api.ticket_metrics) y los tiempos por etapa (api.ticket_stages)
+        campos = sorted(set(value) & {field.name for field in tracked_fields()})
+        if campos:
+            raise serializers.ValidationError(
+                _('Los cambios de {} se registran automáticamente al guardar el ticket.').format(', '.join(campos))
+            )
+        return value
+
 
 class PrioridadSerializer(serializers.ModelSerializer):
     class Meta:
@@ -34,8 +57,14 @@ class AreaTicketSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class DificultadTicketSerializer(serializers.ModelSerializer):
+class DificultadTicketSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     full_dificultad = serializers.ReadOnlyField()
+    field_dependencies = {
+        'full_dificultad': ['tipo', 'nivel'],
+    }
+    nested_serializers = {
+        'area_ticket': AreaTicketSerializer,
+    }
 
     class Meta:
         model = models.DificultadTicket
@@ -51,11 +80,6 @@ class DificultadTicketSerializer(serializers.ModelSerializer):
             'full_dificultad',
         ]
 
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['area_ticket'] = AreaTicketSerializer(instance.area_ticket).data
-        return response
-
 
 class ArchivoTicketSerializer(serializers.ModelSerializer):
     archivo = serializers.FileField()
@@ -65,25 +89,68 @@ class ArchivoTicketSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class MensajeSerializer(serializers.ModelSerializer):
+class CargaArchivoSerializer(serializers.ModelSerializer):
+    """
+    Serializador de las cargas por partes. El destino (``ticket`` o ``mensaje``) lo fija el ViewSet (ver
+    :class:`api.uploads.ChunkedUploadMixin`) a través del contexto ``destino``.
+    """
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', required=False)
+
+    class Meta:
+        model = models.CargaArchivo
+        fields = ['id', 'ticket', 'mensaje', 'nombre', 'tamano', 'recibido', 'sha256', 'created', 'modified']
+        read_only_fields = ['recibido']
+
+    def validate_tamano(self, value):
+        if not 0 < value <= CARGA_MAX_TAMANO:
+            raise serializers.ValidationError(_('Debe estar entre 1 y %d bytes.') % CARGA_MAX_TAMANO)
+        return value
+
+    def validate(self, attrs):
+        destino = self.context['destino']
+        otro = 'mensaje' if destino == 'ticket' else 'ticket'
+        if attrs.get(destino) is None:
+            raise serializers.ValidationError({destino: [_('Este campo es requerido.')]})
+        if attrs.get(otro) is not None:
+            raise serializers.ValidationError({otro: [_('No se admite en esta ruta.')]})
+        return attrs
+
+
+class MensajeSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     autor = serializers.PrimaryKeyRelatedField(queryset=models.Colaborador.objects.all(), required=False,
                                                allow_null=True)
+    nested_serializers = {
+        'autor': ColaboradorSerializer,
+    }
 
     class Meta:
         model = models.Mensaje
-        fields = '__all__'
+        exclude = ['search_vector']
 
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['autor'] = ColaboradorSerializer(instance.autor).data
-        return response
+
+class MensajeSearchSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = models.Mensaje
+        fields = ['id', 'ticket', 'asunto', 'autor', 'created', 'rank', 'snippet']
 
 
 class ArchivoMensajeSerializer(serializers.ModelSerializer):
+    # URLs de las miniaturas de la imagen por tamaño (ver api.thumbnails)
+    miniaturas = serializers.SerializerMethodField()
+
     class Meta:
         model = models.ArchivoMensaje
         fields = '__all__'
 
+    def get_miniaturas(self, obj):
+        if obj.pk is None:
+            return None
+        url = reverse('archivomensaje-miniatura', args=[obj.pk], request=self.context.get('request'))
+        return {tamano: f'{url}?tamano={tamano}' for tamano in MINIATURA_TAMANOS}
+
 
 class EtiquetaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -97,22 +164,56 @@ class OrigenSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(NestedSerializerMixin, serializers.ModelSerializer):
+    nested_serializers = {
+        'asignado': ColaboradorSerializer,
+        'solicitante': ColaboradorSerializer,
+        'validador': ColaboradorSerializer,
+        'origen': OrigenSerializer,
+        'modulo': ModuloSerializer,
+        'prioridad': PrioridadSerializer,
+        'tipo_ticket': TipoTicketSerializer,
+        'etapa_ticket': EtapaTicketSerializer,
+        'dificultad_ticket': DificultadTicketSerializer,
+    }
+
     class Meta:
         model = models.Ticket
-        fields = '__all__'
+        exclude = ['search_vector']
 
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['asignado'] = ColaboradorSerializer(instance.asignado).data
-        response['solicitante'] = ColaboradorSerializer(instance.solicitante).data
-        if instance.validador:
-            response['validador'] = ColaboradorSerializer(instance.validador).data
-        response['origen'] = OrigenSerializer(instance.origen).data
-        response['modulo'] = ModuloSerializer(instance.modulo).data
-        response['prioridad'] = PrioridadSerializer(instance.prioridad).data
-        response['tipo_ticket'] = TipoTicketSerializer(instance.tipo_ticket).data
-        response['etapa_ticket'] = EtapaTicketSerializer(instance.etapa_ticket).data
-        if instance.dificultad_ticket:
-            response['dificultad_ticket'] = DificultadTicketSerializer(instance.dificultad_ticket).data
-        return response
+
+class TicketSearchSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = models.Ticket
+        fields = ['id', 'asunto', 'etapa_ticket', 'prioridad', 'asignado', 'solicitante', 'created', 'rank', 'snippet']
+
+
+class MetricaTicketParametrosSerializer(RangoFechasSerializer):
+    """
+    Parámetros de consulta de las métricas de tickets (ver :func:`api.ticket_metrics.ticket_flow_report` y
+    :func:`api.ticket_metrics.ticket_backlog`).
+    """
+    agrupar = DimensionesField(choices=METRICA_DIMENSIONES, required=False, default=['etapa_ticket'])
+    periodo = serializers.ChoiceField(choices=list(METRICA_PERIODOS), required=False)
+    etapa_ticket = serializers.IntegerField(required=False)
+    prioridad = serializers.IntegerField(required=False)
+    area_ticket = serializers.IntegerField(required=False)
+
+
+class TiempoEtapaParametrosSerializer(RangoFechasSerializer):
+    """
+    Parámetros de consulta del reporte de tiempos en etapa (ver :func:`api.ticket_stages.stage_time_report`): los
+    tickets se filtran por fecha de creación, prioridad y área, y los intervalos por etapa. El rango de fechas es
+    obligatorio en el resultado: por defecto son los últimos :data:`api.ticket_stages.TIEMPO_ETAPA_DIAS` días hasta
+    ``hasta`` (o hoy), y no puede superar :data:`api.ticket_stages.TIEMPO_ETAPA_MAX_DIAS` días.
+    """
+    rango_dias = TIEMPO_ETAPA_DIAS
+    rango_max_dias = TIEMPO_ETAPA_MAX_DIAS
+
+    agrupar = DimensionesField(choices=TIEMPO_ETAPA_DIMENSIONES, required=False, default=['etapa_ticket'])
+    etapa_ticket = serializers.IntegerField(required=False)
+    prioridad = serializers.IntegerField(required=False)
+    area_ticket = serializers.IntegerField(required=False)
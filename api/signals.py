@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from api import models
+from api.authentication import discard_revocation
+from api.bulk import bulk_saved
+from api.catalogs import CATALOG_MODELS, invalidate_catalogs
+from api.profiles import (invalidate_colaborador_profile, invalidate_contrato_profile,
+                          invalidate_organizacion_profile, invalidate_user_profile)
+from api.realtime import publish_bulk_saved, publish_deleted, publish_saved
+from api.storage import count_file_reference, discard_file_reference
+from api.thumbnails import schedule_thumbnails
+from api.ticket_history import record_ticket_changes
+from api.ticket_metrics import apply_ticket_log, apply_ticket_logs, discard_ticket_metrics, register_ticket_metrics
+from api.ticket_stages import discard_ticket_stages, discard_tickets_stages
+from api.timesheets import update_actividad_resumen, update_actividades_resumen, update_datos_actividad_resumen
+from api.uploads import discard_upload_file
+from users.models import CustomUser
+
+# Cualquier cambio en un catálogo genera una nueva versión de las copias en memoria
+for catalog_model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalogs, sender=catalog_model,
+                      dispatch_uid=f'catalogo_save_{catalog_model.__name__}')
+    post_delete.connect(invalidate_catalogs, sender=catalog_model,
+                        dispatch_uid=f'catalogo_delete_{catalog_model.__name__}')
+
+# Cambios en los datos del perfil de login eliminan el perfil del cache
+for profile_model, receiver in [
+    (CustomUser, invalidate_user_profile),
+    (models.Colaborador, invalidate_colaborador_profile),
+    (models.DatosContractuales, invalidate_contrato_profile),
+    (models.DatosOrganizacionales, invalidate_organizacion_profile),
+]:
+    post_save.connect(receiver, sender=profile_model, dispatch_uid=f'perfil_save_{profile_model.__name__}')
+    post_delete.connect(receiver, sender=profile_model, dispatch_uid=f'perfil_delete_{profile_model.__name__}')
+
+# Cambios en un usuario fuerzan una nueva verificación de revocación en este proceso
+post_save.connect(discard_revocation, sender=CustomUser, dispatch_uid='revocacion_save_CustomUser')
+post_delete.connect(discard_revocation, sender=CustomUser, dispatch_uid='revocacion_delete_CustomUser')
+
+# Cambios en las actividades recalculan los días afectados del resumen de horas
+post_save.connect(update_actividad_resumen, sender=models.Actividad, dispatch_uid='resumen_save_Actividad')
+post_delete.connect(update_actividad_resumen, sender=models.Actividad, dispatch_uid='resumen_delete_Actividad')
+bulk_saved.connect(update_actividades_resumen, sender=models.Actividad, dispatch_uid='resumen_bulk_save_Actividad')
+post_save.connect(update_datos_actividad_resumen, sender=models.DatosActividad,
+                  dispatch_uid='resumen_save_DatosActividad')
+
+# Los tickets nuevos y los cambios de etapa registrados en el historial actualizan las métricas de tickets
+post_save.connect(register_ticket_metrics, sender=models.Ticket, dispatch_uid='metricas_save_Ticket')
+pre_delete.connect(discard_ticket_metrics, sender=models.Ticket, dispatch_uid='metricas_delete_Ticket')
+post_save.connect(apply_ticket_log, sender=models.TicketLog, dispatch_uid='metricas_save_TicketLog')
+bulk_saved.connect(apply_ticket_logs, sender=models.TicketLog, dispatch_uid='metricas_bulk_save_TicketLog')
+
+# Los cambios de los tickets se registran en su historial (después de registrar las métricas del ticket nuevo, ya que
+# el historial de creación se aplica sobre su estado)
+post_save.connect(record_ticket_changes, sender=models.Ticket, dispatch_uid='historial_save_Ticket')
+
+# Los cambios de etapa eliminan del cache los tiempos en etapa del ticket (un ticket finalizado se puede reabrir)
+post_save.connect(discard_ticket_stages, sender=models.TicketLog, dispatch_uid='etapas_save_TicketLog')
+bulk_saved.connect(discard_tickets_stages, sender=models.TicketLog, dispatch_uid='etapas_bulk_save_TicketLog')
+post_delete.connect(discard_ticket_stages, sender=models.Ticket, dispatch_uid='etapas_delete_Ticket')
+
+# Las cargas por partes completadas, canceladas o expiradas eliminan su archivo temporal
+post_delete.connect(discard_upload_file, sender=models.CargaArchivo, dispatch_uid='carga_delete_CargaArchivo')
+
+# Los archivos de tickets y mensajes cuentan las referencias a su contenido (ver api.storage)
+for archivo_model in (models.ArchivoTicket, models.ArchivoMensaje):
+    post_save.connect(count_file_reference, sender=archivo_model,
+                      dispatch_uid=f'contenido_save_{archivo_model.__name__}')
+    post_delete.connect(discard_file_reference, sender=archivo_model,
+                        dispatch_uid=f'contenido_delete_{archivo_model.__name__}')
+
+# Las imágenes de mensajes encolan la generación de sus miniaturas (ver api.thumbnails)
+post_save.connect(schedule_thumbnails, sender=models.ArchivoMensaje, dispatch_uid='miniaturas_save_ArchivoMensaje')
+
+# Los mensajes, sus archivos y el historial se publican en el canal en tiempo real del ticket (ver api.realtime)
+for evento_model in (models.Mensaje, models.ArchivoMensaje, models.TicketLog):
+    post_save.connect(publish_saved, sender=evento_model, dispatch_uid=f'tiempo_real_save_{evento_model.__name__}')
+for evento_model in (models.Mensaje, models.ArchivoMensaje):
+    post_delete.connect(publish_deleted, sender=evento_model,
+                        dispatch_uid=f'tiempo_real_delete_{evento_model.__name__}')
+bulk_saved.connect(publish_bulk_saved, sender=models.TicketLog, dispatch_uid='tiempo_real_bulk_save_TicketLog')
@@ -0,0 +1,360 @@
+import hashlib
+import mimetypes
+import os
+import re
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+# Directorio del almacenamiento con los archivos direccionados por contenido
+CONTENIDO_DIR = 'files/sha256'
+
+# Los nombres anteriores conservaban la extensión del archivo original, que ya no forma parte del nombre
+_nombre_re = re.compile(rf'^{CONTENIDO_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})(\.[a-z0-9]+)?$')
+
+
+def content_name(sha256):
+    """
+    Función que construye el nombre de un archivo a partir de su SHA-256, con dos niveles de directorios para no
+    acumular todos los archivos en uno solo. El nombre no incluye la extensión del original, para que un mismo
+    contenido subido con distintos nombres (``.jpg`` y ``.jpeg``) se guarde una sola vez; el tipo de contenido queda
+    en :class:`api.models.ContenidoArchivo`.
+
+    :param sha256: Digest hexadecimal del contenido.
+    :return: Cadena de texto con el nombre en el almacenamiento.
+    """
+    return f'{CONTENIDO_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def content_digest(name):
+    """
+    Función que retorna el SHA-256 de un nombre direccionado por contenido, o ``None`` para los demás nombres (por
+    ejemplo archivos anteriores a este almacenamiento).
+    """
+    coincidencia = _nombre_re.match(name or '')
+    return coincidencia.group(1) if coincidencia else None
+
+
+def content_lock(sha256):
+    """
+    Función que toma el bloqueo consultivo de PostgreSQL de un contenido hasta el fin de la transacción actual. Lo
+    toman el guardado de archivos y :func:`collect_garbage`, para que un contenido no se elimine mientras se reutiliza.
+
+    :param sha256: Digest hexadecimal del contenido.
+    """
+    # Fuera de una transacción el bloqueo se liberaría de inmediato
+    assert connection.in_atomic_block, 'content_lock requiere una transacción'
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [int(sha256[:15], 16)])
+
+
+def register_content(name, sha256, filename, tamano):
+    """
+    Función que registra un contenido recién guardado o reutilizado en :class:`api.models.ContenidoArchivo`,
+    actualizando su fecha de modificación para que :func:`collect_garbage` respete el período de gracia mientras se
+    confirma la referencia. Se llama con el bloqueo de :func:`content_lock`.
+
+    :param name: Nombre del archivo en el almacenamiento.
+    :param sha256: Digest hexadecimal del contenido.
+    :param filename: Nombre original del archivo (para el tipo de contenido).
+    :param tamano: Tamaño del archivo, en bytes.
+    """
+    # Importación local: api.models importa este módulo para el almacenamiento de sus campos
+    from api.models import ContenidoArchivo
+
+    if ContenidoArchivo.objects.filter(nombre=name).update(modified=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            ContenidoArchivo.objects.create(
+                nombre=name, sha256=sha256, tamano=tamano, tipo=mimetypes.guess_type(filename)[0] or ''
+            )
+    except IntegrityError:
+        pass
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    La clase ContentAddressedStorage es un almacenamiento en disco que guarda cada archivo con el nombre de su
+    SHA-256 (ver :func:`content_name`), ignorando el nombre propuesto por ``upload_to``. Un archivo con contenido ya
+    guardado no se vuelve a escribir: se reutiliza el existente. Las referencias de cada contenido se cuentan en
+    :class:`api.models.ContenidoArchivo` (ver :func:`count_file_reference`) y el comando ``recolectar_archivos``
+    elimina los que no tienen referencias.
+
+    Los nombres que no son direccionados por contenido (archivos anteriores) se leen igual que en
+    :class:`FileSystemStorage`.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Un mismo nombre corresponde a un mismo contenido, por lo que no se buscan nombres alternativos
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        sha256 = digest.hexdigest()
+        nombre = content_name(sha256)
+        with transaction.atomic():
+            content_lock(sha256)
+            if self.exists(nombre):
+                # Se reutiliza: la fecha del archivo también cuenta para el período de gracia
+                os.utime(self.path(nombre))
+            else:
+                self.write(nombre, content)
+            register_content(nombre, sha256, name, content.size)
+        return nombre
+
+    def write(self, name, content):
+        """
+        Función que escribe un archivo en un temporal y lo publica con su nombre final mediante un enlace, para que
+        nunca se lea un archivo a medio escribir.
+
+        :param name: Nombre final en el almacenamiento.
+        :param content: Objeto :class:`File` con el contenido.
+        """
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporal = f'{path}.{uuid.uuid4().hex}.tmp'
+        if hasattr(content, 'temporary_file_path'):
+            file_move_safe(content.temporary_file_path(), temporal)
+        else:
+            with open(temporal, 'wb') as archivo:
+                for chunk in content.chunks():
+                    archivo.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(temporal, self.file_permissions_mode)
+        try:
+            os.link(temporal, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporal)
+
+    def save_existing(self, path, sha256, filename):
+        """
+        Función que guarda un archivo que ya está en disco y cuyo SHA-256 se conoce (ver
+        :func:`api.uploads.complete_upload`), enlazándolo sin leerlo ni copiarlo. Si el contenido ya existe se
+        reutiliza.
+
+        :param path: Ruta del archivo, en el mismo sistema de archivos que el almacenamiento.
+        :param sha256: Digest hexadecimal del contenido.
+        :param filename: Nombre original del archivo.
+        :return: Nombre en el almacenamiento.
+        """
+        name = content_name(sha256)
+        with transaction.atomic():
+            content_lock(sha256)
+            if self.exists(name):
+                os.utime(self.path(name))
+            else:
+                os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+                os.link(path, self.path(name))
+            register_content(name, sha256, filename, self.size(name))
+        return name
+
+
+content_storage = ContentAddressedStorage()
+
+
+def change_references(name, cantidad):
+    """
+    Función que suma ``cantidad`` a las referencias de un contenido, creando su fila si no existe.
+
+    :param name: Nombre del archivo en el almacenamiento.
+    :param cantidad: Referencias a sumar (negativo para restar).
+    """
+    # Importación local: api.models importa este módulo para el almacenamiento de sus campos
+    from api.models import ContenidoArchivo
+
+    sha256 = content_digest(name)
+    if sha256 is None:
+        return
+    actualizadas = ContenidoArchivo.objects.filter(nombre=name).update(
+        referencias=F('referencias') + cantidad, modified=timezone.now()
+    )
+    if actualizadas:
+        return
+    try:
+        with transaction.atomic():
+            ContenidoArchivo.objects.create(
+                nombre=name,
+                sha256=sha256,
+                tamano=content_storage.size(name) if content_storage.exists(name) else 0,
+                referencias=max(cantidad, 0)
+            )
+    except IntegrityError:
+        # Otra transacción creó la fila en paralelo
+        ContenidoArchivo.objects.filter(nombre=name).update(
+            referencias=F('referencias') + cantidad, modified=timezone.now()
+        )
+
+
+def count_file_reference(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.ArchivoTicket` y :class:`api.models.ArchivoMensaje` que cuenta
+    la referencia al contenido del archivo, y descuenta la del anterior si cambió (ver ``_archivo_cargado`` en
+    ``from_db`` de los modelos).
+    """
+    if raw:
+        return
+    anterior = None if created else getattr(instance, '_archivo_cargado', None)
+    actual = instance.archivo.name
+    if actual != anterior:
+        if actual:
+            change_references(actual, 1)
+        if anterior:
+            change_references(anterior, -1)
+    instance._archivo_cargado = actual
+
+
+def discard_file_reference(sender, instance, **kwargs):
+    """
+    Receptor de ``post_delete`` de :class:`api.models.ArchivoTicket` y :class:`api.models.ArchivoMensaje` que
+    descuenta la referencia al contenido del archivo eliminado. El archivo se elimina después, con
+    :func:`collect_garbage`.
+    """
+    nombre = getattr(instance, '_archivo_cargado', instance.archivo.name)
+    if nombre:
+        change_references(nombre, -1)
+
+
+def referenced_names(nombres):
+    """
+    Función que retorna cuáles de los nombres indicados están referenciados por algún
+    :class:`api.models.ArchivoTicket` o :class:`api.models.ArchivoMensaje`.
+
+    :param nombres: Lista de nombres en el almacenamiento.
+    :return: Conjunto de nombres referenciados.
+    """
+    from api.models import ArchivoMensaje, ArchivoTicket
+
+    referenciados = set()
+    for model in (ArchivoTicket, ArchivoMensaje):
+        referenciados.update(model.objects.filter(archivo__in=nombres).values_list('archivo', flat=True))
+    return referenciados
+
+
+def recount_references():
+    """
+    Función que recalcula las referencias de todos los contenidos desde los archivos de tickets y mensajes, para la
+    carga inicial o luego de escrituras que no pasan por los receptores (por ejemplo ``bulk_create``).
+
+    :return: Cantidad de contenidos referenciados.
+    """
+    from api.models import ArchivoMensaje, ArchivoTicket, ContenidoArchivo
+
+    conteo = {}
+    for model in (ArchivoTicket, ArchivoMensaje):
+        for nombre in model.objects.values_list('archivo', flat=True).iterator():
+            if content_digest(nombre) is not None:
+                conteo[nombre] = conteo.get(nombre, 0) + 1
+    with transaction.atomic():
+        ContenidoArchivo.objects.exclude(nombre__in=list(conteo)).update(referencias=0)
+        for nombre, referencias in conteo.items():
+            actualizadas = ContenidoArchivo.objects.filter(nombre=nombre).exclude(
+                referencias=referencias
+            ).update(referencias=referencias, modified=timezone.now())
+            if not actualizadas and not ContenidoArchivo.objects.filter(nombre=nombre).exists():
+                ContenidoArchivo.objects.create(
+                    nombre=nombre,
+                    sha256=content_digest(nombre),
+                    tamano=content_storage.size(nombre) if content_storage.exists(nombre) else 0,
+                    referencias=referencias
+                )
+    return len(conteo)
+
+
+def delete_content(nombre, limite, con_fila):
+    """
+    Función que elimina un contenido sin referencias con el bloqueo de :func:`content_lock`, verificando de nuevo
+    que siga sin referencias y sin cambios desde ``limite`` (un guardado pudo reutilizarlo después de la consulta).
+
+    :param nombre: Nombre del archivo en el almacenamiento.
+    :param limite: Fecha y hora límite del período de gracia.
+    :param con_fila: Indica si el contenido tiene fila en :class:`api.models.ContenidoArchivo` (si no, es un
+        archivo huérfano, por ejemplo de una transacción revertida).
+    :return: Bytes liberados, o ``None`` si no se eliminó.
+    """
+    from api.models import ContenidoArchivo
+    from api.thumbnails import discard_thumbnails
+
+    path = content_storage.path(nombre)
+    with transaction.atomic():
+        content_lock(content_digest(nombre))
+        filas = ContenidoArchivo.objects.filter(nombre=nombre)
+        if con_fila:
+            filas = filas.select_for_update().filter(referencias__lte=0, modified__lt=limite)
+            if not filas.exists():
+                return None
+        elif filas.exists():
+            return None
+        if referenced_names([nombre]):
+            return None
+        try:
+            if os.path.getmtime(path) >= limite.timestamp():
+                return None
+            liberados = os.path.getsize(path)
+        except FileNotFoundError:
+            liberados = None
+        filas.delete()
+        if liberados is not None:
+            os.remove(path)
+    return (liberados or 0) + discard_thumbnails(nombre)
+
+
+def collect_garbage(gracia, ahora=None):
+    """
+    Función que elimina los contenidos sin referencias desde hace más de ``gracia`` y los archivos del directorio
+    :data:`CONTENIDO_DIR` sin fila en :class:`api.models.ContenidoArchivo` (por ejemplo de transacciones revertidas)
+    más antiguos que ``gracia``, junto con sus miniaturas (ver :mod:`api.thumbnails`). Cada contenido se elimina con
+    :func:`delete_content`, con el mismo bloqueo que toma el guardado, por lo que un contenido reutilizado durante la
+    recolección se conserva.
+
+    :param gracia: Objeto :class:`timedelta`.
+    :param ahora: Fecha y hora de referencia (opcional, por defecto la actual).
+    :return: Tupla con la cantidad de archivos eliminados y los bytes liberados.
+    """
+    from api.models import ContenidoArchivo
+
+    limite = (ahora or timezone.now()) - gracia
+    eliminados, liberados = 0, 0
+    candidatos = list(ContenidoArchivo.objects.filter(
+        referencias__lte=0, modified__lt=limite
+    ).values_list('nombre', flat=True))
+    for nombre in candidatos:
+        resultado = delete_content(nombre, limite, con_fila=True)
+        if resultado is not None:
+            eliminados += 1
+            liberados += resultado
+
+    raiz = content_storage.path(CONTENIDO_DIR)
+    for directorio, _subdirectorios, archivos in os.walk(raiz):
+        candidatos = {}
+        for archivo in archivos:
+            path = os.path.join(directorio, archivo)
+            if os.path.getmtime(path) < limite.timestamp():
+                candidatos[os.path.relpath(path, content_storage.location).replace(os.sep, '/')] = path
+        if not candidatos:
+            continue
+        conocidos = set(ContenidoArchivo.objects.filter(nombre__in=list(candidatos)).values_list('nombre', flat=True))
+        for nombre, path in candidatos.items():
+            if nombre in conocidos:
+                continue
+            if content_digest(nombre) is None:
+                # Temporal de una escritura interrumpida
+                liberados += os.path.getsize(path)
+                os.remove(path)
+                eliminados += 1
+                continue
+            resultado = delete_content(nombre, limite, con_fila=False)
+            if resultado is not None:
+                eliminados += 1
+                liberados += resultado
+    return eliminados, liberados
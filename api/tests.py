@@ -1,3 +1,1704 @@
-from django.test import TestCase
+import base64
+import csv
+import fcntl
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, time, timedelta
+from time import monotonic
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.http import UnreadablePostError
+from django.db import connection
+from django.db.models import F, prefetch_related_objects
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import models, serializers, views
+from api.authentication import ClaimsUser, StatelessJWTAuthentication, revocation_cache
+from api.catalogs import CATALOG_MODELS, CATALOG_VERSION_TTL, catalog_version, get_catalog_version
+from api.eager_loading import plan_queryset
+from api.fast_read import FastReadSerializer, get_fast_read_serializer
+from api.outbox import ESPERA_BASE, ESPERA_MAXIMA, encolar_correo, espera_reintento, procesar_correos
+from api.profiles import profile_cache_key
+from api.realtime import PostgresBroker, get_broker, realtime_application, ticket_channel
+from api.search import normalize_run, parse_limit, typeahead_colaboradores
+from api.models.ticket import ETAPA_TICKET_FINALIZADA
+from api.storage import collect_garbage, content_storage, delete_content
+from api.thumbnails import (MINIATURA_FORMATOS, MINIATURA_REINTENTO, MINIATURA_TAMANOS, process_thumbnails,
+                            render_thumbnails, thumbnail_targets)
+from api.ticket_metrics import rebuild_ticket_metrics, ticket_backlog
+from api.ticket_stages import TIEMPO_ETAPA_DIAS, TIEMPO_ETAPA_MAX_DIAS, ticket_batches, ticket_stage_times
+from api.timesheets import RESUMEN_TOTALES, DuracionMinutos, actividades_fuera_de_rango, timesheet_report
+from api.uploads import discard_digest, upload_temp_path, write_chunk
+from users.models import CustomUser
+
+FIXTURES = ['usuarios', 'lugares', 'colaborador', 'contrato', 'organizacion', 'actividades', 'formacion', 'ticket']
+
+
+def render(data):
+    """
+    Función que normaliza una representación a tipos JSON, para comparar salidas sin depender de ``OrderedDict``.
+    """
+    return json.loads(JSONRenderer().render(data))
+
+
+def regular_viewset(viewset_class):
+    """
+    Función que retorna una copia del ViewSet cuyo listado usa el serializador de DRF en lugar de
+    :class:`api.fast_read.FastReadMixin`.
+    """
+    return type(f'Regular{viewset_class.__name__}', (viewset_class,), {'list': viewsets.ModelViewSet.list})
+
+
+class FastReadContractTests(APITestCase):
+    """
+    Contrato de :class:`api.fast_read.FastReadSerializer`: el listado rápido debe ser idéntico al del serializador de
+    cada ViewSet, con y sin ``?fields=``/``?expand=`` y en cada página.
+    """
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.first()
+        colaboradores = list(models.Colaborador.objects.order_by('pk'))
+        ticket = models.Ticket.objects.order_by('pk').first()
+        for numero in range(12):
+            ticket.pk = None
+            ticket.asunto = f'Ticket {numero}'
+            ticket.validador = colaboradores[numero % len(colaboradores)] if numero % 2 else None
+            ticket.dificultad_ticket = models.DificultadTicket.objects.first() if numero % 3 else None
+            ticket.fecha_limite = date(2021, 3, numero + 1) if numero % 4 else None
+            ticket.save()
+            models.TicketLog.objects.create(
+                ticket=ticket,
+                historial={'asunto': [f'Ticket {numero - 1}', ticket.asunto], 'numero': numero},
+                responsable=colaboradores[numero % len(colaboradores)],
+                observaciones=None if numero % 2 else 'Cambio de asunto'
+            )
+            models.Mensaje.objects.create(
+                ticket=ticket,
+                asunto=f'Mensaje {numero}',
+                descripcion='Detalle del mensaje',
+                autor=colaboradores[numero % len(colaboradores)]
+            )
+            models.Actividad.objects.create(
+                colaborador=colaboradores[numero % len(colaboradores)],
+                fecha=date(2021, 2, numero + 1),
+                hora_inicio=time(9, numero),
+                hora_termino=time(18, 30) if numero % 2 else None,
+                datos_actividad=models.DatosActividad.objects.first(),
+                proyecto=models.Proyecto.objects.first(),
+                observaciones=None if numero % 3 else 'Observación'
+            )
+
+    def list_results(self, viewset_class, params=None):
+        request = APIRequestFactory().get('/', params or {})
+        force_authenticate(request, user=self.user)
+        response = viewset_class.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 200)
+        return render(response.data)
+
+    def assert_contract(self, viewset_class, params=None):
+        fast = self.list_results(viewset_class, params)
+        regular = self.list_results(regular_viewset(viewset_class), params)
+        self.assertEqual(fast, regular)
+        self.assertTrue(fast['results'])
+        return fast
+
+    def test_listados(self):
+        for viewset_class in [views.TicketViewSet, views.ActividadViewSet, views.TicketLogViewSet,
+                              views.MensajeViewSet]:
+            with self.subTest(viewset=viewset_class.__name__):
+                self.assert_contract(viewset_class)
+
+    def test_fields_y_expand(self):
+        for params in [
+            {'fields': 'id,asunto'},
+            {'fields': 'id,asunto,asignado,validador', 'expand': ''},
+            {'fields': 'id,asignado,validador,dificultad_ticket', 'expand': 'validador,dificultad_ticket'},
+            {'expand': 'prioridad'},
+        ]:
+            with self.subTest(params=params):
+                self.assert_contract(views.TicketViewSet, params)
+        self.assert_contract(views.MensajeViewSet, {'fields': 'id,autor,created', 'expand': 'autor'})
+
+    def test_paginas(self):
+        params = {'page_size': 5}
+        for _pagina in range(3):
+            fast = self.assert_contract(views.TicketViewSet, params)
+            if not fast['next']:
+                break
+            params = {'page_size': 5, 'cursor': parse_qs(urlparse(fast['next']).query)['cursor'][0]}
+
+    def test_serializador(self):
+        for serializer_class in [serializers.TicketSerializer, serializers.ActividadSerializer,
+                                 serializers.TicketLogSerializer, serializers.MensajeSerializer]:
+            with self.subTest(serializer=serializer_class.__name__):
+                fast_serializer = FastReadSerializer(serializer_class)
+                queryset = serializer_class.Meta.model.objects.order_by('pk')
+                self.assertEqual(
+                    render(fast_serializer.represent(queryset.values(*fast_serializer.value_columns()))),
+                    render(serializer_class(plan_queryset(queryset, serializer_class), many=True).data)
+                )
+
+    def test_serializador_no_soportado(self):
+        with self.assertRaises(ImproperlyConfigured):
+            FastReadSerializer(serializers.ColaboradorSerializer)
+
+    def test_campos_no_declarados(self):
+        # Los nombres desconocidos de ?fields=/?expand= no generan serializadores nuevos
+        self.assert_contract(views.TicketViewSet, {'fields': 'id,asunto,inexistente', 'expand': 'otro'})
+        self.assertIs(
+            get_fast_read_serializer(serializers.TicketSerializer, {'id', 'asunto', 'x1'}, {'y1'}),
+            get_fast_read_serializer(serializers.TicketSerializer, {'id', 'asunto', 'x2'}, {'y2'})
+        )
+
+
+class EagerLoadingTests(APITestCase):
+    """
+    Consultas planificadas por :mod:`api.eager_loading` a partir del árbol de serializadores de cada ViewSet.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        catalog_version.discard()
+        self.user = CustomUser.objects.first()
+
+    def listar(self, viewset_class, params=None):
+        request = APIRequestFactory().get('/', dict(params or {}, page_size=100))
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as consultas:
+            response = viewset_class.as_view({'get': 'list'})(request)
+            response.render()
+        self.assertEqual(response.status_code, 200)
+        return response, consultas
+
+    def contar(self, viewset_class, params=None):
+        # La primera lectura llena las copias de los catálogos, por lo que se cuenta la segunda
+        self.listar(viewset_class, params)
+        response, consultas = self.listar(viewset_class, params)
+        return len(response.data['results']), len(consultas)
+
+    def test_consultas_constantes(self):
+        casos = [
+            (regular_viewset(views.TicketViewSet), None),
+            (regular_viewset(views.TicketViewSet), {'expand': 'asignado,validador'}),
+            (regular_viewset(views.TicketViewSet), {'fields': 'id,asunto,solicitante', 'expand': 'solicitante'}),
+            (views.TicketViewSet, None),
+        ]
+        # El ticket único tiene todas las relaciones, para que Django no omita las precargas vacías
+        models.Ticket.objects.exclude(pk=1).delete()
+        models.Ticket.objects.filter(pk=1).update(
+            validador=models.Colaborador.objects.get(pk=3), dificultad_ticket=models.DificultadTicket.objects.first()
+        )
+        un_ticket = [self.contar(viewset_class, params) for viewset_class, params in casos]
+
+        # Más filas, con colaboradores, validadores y dificultades distintos
+        colaboradores = list(models.Colaborador.objects.order_by('pk'))
+        ticket = models.Ticket.objects.get(pk=1)
+        for numero in range(30):
+            ticket.pk = None
+            ticket.asignado = colaboradores[numero % len(colaboradores)]
+            ticket.solicitante = colaboradores[(numero + 1) % len(colaboradores)]
+            ticket.validador = colaboradores[(numero + 2) % len(colaboradores)] if numero % 2 else None
+            ticket.dificultad_ticket = models.DificultadTicket.objects.first() if numero % 3 else None
+            ticket.save()
+
+        for (viewset_class, params), (filas, consultas) in zip(casos, un_ticket):
+            with self.subTest(viewset=viewset_class.__name__, params=params):
+                self.assertEqual(filas, 1)
+                self.assertEqual(self.contar(viewset_class, params), (31, consultas))
+
+    def consulta_del_listado(self, consultas, model):
+        tabla = model._meta.db_table
+        return next(consulta['sql'] for consulta in consultas if f'FROM "{tabla}"' in consulta['sql'])
+
+    def test_fields_limita_columnas(self):
+        colaborador = models.Colaborador._meta.db_table
+        usuario = CustomUser._meta.db_table
+        contrato = models.DatosContractuales._meta.db_table
+
+        response, consultas = self.listar(views.ColaboradorViewSet, {'fields': 'id,nombre'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nombre'})
+        sql = self.consulta_del_listado(consultas, models.Colaborador)
+        self.assertIn(f'"{colaborador}"."nombre"', sql)
+        for columna in ['run', 'apellido_paterno', 'fecha_nacimiento', 'direccion']:
+            self.assertNotIn(f'"{colaborador}"."{columna}"', sql)
+        self.assertNotIn(f'"{usuario}"', sql)
+        self.assertFalse([consulta for consulta in consultas if f'"{contrato}"' in consulta['sql']])
+
+        # Las columnas de las propiedades y las relaciones solicitadas
+        response, consultas = self.listar(views.ColaboradorViewSet, {'fields': 'id,full_name,usuario,last_contrato'})
+        fila = response.data['results'][0]
+        self.assertEqual(set(fila), {'id', 'full_name', 'usuario', 'last_contrato'})
+        self.assertEqual(fila['usuario'], models.Colaborador.objects.get(pk=fila['id']).usuario.email)
+        sql = self.consulta_del_listado(consultas, models.Colaborador)
+        self.assertIn(f'INNER JOIN "{usuario}"', sql)
+        self.assertIn(f'"{colaborador}"."apellido_materno"', sql)
+        self.assertNotIn(f'"{colaborador}"."run"', sql)
+        self.assertEqual(len([consulta for consulta in consultas if f'FROM "{contrato}"' in consulta['sql']]), 1)
+
+    def test_expand_sin_unir_relaciones(self):
+        colaborador = models.Colaborador._meta.db_table
+        viewset_class = regular_viewset(views.TicketViewSet)
+
+        response, consultas = self.listar(viewset_class, {'fields': 'id,asignado,validador', 'expand': ''})
+        fila = next(fila for fila in response.data['results'] if fila['id'] == 1)
+        self.assertEqual((fila['asignado'], fila['validador']), (1, None))
+        self.assertFalse([consulta for consulta in consultas if f'"{colaborador}"' in consulta['sql']])
+
+        response, consultas = self.listar(viewset_class, {'fields': 'id,asignado,validador', 'expand': 'asignado'})
+        fila = next(fila for fila in response.data['results'] if fila['id'] == 1)
+        self.assertEqual(fila['asignado']['id'], 1)
+        sql = self.consulta_del_listado(consultas, models.Ticket)
+        self.assertEqual(sql.count(f'JOIN "{colaborador}"'), 1)
+
+    def test_campos_desconocidos(self):
+        for params, campos in [
+            ({'fields': 'id,inexistente'}, {'id'}),
+            ({'fields': 'inexistente'}, set()),
+            ({'expand': 'inexistente'}, set(serializers.ColaboradorSerializer().fields)),
+            ({'fields': 'id,nombre', 'expand': 'usuario,inexistente'}, {'id', 'nombre'}),
+        ]:
+            with self.subTest(params=params):
+                response, _consultas = self.listar(views.ColaboradorViewSet, params)
+                self.assertEqual(set(response.data['results'][0]), campos)
+
+
+class LastContratoTests(APITestCase):
+    """
+    Precarga del último contrato de cada colaborador (ver :func:`api.models.colaborador.last_contrato_prefetch`).
+    """
+    fixtures = FIXTURES
+
+    def copiar_contrato(self, contrato, **cambios):
+        organizacion = contrato.organizacion
+        contrato.pk = None
+        for campo, valor in cambios.items():
+            setattr(contrato, campo, valor)
+        contrato.save()
+        organizacion.pk = None
+        organizacion.datos_contractuales = contrato
+        organizacion.save()
+        return contrato
+
+    def test_igual_a_la_consulta_por_fila(self):
+        # Colaborador 1: dos contratos más con la misma fecha de inicio que el vigente; colaborador 2: uno anterior;
+        # colaborador 3: sin contratos
+        vigente = models.DatosContractuales.objects.get(colaborador=1)
+        for _numero in range(2):
+            self.copiar_contrato(models.DatosContractuales.objects.get(pk=vigente.pk))
+        self.copiar_contrato(models.DatosContractuales.objects.get(colaborador=2), fecha_inicio=date(2010, 1, 1))
+        models.DatosContractuales.objects.filter(colaborador=3).delete()
+
+        with self.assertNumQueries(2):
+            precargados = {
+                colaborador.pk: colaborador.last_contrato
+                for colaborador in models.Colaborador.objects.with_last_contrato()
+            }
+        esperados = {
+            colaborador.pk: colaborador.contrato.order_by('-fecha_inicio', '-pk').first()
+            for colaborador in models.Colaborador.objects.all()
+        }
+        self.assertEqual(precargados, esperados)
+        self.assertEqual(
+            precargados[1].pk, models.DatosContractuales.objects.filter(colaborador=1).order_by('pk').last().pk
+        )
+        self.assertIsNone(precargados[3])
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(precargados[1].organizacion.cargo)
+
+    def test_consultas_del_listado(self):
+        url = '/api/colaborador/colaboradores/'
+        self.client.force_authenticate(CustomUser.objects.first())
+
+        def contar():
+            with CaptureQueriesContext(connection) as consultas:
+                datos = self.client.get(url, {'page_size': 100}).json()
+            return len(datos['results']), len(consultas)
+
+        filas, consultas = contar()
+        # Más colaboradores, cada uno con varios contratos
+        base = models.Colaborador.objects.get(pk=2)
+        contrato = models.DatosContractuales.objects.get(colaborador=2)
+        for usuario, run in [(CustomUser.objects.get(pk=3), '11111111-1'), (CustomUser.objects.get(pk=5), '2-7')]:
+            base.pk, base.usuario, base.run = None, usuario, run
+            base.save()
+            for fecha_inicio in [date(2019, 1, 1), date(2020, 1, 1)]:
+                self.copiar_contrato(
+                    models.DatosContractuales.objects.get(pk=contrato.pk), colaborador=base, fecha_inicio=fecha_inicio
+                )
+        self.assertEqual(contar(), (filas + 2, consultas))
+
+
+class ExportTests(APITestCase):
+    """
+    Exportación de los listados en NDJSON y CSV (ver :class:`api.export.ExportMixin`).
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.first())
+        colaborador = models.Colaborador.objects.get(pk=1)
+        for ticket in models.Ticket.objects.order_by('pk'):
+            for numero in range(3):
+                models.TicketLog.objects.create(
+                    ticket=ticket, historial={'numero': numero}, responsable=colaborador,
+                    observaciones='Cambio, con "comillas"' if numero else None
+                )
+        for dia in range(1, 4):
+            models.Actividad.objects.create(
+                colaborador=colaborador, fecha=date(2021, 3, dia), hora_inicio=time(9),
+                hora_termino=time(10) if dia % 2 else None, datos_actividad=models.DatosActividad.objects.first(),
+                proyecto=models.Proyecto.objects.first()
+            )
+
+    def listado(self, url, params=None):
+        response = self.client.get(url, dict(params or {}, page_size=100))
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def exportar(self, url, params=None):
+        response = self.client.get(f'{url}exportar/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def exportar_ndjson(self, url, params=None):
+        return [json.loads(linea) for linea in self.exportar(url, dict(params or {}, formato='ndjson')).splitlines()]
+
+    def test_ndjson_igual_al_listado(self):
+        for url, params in [
+            ('/api/ticket/tickets/', None),
+            ('/api/ticket/tickets/', {'fields': 'id,asunto,asignado', 'expand': 'asignado'}),
+            ('/api/ticket/tickets-logs/', None),
+            ('/api/actividad/actividades/', None),
+        ]:
+            with self.subTest(url=url, params=params):
+                filas = self.listado(url, params)
+                self.assertTrue(filas)
+                self.assertEqual(self.exportar_ndjson(url, params), filas)
+
+    def test_csv_igual_al_listado(self):
+        url = '/api/ticket/tickets-logs/'
+        filas = self.listado(url)
+        lineas = list(csv.reader(io.StringIO(self.exportar(url, {'formato': 'csv'}))))
+        self.assertEqual(lineas[0], list(filas[0]))
+        self.assertEqual(lineas[1:], [
+            ['' if valor is None else json.dumps(valor, ensure_ascii=False) if isinstance(valor, (dict, list))
+             else str(valor) for valor in fila.values()]
+            for fila in filas
+        ])
+
+    def test_filtros_del_listado(self):
+        url = '/api/ticket/tickets-logs/'
+        params = {'ticket': models.Ticket.objects.order_by('pk').first().pk}
+        filas = self.listado(url, params)
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(self.exportar_ndjson(url, params), filas)
+
+        # Un colaborador sin acceso a todos los tickets exporta lo mismo que ve en el listado
+        self.client.force_authenticate(CustomUser.objects.get(colaborador=2))
+        url = '/api/ticket/tickets/'
+        self.assertEqual(self.exportar_ndjson(url), self.listado(url))
+
+    def test_formato_no_soportado(self):
+        response = self.client.get('/api/ticket/tickets/exportar/', {'formato': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('formato', response.json())
+
+    def test_serializador_sin_lectura_rapida(self):
+        url = '/api/colaborador/colaboradores/'
+        filas = self.listado(url)
+        tabla = models.DatosContractuales._meta.db_table
+        with mock.patch.object(views.ColaboradorViewSet, 'export_chunk_size', 2), \
+                mock.patch('api.export.prefetch_related_objects', wraps=prefetch_related_objects) as prefetch, \
+                CaptureQueriesContext(connection) as consultas:
+            exportadas = self.exportar_ndjson(url)
+        self.assertEqual(exportadas, filas)
+        # Una precarga del último contrato por grupo de filas, no una consulta por colaborador
+        self.assertEqual([len(llamada.args[0]) for llamada in prefetch.call_args_list], [2, 1])
+        self.assertEqual(len([consulta for consulta in consultas if f'"{tabla}"' in consulta['sql']]), 2)
+
+
+class CursorPaginationTests(APITestCase):
+    """
+    Paginación por cursor de :mod:`api.pagination` en los listados grandes, con filas que repiten el campo del orden.
+    """
+    fixtures = FIXTURES
+    listados = ['/api/ticket/tickets/', '/api/ticket/tickets-logs/', '/api/ticket/mensajes/',
+                '/api/actividad/actividades/', '/api/colaborador/colaboradores/']
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.first())
+        ticket = models.Ticket.objects.get(pk=1)
+        for numero in range(7):
+            ticket.pk = None
+            ticket.asunto = f'Ticket {numero}'
+            ticket.save()
+            models.Mensaje.objects.create(ticket=ticket, asunto='Mensaje', descripcion='Mensaje', autor=ticket.asignado)
+            models.Actividad.objects.create(
+                colaborador=ticket.asignado, fecha=date(2021, 2, numero + 1), hora_inicio=time(9),
+                datos_actividad=models.DatosActividad.objects.first(), proyecto=models.Proyecto.objects.first()
+            )
+        # Filas con el mismo valor en el campo del orden, de a pares
+        instante = timezone.now()
+        for model, campo in [(models.Ticket, 'created'), (models.Mensaje, 'created'),
+                             (models.TicketLog, 'fecha_modificacion')]:
+            for indice, pk in enumerate(model.objects.order_by('pk').values_list('pk', flat=True)):
+                model.objects.filter(pk=pk).update(**{campo: instante - timedelta(seconds=indice // 2)})
+
+    def paginas(self, url, params=None):
+        ids, params = [], dict(params or {}, page_size=3)
+        while True:
+            datos = self.client.get(url, params).json()
+            ids += [fila['id'] for fila in datos['results']]
+            if not datos['next']:
+                return ids
+            params['cursor'] = parse_qs(urlparse(datos['next']).query)['cursor'][0]
+
+    def test_formato_de_respuesta(self):
+        for url in self.listados:
+            with self.subTest(url=url):
+                datos = self.client.get(url, {'page_size': 2}).json()
+                self.assertEqual(list(datos), ['next', 'previous', 'page_size', 'results'])
+                self.assertEqual((datos['page_size'], len(datos['results']), datos['previous']), (2, 2, None))
+                self.assertIsNotNone(datos['next'])
+
+    def test_valores_repetidos(self):
+        casos = [
+            ('/api/ticket/tickets/', None, models.Ticket.objects.order_by('-created', '-id')),
+            ('/api/ticket/tickets-logs/', None, models.TicketLog.objects.order_by('-fecha_modificacion', '-id')),
+            ('/api/ticket/mensajes/', None, models.Mensaje.objects.order_by('-created', '-id')),
+            ('/api/ticket/mensajes/', {'ordering': 'created'}, models.Mensaje.objects.order_by('created', 'id')),
+        ]
+        for url, params, queryset in casos:
+            with self.subTest(url=url, params=params):
+                esperados = list(queryset.values_list('id', flat=True))
+                with CaptureQueriesContext(connection) as consultas:
+                    self.assertEqual(self.paginas(url, params), esperados)
+                # El orden termina en la llave primaria, por lo que las filas repetidas no dependen del plan
+                tabla = queryset.model._meta.db_table
+                direccion = 'DESC' if queryset.query.order_by[-1].startswith('-') else 'ASC'
+                self.assertIn(f'"{tabla}"."id" {direccion} LIMIT', consultas.captured_queries[0]['sql'])
+
+    def test_pagina_anterior(self):
+        url = '/api/ticket/tickets/'
+        primera = self.client.get(url, {'page_size': 3}).json()
+        segunda = self.client.get(primera['next']).json()
+        anterior = self.client.get(segunda['previous']).json()
+        self.assertEqual([fila['id'] for fila in anterior['results']], [fila['id'] for fila in primera['results']])
+
+
+class CatalogCacheTests(APITestCase):
+    """
+    Las copias en memoria de los catálogos (ver :mod:`api.catalogs`) se invalidan con la versión guardada en la base de
+    datos, que comparten todos los procesos aunque el cache de Django sea local.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        # La versión en memoria puede ser de la base de datos de una prueba anterior
+        catalog_version.discard()
+        self.client.force_authenticate(CustomUser.objects.first())
+
+    def test_listado_sin_consultas(self):
+        url = '/api/ticket/prioridades/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_invalidacion_sin_cache_compartido(self):
+        url = '/api/ticket/prioridades/'
+        respuesta = self.client.get(url)
+        etag = respuesta['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        version = get_catalog_version()
+        # Escritura de otro proceso: sus receptores no se ejecutan aquí y no comparte el cache local de este proceso,
+        # solo la versión en la base de datos
+        models.Prioridad.objects.bulk_create([models.Prioridad(nombre='Nueva prioridad', valor=99)])
+        models.VersionCatalogos.objects.update(version=F('version') + 1)
+        self.assertEqual(get_catalog_version(), version)
+
+        # Pasado CATALOG_VERSION_TTL este proceso vuelve a leer la versión
+        despues = monotonic() + CATALOG_VERSION_TTL
+        with mock.patch('api.catalogs.time.monotonic', return_value=despues):
+            self.assertNotEqual(get_catalog_version(), version)
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Nueva prioridad', [prioridad['nombre'] for prioridad in respuesta.data])
+
+    def test_invalidacion_en_el_proceso(self):
+        url = '/api/ticket/prioridades/'
+        etag = self.client.get(url)['ETag']
+        models.Prioridad.objects.create(nombre='Creada aquí', valor=97)
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Creada aquí', [prioridad['nombre'] for prioridad in respuesta.data])
+
+    def test_listado_con_catalogo_desactualizado(self):
+        # La copia del catálogo no tiene la prioridad creada después (sin invalidación, como en otro proceso)
+        self.client.get('/api/ticket/tickets/', {'expand': 'prioridad'})
+        prioridad, = models.Prioridad.objects.bulk_create([models.Prioridad(nombre='Posterior', valor=98)])
+        models.Ticket.objects.filter(pk=models.Ticket.objects.order_by('pk').first().pk).update(prioridad=prioridad)
+
+        respuesta = self.client.get('/api/ticket/tickets/', {'expand': 'prioridad', 'page_size': 100})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Posterior', [ticket['prioridad']['nombre'] for ticket in respuesta.data['results']])
+
+    def test_catalogos_completos(self):
+        respuesta = self.client.get('/api/catalogos/')
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual(set(datos['catalogos']), {model._meta.model_name for model in CATALOG_MODELS})
+        self.assertEqual(respuesta['ETag'], f'"{datos["version"]}"')
+        for url, nombre in [('/api/ticket/prioridades/', 'prioridad'),
+                            ('/api/actividad/datos-actividades/', 'datosactividad')]:
+            self.assertEqual(datos['catalogos'][nombre], self.client.get(url).json())
+
+        comprimida = self.client.get('/api/catalogos/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(comprimida['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(comprimida.content)), datos)
+
+    def test_catalogos_no_modificados(self):
+        etag = self.client.get('/api/catalogos/')['ETag']
+        for valor in [etag, f'W/{etag}', f'"otro", {etag}']:
+            with self.subTest(if_none_match=valor), self.assertNumQueries(0):
+                respuesta = self.client.get('/api/catalogos/', HTTP_IF_NONE_MATCH=valor)
+                self.assertEqual(respuesta.status_code, 304)
+                self.assertEqual(respuesta.content, b'')
+                self.assertEqual(respuesta['ETag'], etag)
+        self.assertEqual(self.client.get('/api/catalogos/', HTTP_IF_NONE_MATCH='"otro"').status_code, 200)
+
+    def test_catalogos_invalidados(self):
+        respuesta = self.client.get('/api/catalogos/')
+        cargo = models.Cargo.objects.order_by('pk').first()
+        cargo.nombre = 'Cargo renombrado'
+        cargo.save()
+
+        nueva = self.client.get('/api/catalogos/', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(nueva.status_code, 200)
+        self.assertNotEqual(nueva['ETag'], respuesta['ETag'])
+        self.assertNotEqual(nueva.json()['version'], respuesta.json()['version'])
+        self.assertIn('Cargo renombrado', [fila['nombre'] for fila in nueva.json()['catalogos']['cargo']])
+
+
+class ProfileCacheTests(APITestCase):
+    """
+    Perfil del colaborador del login (ver :mod:`api.profiles`), guardado en el cache de Django.
+    """
+    fixtures = FIXTURES
+    password = 'clave-de-prueba-123'
+
+    def setUp(self):
+        cache.clear()
+        catalog_version.discard()
+        self.user = CustomUser.objects.get(colaborador=models.Colaborador.objects.get(pk=2))
+        self.user.set_password(self.password)
+        self.user.save()
+
+    def login(self):
+        response = self.client.post(
+            '/auth/token/', {'email': self.user.email, 'password': self.password}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_perfil_una_vez_por_login(self):
+        with mock.patch('api.profiles.profile_cache_key', wraps=profile_cache_key) as llave:
+            respuesta = self.login()
+        self.assertEqual(llave.call_count, 1)
+        self.assertEqual(respuesta['colaborador']['id'], 2)
+        self.assertEqual(AccessToken(respuesta['access'])['colaborador_id'], 2)
+
+    def assert_invalidado(self, cambio):
+        """
+        Verifica que ``cambio`` elimina el perfil del cache y que el siguiente login retorna los datos nuevos.
+        """
+        self.login()
+        key = profile_cache_key(self.user.pk)
+        self.assertIsNotNone(cache.get(key))
+        cambio()
+        self.assertIsNone(cache.get(key))
+        return self.login()['colaborador']
+
+    def test_cambio_de_colaborador(self):
+        def cambio():
+            colaborador = models.Colaborador.objects.get(pk=2)
+            colaborador.nombre = 'Renombrado'
+            colaborador.save()
+        self.assertEqual(self.assert_invalidado(cambio)['nombre'], 'Renombrado')
+
+    def test_cambio_de_contrato(self):
+        contrato = models.DatosContractuales.objects.get(colaborador=2)
+
+        def cambio():
+            contrato.sueldo_base = 123456
+            contrato.save()
+        self.assertEqual(self.assert_invalidado(cambio)['last_contrato']['sueldo_base'], 123456)
+
+        def nuevo_contrato():
+            organizacion = contrato.organizacion
+            contrato.pk = None
+            contrato.fecha_inicio = date(2021, 1, 1)
+            contrato.save()
+            organizacion.pk = None
+            organizacion.datos_contractuales = contrato
+            organizacion.save()
+        self.assertEqual(self.assert_invalidado(nuevo_contrato)['last_contrato']['id'], contrato.pk)
+
+        def borrado():
+            models.DatosContractuales.objects.get(pk=contrato.pk).delete()
+        self.assertNotEqual(self.assert_invalidado(borrado)['last_contrato']['id'], contrato.pk)
+
+    def test_cambio_de_organizacion(self):
+        organizacion = models.DatosOrganizacionales.objects.get(datos_contractuales__colaborador=2)
+        cargo = models.Cargo.objects.exclude(pk=organizacion.cargo_id).first()
+
+        def cambio():
+            organizacion.cargo = cargo
+            organizacion.save()
+        perfil = self.assert_invalidado(cambio)
+        self.assertEqual(perfil['last_contrato']['organizacion']['cargo'], {'nombre': cargo.nombre})
+
+    def test_login_sin_cambios(self):
+        # El login actualiza last_login, lo que no invalida el perfil
+        self.login()
+        with mock.patch('api.profiles.load_colaborador') as load:
+            self.login()
+        load.assert_not_called()
+
+
+class StatelessJWTTests(APITestCase):
+    """
+    Autenticación JWT desde los claims del token (ver :class:`api.authentication.StatelessJWTAuthentication`).
+    """
+    fixtures = FIXTURES
+    password = 'clave-de-prueba-123'
+
+    def setUp(self):
+        catalog_version.discard()
+        self.user = CustomUser.objects.get(colaborador=models.Colaborador.objects.get(pk=2))
+        self.user.set_password(self.password)
+        self.user.save()
+        revocation_cache.discard(self.user.pk)
+
+    def login(self):
+        response = self.client.post(
+            '/auth/token/', {'email': self.user.email, 'password': self.password}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['access']
+
+    def autenticar(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _token = StatelessJWTAuthentication().authenticate(request)
+        return user
+
+    def test_sin_consulta_del_usuario(self):
+        token = self.login()
+        with self.assertNumQueries(1):
+            user = self.autenticar(token)
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual((user.id, user.email, user.colaborador.pk), (self.user.pk, self.user.email, 2))
+        # La verificación de revocación queda en memoria por STATELESS_JWT_REVOCATION_TTL segundos
+        with self.assertNumQueries(0):
+            self.assertEqual(self.autenticar(token).id, self.user.pk)
+
+        url = '/api/ticket/prioridades/'
+        with mock.patch.object(APIView, 'authentication_classes', [StatelessJWTAuthentication]):
+            self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}').status_code, 200)
+
+    def test_token_sin_claims(self):
+        # Token emitido antes de agregar los claims: se carga el usuario como en JWTAuthentication
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            user = self.autenticar(token)
+        self.assertIsInstance(user, CustomUser)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_usuario_desactivado(self):
+        token = self.login()
+        self.autenticar(token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+
+    def test_revocacion_sin_senales(self):
+        token = self.login()
+        self.autenticar(token)
+        # Desactivación sin señales (por ejemplo desde otro proceso): se aplica pasada la vigencia de la verificación
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.autenticar(token).id, self.user.pk)
+        despues = monotonic() + revocation_cache.ttl
+        with mock.patch('api.authentication.time.monotonic', return_value=despues):
+            with self.assertRaises(AuthenticationFailed):
+                self.autenticar(token)
+
+    def test_cambio_de_contrasena(self):
+        # La vista carga el usuario completo para verificar la contraseña antigua
+        self.assertNotIn(StatelessJWTAuthentication, views.ChangePasswordView.authentication_classes)
+        token = self.login()
+        with mock.patch.object(APIView, 'authentication_classes', [StatelessJWTAuthentication]):
+            response = self.client.put(
+                f'/auth/change-password/{self.user.pk}/',
+                {'old_password': self.password, 'password': 'otra-clave-456', 'password2': 'otra-clave-456'},
+                format='json', HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('otra-clave-456'))
+
+
+class FallaEmailBackend(locmem.EmailBackend):
+    """
+    Backend de correo en memoria que falla con los destinatarios de ``falla.cl`` y cuenta las aperturas de la
+    conexión.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.aperturas = 0
+
+    def open(self):
+        self.aperturas += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any(destinatario.endswith('@falla.cl') for message in messages for destinatario in message.to):
+            raise ConnectionError('Conexión rechazada')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(APITestCase):
+    """
+    Bandeja de salida de correos de :mod:`api.outbox`, con el backend de correo en memoria.
+    """
+    fixtures = FIXTURES
+
+    def encolar(self, destinatario):
+        return encolar_correo('Asunto', 'Mensaje', [destinatario], html_message='<p>Mensaje</p>')
+
+    def vencer(self):
+        # Simula que pasó la espera de los correos reprogramados
+        models.CorreoSaliente.objects.update(siguiente_intento=timezone.now())
+
+    def test_envio(self):
+        correo = self.encolar('persona@ejemplo.cl')
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(procesar_correos(), (1, 0))
+        self.assertEqual(mail.outbox[0].to, ['persona@ejemplo.cl'])
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Mensaje</p>', 'text/html')])
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), (models.CorreoSaliente.Estado.ENVIADO, 1))
+        self.assertIsNotNone(correo.fecha_envio)
+        self.assertEqual(procesar_correos(), (0, 0))
+
+    def test_reintentos_con_espera(self):
+        self.assertEqual([espera_reintento(intentos).total_seconds() for intentos in [1, 2, 3]],
+                         [ESPERA_BASE, ESPERA_BASE * 2, ESPERA_BASE * 4])
+        self.assertEqual(espera_reintento(20).total_seconds(), ESPERA_MAXIMA)
+
+        correo = self.encolar('persona@falla.cl')
+        antes = timezone.now()
+        self.assertEqual(procesar_correos(connection=FallaEmailBackend(), max_intentos=3), (0, 1))
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), (models.CorreoSaliente.Estado.PENDIENTE, 1))
+        self.assertEqual(correo.ultimo_error, 'Conexión rechazada')
+        self.assertGreaterEqual(correo.siguiente_intento, antes + espera_reintento(1))
+        # Antes de la espera no se vuelve a intentar
+        self.assertEqual(procesar_correos(connection=FallaEmailBackend(), max_intentos=3), (0, 0))
+
+        for intentos in [2, 3]:
+            self.vencer()
+            self.assertEqual(procesar_correos(connection=FallaEmailBackend(), max_intentos=3), (0, 1))
+            correo.refresh_from_db()
+            self.assertEqual(correo.intentos, intentos)
+        self.assertEqual(correo.estado, models.CorreoSaliente.Estado.FALLIDO)
+        self.vencer()
+        self.assertEqual(procesar_correos(connection=FallaEmailBackend(), max_intentos=3), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+    def test_reabre_conexion_tras_error(self):
+        fallido = self.encolar('persona@falla.cl')
+        self.encolar('persona@ejemplo.cl')
+        models.CorreoSaliente.objects.filter(pk=fallido.pk).update(
+            siguiente_intento=timezone.now() - timedelta(minutes=1)
+        )
+        connection = FallaEmailBackend()
+        self.assertEqual(procesar_correos(connection=connection), (1, 1))
+        self.assertEqual(connection.aperturas, 2)
+        self.assertEqual([message.to for message in mail.outbox], [['persona@ejemplo.cl']])
+
+    def test_vistas_encolan(self):
+        usuario = CustomUser.objects.first()
+        response = self.client.post('/auth/request-reset-password/', {'email': usuario.email}, format='json')
+        self.assertEqual(response.status_code, 202)
+        response = self.client.post('/auth/email-verify-resend/', {'email': usuario.email}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            sorted(models.CorreoSaliente.objects.values_list('asunto', flat=True)),
+            ['Confirmación de correo electrónico', 'Reinicio de contraseña']
+        )
+
+        salida = io.StringIO()
+        call_command('enviar_correos', stdout=salida)
+        self.assertIn('Correos enviados: 2, con error: 0', salida.getvalue())
+        reinicio = next(message for message in mail.outbox if message.subject == 'Reinicio de contraseña')
+        self.assertEqual(reinicio.to, [usuario.email])
+        self.assertIn('new-password?uidb64=', reinicio.alternatives[0][0])
+
+
+class ContentStorageTests(APITestCase):
+    """
+    Almacenamiento direccionado por contenido (ver :mod:`api.storage`): deduplicación y recolección de contenidos sin
+    referencias.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=media_root)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.ticket = models.Ticket.objects.order_by('pk').first()
+
+    def adjuntar(self, filename, datos):
+        archivo = models.ArchivoTicket(ticket=self.ticket)
+        archivo.archivo.save(filename, ContentFile(datos))
+        return archivo
+
+    def test_mismo_contenido_distinta_extension(self):
+        jpg = self.adjuntar('foto.jpg', b'mismos bytes')
+        jpeg = self.adjuntar('foto.JPEG', b'mismos bytes')
+        self.assertEqual(jpg.archivo.name, jpeg.archivo.name)
+        contenido = models.ContenidoArchivo.objects.get(nombre=jpg.archivo.name)
+        self.assertEqual((contenido.referencias, contenido.tipo), (2, 'image/jpeg'))
+
+    def sin_referencias(self, datos):
+        nombre = self.adjuntar('a.txt', datos).archivo.name
+        models.ArchivoTicket.objects.filter(archivo=nombre).delete()
+        models.ContenidoArchivo.objects.filter(nombre=nombre).update(
+            referencias=0, modified=timezone.now() - timedelta(days=2)
+        )
+        os.utime(content_storage.path(nombre), (0, 0))
+        return nombre
+
+    def test_recoleccion(self):
+        nombre = self.sin_referencias(b'contenido')
+        self.assertEqual(collect_garbage(timedelta(hours=1)), (1, len(b'contenido')))
+        self.assertFalse(content_storage.exists(nombre))
+        self.assertFalse(models.ContenidoArchivo.objects.filter(nombre=nombre).exists())
+
+    def test_recoleccion_respeta_contenido_reutilizado(self):
+        nombre = self.sin_referencias(b'contenido')
+        limite = timezone.now() - timedelta(hours=1)
+        # Un guardado reutiliza el contenido después de que la recolección lo eligió como candidato, antes de que se
+        # confirme la referencia
+        self.assertEqual(content_storage.save('b.txt', ContentFile(b'contenido')), nombre)
+        self.assertIsNone(delete_content(nombre, limite, con_fila=True))
+        self.assertTrue(content_storage.exists(nombre))
+
+
+class TicketMetricsTests(APITestCase):
+    """
+    Métricas de :mod:`api.ticket_metrics` al eliminar tickets.
+    """
+    fixtures = FIXTURES
+
+    def test_eliminacion_no_altera_historial(self):
+        rebuild_ticket_metrics()
+        ticket = models.Ticket.objects.exclude(etapa_ticket=ETAPA_TICKET_FINALIZADA).order_by('pk').first()
+        historial = list(models.MetricaTicket.objects.order_by('pk').values('pk', 'entradas', 'salidas'))
+        abiertos = sum(fila['abiertos'] for fila in ticket_backlog(['etapa_ticket']))
+
+        ticket.delete()
+
+        self.assertEqual(
+            list(models.MetricaTicket.objects.filter(
+                pk__in=[fila['pk'] for fila in historial]
+            ).order_by('pk').values('pk', 'entradas', 'salidas')),
+            historial
+        )
+        eliminados = models.MetricaTicket.objects.get(eliminados=1)
+        self.assertEqual(eliminados.fecha, timezone.localdate())
+        self.assertEqual(sum(fila['abiertos'] for fila in ticket_backlog(['etapa_ticket'])), abiertos - 1)
+
+
+class ReportParametersTests(APITestCase):
+    """
+    Parámetros comunes de los reportes (ver :mod:`api.serializers.reportes`).
+    """
+
+    def errores(self, serializer_class, datos):
+        serializer = serializer_class(data=datos)
+        self.assertFalse(serializer.is_valid())
+        return serializer.errors
+
+    def test_dimensiones(self):
+        serializer = serializers.ResumenActividadParametrosSerializer(data={'agrupar': 'cargo, proyecto,cargo,'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['agrupar'], ['cargo', 'proyecto'])
+        serializer = serializers.ResumenActividadParametrosSerializer(data={})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['agrupar'], ['colaborador'])
+
+        self.assertIn('Dimensiones no válidas: etapa.', self.errores(
+            serializers.ResumenActividadParametrosSerializer, {'agrupar': 'cargo,etapa'}
+        )['agrupar'][0])
+        self.assertIn('agrupar', self.errores(serializers.ResumenActividadParametrosSerializer, {'agrupar': ','}))
+
+    def test_rango_de_fechas(self):
+        self.assertIn('hasta', self.errores(
+            serializers.ResumenActividadParametrosSerializer, {'desde': '2021-03-02', 'hasta': '2021-03-01'}
+        ))
+        # Sin rango por defecto ni máximo
+        serializer = serializers.ResumenActividadParametrosSerializer(data={'desde': '2000-01-01'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertNotIn('hasta', serializer.validated_data)
+
+        # Con rango por defecto y máximo
+        serializer = serializers.TiempoEtapaParametrosSerializer(data={'hasta': '2021-03-31'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(
+            serializer.validated_data['desde'], date(2021, 3, 31) - timedelta(days=TIEMPO_ETAPA_DIAS - 1)
+        )
+        desde = date(2021, 3, 31) - timedelta(days=TIEMPO_ETAPA_MAX_DIAS)
+        self.assertIn('desde', self.errores(
+            serializers.TiempoEtapaParametrosSerializer, {'desde': desde.isoformat(), 'hasta': '2021-03-31'}
+        ))
+
+
+class TimesheetReportTests(APITestCase):
+    """
+    Reporte de horas y actividades fuera de rango de :mod:`api.timesheets`, calculados en la base de datos.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        models.DatosActividad.objects.filter(pk__in=[1, 3]).update(tiempo_minimo=30, tiempo_maximo=120)
+        self.cargos = dict(models.DatosActividad.objects.filter(pk__in=[1, 3]).values_list('pk', 'cargo'))
+        proyecto = models.Proyecto.objects.first()
+        for colaborador, fecha, inicio, termino, datos_actividad in [
+            (1, date(2021, 3, 1), time(9), time(10), 1),
+            (1, date(2021, 3, 3), time(9), time(9, 10), 1),
+            # Cruza la medianoche: 22:00 a 01:00 son 180 minutos
+            (1, date(2021, 3, 8), time(22), time(1), 1),
+            (1, date(2021, 4, 1), time(9), None, 1),
+            (2, date(2021, 3, 2), time(14), time(14, 45), 3),
+        ]:
+            models.Actividad.objects.create(
+                colaborador_id=colaborador, fecha=fecha, hora_inicio=inicio, hora_termino=termino,
+                datos_actividad_id=datos_actividad, proyecto=proyecto
+            )
+
+    def totales(self, filas, *llaves):
+        return [
+            tuple(fila[llave] for llave in [*llaves, *RESUMEN_TOTALES])
+            for fila in filas
+        ]
+
+    def test_periodo_semana(self):
+        filas = timesheet_report(['colaborador'], 'semana', colaborador=1)
+        self.assertEqual(self.totales(filas, 'periodo', 'colaborador'), [
+            (date(2021, 3, 1), 1, 2, 70, 0, 1, 0),
+            (date(2021, 3, 8), 1, 1, 180, 0, 0, 1),
+            (date(2021, 3, 29), 1, 1, 0, 1, 0, 0),
+        ])
+        self.assertEqual([fila['horas'] for fila in filas], [1.17, 3.0, 0.0])
+
+    def test_periodo_mes(self):
+        filas = timesheet_report(['colaborador'], 'mes', desde=date(2021, 3, 1), hasta=date(2021, 4, 30))
+        self.assertEqual(self.totales(filas, 'periodo', 'colaborador'), [
+            (date(2021, 3, 1), 1, 3, 250, 0, 1, 1),
+            (date(2021, 3, 1), 2, 1, 45, 0, 0, 0),
+            (date(2021, 4, 1), 1, 1, 0, 1, 0, 0),
+        ])
+
+    def test_dimension_cargo(self):
+        filas = timesheet_report(['cargo'])
+        self.assertEqual(
+            sorted(self.totales(filas, 'cargo')),
+            sorted([(self.cargos[1], 4, 250, 1, 1, 1), (self.cargos[3], 1, 45, 0, 0, 0)])
+        )
+        self.assertEqual(self.totales(timesheet_report(['cargo'], cargo=self.cargos[3]), 'cargo'),
+                         [(self.cargos[3], 1, 45, 0, 0, 0)])
+
+    def test_fuera_de_rango(self):
+        filas = list(actividades_fuera_de_rango(models.Actividad.objects.all()))
+        self.assertEqual(
+            [(fila['fecha'], fila['duracion'], fila['tiempo_minimo'], fila['tiempo_maximo']) for fila in filas],
+            [(date(2021, 3, 3), 10, 30, 120), (date(2021, 3, 8), 180, 30, 120)]
+        )
+        duraciones = dict(
+            models.Actividad.objects.annotate(duracion=DuracionMinutos()).values_list('fecha', 'duracion')
+        )
+        self.assertEqual(duraciones[date(2021, 3, 8)], 180)
+        self.assertIsNone(duraciones[date(2021, 4, 1)])
+
+
+class BulkTests(APITestCase):
+    """
+    Escrituras en lote de :class:`api.bulk.BulkMixin` sobre ``actividad/actividades/lote/``.
+    """
+    fixtures = FIXTURES
+    url = '/api/actividad/actividades/lote/'
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.first())
+        self.colaborador = models.Colaborador.objects.order_by('pk').first()
+
+    def actividad(self, **campos):
+        return {
+            'colaborador': self.colaborador.pk, 'fecha': '2021-03-01', 'hora_inicio': '09:00',
+            'hora_termino': '10:30', 'datos_actividad': 1, 'proyecto': 1, **campos
+        }
+
+    def test_lote_con_elementos_invalidos(self):
+        response = self.client.post(self.url, [
+            self.actividad(), self.actividad(proyecto=999), self.actividad(hora_inicio='25:00')
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        errores = response.json()
+        self.assertEqual(len(errores), 3)
+        self.assertEqual(errores[0], {})
+        self.assertEqual(list(errores[1]), ['proyecto'])
+        self.assertEqual(list(errores[2]), ['hora_inicio'])
+        self.assertFalse(models.Actividad.objects.exists())
+        self.assertFalse(models.ResumenActividad.objects.exists())
+
+    def test_receptor_bulk_saved(self):
+        response = self.client.post(self.url, [
+            self.actividad(), self.actividad(hora_inicio='11:00', hora_termino='11:45')
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 2)
+        resumen = models.ResumenActividad.objects.get()
+        self.assertEqual(
+            (resumen.colaborador_id, resumen.fecha, resumen.proyecto_id, resumen.cantidad, resumen.minutos),
+            (self.colaborador.pk, date(2021, 3, 1), 1, 2, 135)
+        )
+
+
+class StreamCortado(io.BytesIO):
+    """
+    Cuerpo de solicitud que se corta después de entregar sus bytes, como ``UnreadablePostError`` de Django.
+    """
+
+    def read(self, size=-1):
+        bloque = super().read(size)
+        if not bloque:
+            raise UnreadablePostError('conexión cortada')
+        return bloque
+
+
+class ChunkedUploadTests(APITestCase):
+    """
+    Carga por partes de :class:`api.uploads.ChunkedUploadMixin` sobre ``ticket/archivos-ticket/cargas/``.
+    """
+    fixtures = FIXTURES
+    url = '/api/ticket/archivos-ticket/cargas/'
+    datos = bytes(range(256)) * 40
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=media_root)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.client.force_authenticate(CustomUser.objects.first())
+        response = self.client.post(self.url, {
+            'ticket': models.Ticket.objects.order_by('pk').first().pk, 'nombre': 'datos.bin',
+            'tamano': len(self.datos), 'sha256': hashlib.sha256(self.datos).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.carga_url = f'{self.url}{response.json()["id"]}/'
+
+    def parte(self, offset, datos, **extra):
+        return self.client.generic(
+            'PATCH', self.carga_url, datos, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset), **extra
+        )
+
+    def recibido(self):
+        response = self.client.get(self.carga_url)
+        self.assertEqual(response['Upload-Offset'], str(response.json()['recibido']))
+        return response.json()['recibido']
+
+    def test_offset_distinto(self):
+        self.assertEqual(self.parte(0, self.datos[:1000]).status_code, 200)
+        response = self.parte(500, self.datos[500:1500])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.recibido(), 1000)
+
+    def test_carga_de_otro_usuario(self):
+        # El colaborador participa en el ticket, pero la carga la inició otro usuario
+        self.client.force_authenticate(CustomUser.objects.get(colaborador=models.Colaborador.objects.get(pk=2)))
+        self.assertEqual(self.client.get(self.carga_url).status_code, 404)
+        self.assertEqual(self.parte(0, self.datos[:1000]).status_code, 404)
+        self.assertEqual(self.client.delete(self.carga_url).status_code, 404)
+        self.assertEqual(models.CargaArchivo.objects.get().recibido, 0)
+
+    def test_ticket_sin_participacion(self):
+        self.client.force_authenticate(CustomUser.objects.get(colaborador=models.Colaborador.objects.get(pk=2)))
+        ticket = models.Ticket.objects.get(pk=1)
+        datos = {'ticket': ticket.pk, 'nombre': 'datos.bin', 'tamano': len(self.datos)}
+        self.assertEqual(self.client.post(self.url, datos, format='json').status_code, 201)
+
+        # Copia del ticket en la que el colaborador del usuario no participa
+        ticket.pk = None
+        ticket.solicitante = ticket.asignado
+        ticket.save()
+        datos['ticket'] = ticket.pk
+        self.assertEqual(self.client.post(self.url, datos, format='json').status_code, 403)
+        self.assertFalse(models.CargaArchivo.objects.filter(ticket=ticket).exists())
+
+    def test_parte_en_curso(self):
+        # Mientras otra solicitud escribe la carga, el archivo temporal está bloqueado
+        with open(upload_temp_path(models.CargaArchivo.objects.get()), 'r+b') as archivo:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+            self.assertEqual(self.parte(0, self.datos[:1000]).status_code, 409)
+        self.assertEqual(self.parte(0, self.datos[:1000]).status_code, 200)
+        self.assertEqual(self.recibido(), 1000)
+
+    def test_checksum_incorrecto(self):
+        parte = self.datos[:1000]
+        checksum = 'sha256 ' + base64.b64encode(hashlib.sha256(parte[::-1]).digest()).decode()
+        response = self.parte(0, parte, HTTP_UPLOAD_CHECKSUM=checksum)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Upload-Checksum', response.json())
+        self.assertEqual(self.recibido(), 0)
+        self.assertEqual(self.parte(0, parte, HTTP_UPLOAD_CHECKSUM='md5 abc').status_code, 400)
+
+    def test_reanudar_y_completar(self):
+        # La conexión se corta después de 3000 de los 6000 bytes de la parte: se conservan los recibidos
+        carga = models.CargaArchivo.objects.get()
+        write_chunk(carga, StreamCortado(self.datos[:3000]), 0, 6000)
+        self.assertEqual(self.recibido(), 3000)
+        self.assertEqual(os.path.getsize(upload_temp_path(carga)), 3000)
+
+        # La parte siguiente llega a otro proceso, sin el SHA-256 en curso
+        discard_digest(carga.pk)
+        checksum = 'sha256 ' + base64.b64encode(hashlib.sha256(self.datos[3000:]).digest()).decode()
+        response = self.parte(3000, self.datos[3000:], HTTP_UPLOAD_CHECKSUM=checksum)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Upload-Offset'], str(len(self.datos)))
+        self.assertFalse(models.CargaArchivo.objects.exists())
+
+        archivo = models.ArchivoTicket.objects.get(pk=response.json()['id'])
+        with archivo.archivo.open('rb') as contenido:
+            self.assertEqual(contenido.read(), self.datos)
+        self.assertEqual(self.client.get(self.carga_url).status_code, 404)
+
+
+class AttachmentDownloadTests(APITestCase):
+    """
+    Autorización y rangos de :class:`api.downloads.AttachmentDownloadMixin` sobre ``ticket/archivos-ticket/``.
+    """
+    fixtures = FIXTURES
+    url = '/api/ticket/archivos-ticket/'
+    datos = bytes(range(256)) * 4
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=media_root)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        ticket = models.Ticket.objects.get(pk=1)
+        self.participado = self.adjuntar(ticket, b'participa' + self.datos)
+        # Copia del ticket en la que el colaborador del usuario no participa
+        ticket.pk = None
+        ticket.solicitante = ticket.asignado
+        ticket.save()
+        self.ajeno = self.adjuntar(ticket, self.datos)
+        self.usuario = CustomUser.objects.get(colaborador=models.Colaborador.objects.get(pk=2))
+        self.client.force_authenticate(self.usuario)
+
+    def adjuntar(self, ticket, datos):
+        archivo = models.ArchivoTicket(ticket=ticket)
+        archivo.archivo.save('datos.bin', ContentFile(datos))
+        return archivo
+
+    def test_listado_y_detalle_restringidos(self):
+        self.assertEqual([archivo['id'] for archivo in self.client.get(self.url).json()], [self.participado.pk])
+        self.assertEqual(self.client.get(f'{self.url}{self.participado.pk}/').status_code, 200)
+        self.assertEqual(self.client.get(f'{self.url}{self.ajeno.pk}/').status_code, 404)
+
+        self.client.force_authenticate(CustomUser.objects.filter(colaborador=None, is_staff=False).first())
+        self.assertEqual(self.client.get(self.url).json(), [])
+
+        self.client.force_authenticate(CustomUser.objects.first())
+        self.assertEqual(len(self.client.get(self.url).json()), 2)
+
+    def test_escritura_sin_participacion(self):
+        url = f'{self.url}{self.ajeno.pk}/'
+        self.assertEqual(self.client.put(url, {'ticket': self.ajeno.ticket_id}).status_code, 404)
+        self.assertEqual(self.client.patch(url, {}).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertTrue(models.ArchivoTicket.objects.filter(pk=self.ajeno.pk).exists())
+
+        mensaje = models.Mensaje.objects.create(
+            ticket=self.ajeno.ticket, asunto='Adjunto', descripcion='Adjunto', autor=self.ajeno.ticket.asignado
+        )
+        imagen = models.ArchivoMensaje(mensaje=mensaje)
+        imagen.archivo.save('imagen.png', ContentFile(b'imagen'))
+        url = f'/api/ticket/archivos-mensaje/{imagen.pk}/'
+        self.assertEqual(self.client.put(url, {'mensaje': mensaje.pk}).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertTrue(models.ArchivoMensaje.objects.filter(pk=imagen.pk).exists())
+
+    def test_descarga_sin_participacion(self):
+        self.assertEqual(self.client.get(f'{self.url}{self.ajeno.pk}/descargar/').status_code, 403)
+
+    def test_rangos(self):
+        url = f'{self.url}{self.participado.pk}/descargar/'
+        response = self.client.get(url, HTTP_RANGE='bytes=9-18')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 9-18/{len(self.datos) + 9}')
+        self.assertEqual(b''.join(response.streaming_content), self.datos[:10])
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(self.datos) + 9}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.datos) + 9}')
+
+
+class ThumbnailTests(APITestCase):
+    """
+    Miniaturas de imágenes de mensajes de :mod:`api.thumbnails` y de la ruta
+    ``ticket/archivos-mensaje/<id>/miniatura/``.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=media_root)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.client.force_authenticate(CustomUser.objects.first())
+        ticket = models.Ticket.objects.get(pk=1)
+        mensaje = models.Mensaje.objects.create(
+            ticket=ticket, asunto='Captura', descripcion='Captura de pantalla', autor=ticket.asignado
+        )
+        self.imagen = models.ArchivoMensaje(mensaje=mensaje)
+        self.imagen.archivo.save('captura.jpg', ContentFile(self.jpeg(1600, 1200)))
+        self.url = f'/api/ticket/archivos-mensaje/{self.imagen.pk}/'
+
+    def jpeg(self, ancho, alto):
+        datos = io.BytesIO()
+        Image.new('RGB', (ancho, alto), (200, 30, 30)).save(datos, 'JPEG')
+        return datos.getvalue()
+
+    def test_render_con_draft(self):
+        nombre = self.imagen.archivo.name
+        draft = JpegImageFile.draft
+        with mock.patch.object(JpegImageFile, 'draft', autospec=True, side_effect=draft) as llamada:
+            escritas = render_thumbnails(content_storage.path(nombre), thumbnail_targets(nombre))
+        lado_mayor = max(MINIATURA_TAMANOS.values())
+        llamada.assert_called_once_with(mock.ANY, 'RGB', (lado_mayor, lado_mayor))
+        self.assertEqual(escritas, len(MINIATURA_TAMANOS) * len(MINIATURA_FORMATOS))
+        for lado, _formato, _opciones, path in thumbnail_targets(nombre):
+            with Image.open(path) as miniatura:
+                self.assertEqual(max(miniatura.size), lado)
+                self.assertEqual(miniatura.size[0] * 3, miniatura.size[1] * 4)
+
+    def test_miniatura_pendiente_y_generada(self):
+        self.assertTrue(models.MiniaturaPendiente.objects.filter(nombre=self.imagen.archivo.name).exists())
+        response = self.client.get(f'{self.url}miniatura/', HTTP_ACCEPT='image/webp')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Retry-After'], str(MINIATURA_REINTENTO))
+
+        self.assertEqual(process_thumbnails(), (1, 0))
+        self.assertFalse(models.MiniaturaPendiente.objects.exists())
+        response = self.client.get(f'{self.url}miniatura/', HTTP_ACCEPT='image/webp')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+        response = self.client.get(f'{self.url}miniatura/', {'tamano': 'mediana', 'formato': 'jpeg'})
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(self.client.get(f'{self.url}miniatura/', {'tamano': 'enorme'}).status_code, 400)
+
+        # La misma imagen adjunta en otro mensaje comparte las miniaturas y no se vuelve a encolar
+        otra = models.ArchivoMensaje(mensaje=self.imagen.mensaje)
+        otra.archivo.save('copia.jpg', ContentFile(self.jpeg(1600, 1200)))
+        self.assertFalse(models.MiniaturaPendiente.objects.exists())
+
+    def test_urls_en_serializador(self):
+        miniaturas = self.client.get(self.url).json()['miniaturas']
+        self.assertEqual(set(miniaturas), set(MINIATURA_TAMANOS))
+        for tamano, url in miniaturas.items():
+            self.assertTrue(url.endswith(f'{self.url}miniatura/?tamano={tamano}'))
+
+    def test_grupo_de_procesos_roto(self):
+        # Un proceso del grupo terminó abruptamente: no es un error de la imagen y no cuenta como intento
+        def enviar(funcion, *args):
+            futuro = Future()
+            futuro.set_exception(BrokenProcessPool('proceso terminado'))
+            return futuro
+
+        with self.assertRaises(BrokenProcessPool):
+            process_thumbnails(executor=mock.Mock(submit=enviar))
+        pendiente = models.MiniaturaPendiente.objects.get()
+        self.assertEqual((pendiente.intentos, pendiente.ultimo_error), (0, None))
+
+
+class TicketHistoryTests(APITestCase):
+    """
+    Historial de cambios de tickets de :mod:`api.ticket_history`.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        self.user = CustomUser.objects.first()
+        self.client.force_authenticate(self.user)
+
+    def test_actualizacion_registra_un_cambio(self):
+        ticket = models.Ticket.objects.get(pk=1)
+        anteriores = set(models.TicketLog.objects.values_list('pk', flat=True))
+        response = self.client.patch('/api/ticket/tickets/1/', {'asunto': 'Asunto nuevo'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        log = models.TicketLog.objects.exclude(pk__in=anteriores).get()
+        self.assertEqual(log.ticket_id, 1)
+        self.assertEqual(log.historial, {'asunto': [ticket.asunto, 'Asunto nuevo']})
+        self.assertEqual(log.responsable_id, self.user.colaborador.pk)
+
+    def test_historial_solo_insercion(self):
+        log = models.TicketLog.objects.create(ticket_id=1, historial={'asunto': ['a', 'b']})
+        url = f'/api/ticket/tickets-logs/{log.pk}/'
+        self.assertEqual(self.client.put(url, {'ticket': 1, 'historial': {}}, format='json').status_code, 405)
+        self.assertEqual(self.client.patch(url, {'historial': {}}, format='json').status_code, 405)
+        self.assertEqual(self.client.delete(url).status_code, 405)
+        log.refresh_from_db()
+        self.assertEqual(log.historial, {'asunto': ['a', 'b']})
+
+    def test_historial_manual_no_altera_metricas(self):
+        rebuild_ticket_metrics()
+        metricas = list(models.MetricaTicket.objects.order_by('pk').values())
+        estados = list(models.EstadoMetricaTicket.objects.order_by('pk').values())
+
+        response = self.client.post('/api/ticket/tickets-logs/', {
+            'ticket': 1, 'historial': {'etapa_ticket': [1, ETAPA_TICKET_FINALIZADA]}
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('historial', response.data)
+        response = self.client.post('/api/ticket/tickets-logs/', {
+            'ticket': 1, 'historial': {'revision': ['pendiente', 'lista']}
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(list(models.MetricaTicket.objects.order_by('pk').values()), metricas)
+        self.assertEqual(list(models.EstadoMetricaTicket.objects.order_by('pk').values()), estados)
+
+
+class TicketSearchTests(APITestCase):
+    """
+    Búsqueda de texto completo de tickets de :func:`api.search.search_tickets`.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.first())
+        base = models.Ticket.objects.get(pk=1)
+        self.directo, self.por_mensaje, self.ninguno = (
+            self.crear_ticket(base, asunto, descripcion) for asunto, descripcion in [
+                ('Impresora sin tóner', 'La impresora del segundo piso no imprime.'),
+                ('Problema en oficina', 'Algo no funciona en la oficina.'),
+                ('Cambio de clave', 'Necesito cambiar mi clave de acceso.'),
+            ]
+        )
+        models.Mensaje.objects.create(
+            ticket=self.por_mensaje, asunto='Detalle', autor=base.asignado,
+            descripcion='Revisé el equipo y el problema es la impresora de la sala de reuniones.'
+        )
+        models.Mensaje.objects.create(
+            ticket=self.ninguno, asunto='Detalle', autor=base.asignado, descripcion='La clave ya fue cambiada.'
+        )
+
+    def crear_ticket(self, base, asunto, descripcion):
+        ticket = models.Ticket.objects.get(pk=base.pk)
+        ticket.pk = None
+        ticket.asunto = asunto
+        ticket.descripcion = descripcion
+        ticket.save()
+        return ticket
+
+    def test_resultados_ordenados_con_fragmento(self):
+        response = self.client.get('/api/ticket/tickets/buscar/', {'q': 'impresora'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual([resultado['id'] for resultado in response.data], [self.directo.pk, self.por_mensaje.pk])
+        directo, por_mensaje = response.data
+        self.assertGreater(directo['rank'], por_mensaje['rank'])
+        self.assertGreater(por_mensaje['rank'], 0)
+        self.assertIn('<mark>impresora</mark>', directo['snippet'])
+        # El ticket que solo coincide por un mensaje muestra el fragmento del mensaje
+        self.assertIn('<mark>impresora</mark> de la sala', por_mensaje['snippet'])
+
+    def test_fragmento_escapado(self):
+        models.Mensaje.objects.create(
+            ticket=self.ninguno, asunto='Detalle', autor=self.ninguno.asignado,
+            descripcion='La <script>alert("impresora")</script> & <b>otra</b> impresora de Pedro\'s'
+        )
+        response = self.client.get('/api/ticket/mensajes/buscar/', {'q': 'impresora'})
+        snippet = next(mensaje['snippet'] for mensaje in response.data if mensaje['ticket'] == self.ninguno.pk)
+        self.assertIn('alert(&quot;<mark>impresora</mark>&quot;)&lt;/script&gt; &amp; &lt;b&gt;', snippet)
+        # El único marcado del fragmento es <mark>
+        self.assertNotRegex(snippet.replace('<mark>', '').replace('</mark>', ''), '[<>"\']')
+
+
+def pg_trgm_available():
+    """
+    Función que indica si la extensión ``pg_trgm`` está instalada en la base de datos de pruebas.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class TypeaheadTests(APITestCase):
+    """
+    Autocompletado de colaboradores por nombre o RUN (ver :func:`api.search.typeahead_colaboradores`).
+    """
+    fixtures = FIXTURES
+    url = '/api/colaborador/colaboradores/autocompletar/'
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.first())
+
+    def test_normalize_run(self):
+        for texto, esperado in [
+            ('18.734.677-0', '187346770'),
+            ('12345678-k', '12345678K'),
+            (' 1111 ', '1111'),
+            ('Maldonado', None),
+            ('K', None),
+            ('-', None),
+            ('', None),
+        ]:
+            with self.subTest(texto=texto):
+                self.assertEqual(normalize_run(texto), esperado)
+
+    def test_parse_limit(self):
+        self.assertEqual([parse_limit(valor, 10, 50) for valor in [None, 'x', '0', '7', '999']], [10, 10, 1, 7, 50])
+
+    def test_prefijo_de_run(self):
+        self.assertEqual(typeahead_colaboradores('18.734'), [
+            {'id': 1, 'full_name': 'Felipe Maldonado Gallardo', 'run': '187346770'}
+        ])
+        self.assertEqual([fila['id'] for fila in typeahead_colaboradores('1')], [2, 1])
+        self.assertEqual([fila['id'] for fila in typeahead_colaboradores('1', limit=1)], [2])
+        self.assertEqual(typeahead_colaboradores('3333'), [])
+
+    def test_vista(self):
+        self.assertEqual(self.client.get(self.url, {'q': '  '}).json(), [])
+        respuesta = self.client.get(self.url, {'q': '2222', 'limit': 'x'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([fila['id'] for fila in respuesta.json()], [3])
+
+    def test_trigramas(self):
+        if not pg_trgm_available():
+            self.skipTest('La extensión pg_trgm no está instalada.')
+        self.assertEqual([fila['id'] for fila in typeahead_colaboradores('Maldo')], [1])
+        self.assertEqual([fila['id'] for fila in typeahead_colaboradores('benjamin salas')], [2])
+        respuesta = self.client.get(self.url, {'q': 'Valentina'})
+        self.assertEqual([fila['full_name'] for fila in respuesta.json()], ['Valentina Cáceres Perez'])
+
+
+class IndexReportTests(APITestCase):
+    """
+    Comando ``index_report``: advertencia por índices parciales de tickets que no coinciden con
+    ``ETAPA_TICKET_FINALIZADA``.
+    """
+    fixtures = FIXTURES
+
+    def reporte(self):
+        salida = io.StringIO()
+        call_command('index_report', stdout=salida, no_color=True)
+        return salida.getvalue()
+
+    def test_predicado_distinto(self):
+        self.assertNotIn('ticket_abierto_etapa_idx: WHERE', self.reporte())
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX ticket_abierto_etapa_idx')
+            cursor.execute(
+                'CREATE INDEX ticket_abierto_etapa_idx ON api_ticket (etapa_ticket_id, prioridad_id) '
+                'WHERE etapa_ticket_id <> %s', [ETAPA_TICKET_FINALIZADA + 1]
+            )
+        self.assertIn(
+            f'ticket_abierto_etapa_idx: WHERE (etapa_ticket_id <> {ETAPA_TICKET_FINALIZADA + 1})', self.reporte()
+        )
+
+
+class TicketStagesTests(APITestCase):
+    """
+    Tiempos en etapa de :mod:`api.ticket_stages`.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.first())
+
+    def test_cache_de_finalizados_validado_en_la_base_de_datos(self):
+        rebuild_ticket_metrics()
+        self.client.patch('/api/ticket/tickets/1/', {'etapa_ticket': ETAPA_TICKET_FINALIZADA}, format='json')
+        antes = ticket_stage_times(models.Ticket.objects.filter(pk=1))[1]
+
+        # Otro proceso reabre y vuelve a finalizar el ticket; la invalidación de su cache no llega a este
+        ahora = timezone.now()
+        models.TicketLog.objects.bulk_create([
+            models.TicketLog(ticket_id=1, historial={'etapa_ticket': [ETAPA_TICKET_FINALIZADA, 2]},
+                             fecha_modificacion=ahora + timedelta(seconds=1)),
+            models.TicketLog(ticket_id=1, historial={'etapa_ticket': [2, ETAPA_TICKET_FINALIZADA]},
+                             fecha_modificacion=ahora + timedelta(seconds=2)),
+        ])
+        models.EstadoMetricaTicket.objects.filter(ticket_id=1).update(desde=ahora + timedelta(seconds=2))
+
+        despues = ticket_stage_times(models.Ticket.objects.filter(pk=1))[1]
+        self.assertEqual(len(despues), len(antes) + 1)
+        self.assertEqual(despues[-1]['etapa_ticket'], 2)
+
+    def test_rango_de_fechas(self):
+        url = '/api/ticket/tickets/tiempos-en-etapa/'
+        self.assertEqual(self.client.get(url, {'desde': '2020-01-01', 'hasta': '2021-06-30'}).status_code, 400)
+        response = self.client.get(url, {'desde': '2021-01-01', 'hasta': '2021-06-30', 'agrupar': 'etapa_ticket'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(fila['cantidad'] for fila in response.json()), models.Ticket.objects.count())
+
+    def test_lotes(self):
+        ids = list(models.Ticket.objects.order_by('pk').values_list('pk', flat=True))
+        lotes = ticket_batches(models.Ticket.objects.all(), batch_size=1)
+        self.assertEqual([list(infos) for infos in lotes], [[pk] for pk in ids])
+
+
+async def django_application(scope, receive, send):
+    raise AssertionError('La ruta no debe llegar a Django.')
+
+
+@mock.patch('api.realtime.close_old_connections', lambda: None)
+class RealtimeTests(APITestCase):
+    """
+    Canales en tiempo real de :mod:`api.realtime`: autenticación por encabezado o ``?token=`` y rechazo de usuarios
+    que no participan en el ticket. ``close_old_connections`` se omite porque cerraría la transacción del test.
+    """
+    fixtures = FIXTURES
+
+    def setUp(self):
+        self.token = str(AccessToken.for_user(CustomUser.objects.get(colaborador=2)))
+        # Copia del ticket 1 en la que el colaborador 2 no participa
+        ticket = models.Ticket.objects.get(pk=1)
+        ticket.pk = None
+        ticket.solicitante = ticket.asignado
+        ticket.save()
+        self.ajeno = ticket.pk
+
+    def scope(self, tipo, ticket_id, token=None, header=None):
+        return {
+            'type': tipo, 'path': f'/tiempo-real/tickets/{ticket_id}/', 'method': 'GET',
+            'query_string': f'token={token}'.encode() if token else b'',
+            'headers': [(b'authorization', f'Bearer {header}'.encode())] if header else [],
+        }
+
+    @async_to_sync
+    async def websocket(self, scope, evento=None):
+        comunicador = ApplicationCommunicator(realtime_application(django_application), scope)
+        await comunicador.send_input({'type': 'websocket.connect'})
+        mensajes = [await comunicador.receive_output(5)]
+        if mensajes[0]['type'] == 'websocket.accept' and await comunicador.receive_nothing(0.5):
+            if evento is not None:
+                get_broker().publish(ticket_channel(evento['ticket']), evento)
+                mensajes.append(await comunicador.receive_output(5))
+            await comunicador.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await comunicador.wait(5)
+        else:
+            mensajes.append(await comunicador.receive_output(5))
+        return mensajes
+
+    @async_to_sync
+    async def sse(self, scope):
+        comunicador = ApplicationCommunicator(realtime_application(django_application), scope)
+        await comunicador.send_input({'type': 'http.request', 'body': b''})
+        inicio = await comunicador.receive_output(5)
+        cuerpo = await comunicador.receive_output(5)
+        if cuerpo.get('more_body'):
+            await comunicador.send_input({'type': 'http.disconnect'})
+            await comunicador.wait(5)
+        return inicio['status'], dict(inicio['headers']).get(b'content-type'), cuerpo['body']
+
+    def test_websocket_con_encabezado(self):
+        evento = {'tipo': 'mensaje', 'accion': 'creado', 'ticket': 1, 'id': 1, 'datos': None}
+        aceptado, recibido = self.websocket(self.scope('websocket', 1, header=self.token), evento)
+        self.assertEqual(aceptado['type'], 'websocket.accept')
+        self.assertEqual(json.loads(recibido['text']), evento)
+
+    def test_websocket_con_parametro(self):
+        self.assertEqual(len(self.websocket(self.scope('websocket', 1, token=self.token))), 1)
+
+    def test_websocket_rechazos(self):
+        for scope, codigo in [
+            (self.scope('websocket', self.ajeno, token=self.token), 4403),
+            (self.scope('websocket', 1, token='invalido'), 4401),
+            (self.scope('websocket', 1), 4401),
+            (self.scope('websocket', 999, header=self.token), 4404),
+        ]:
+            aceptado, cierre = self.websocket(scope)
+            self.assertEqual(aceptado['type'], 'websocket.accept')
+            self.assertEqual(cierre, {'type': 'websocket.close', 'code': codigo})
+
+    def test_sse(self):
+        self.assertEqual(self.sse(self.scope('http', 1, header=self.token)),
+                         (200, b'text/event-stream', b': conectado\n\n'))
+        self.assertEqual(self.sse(self.scope('http', 1, token=self.token))[0], 200)
+        self.assertEqual(self.sse(self.scope('http', self.ajeno, header=self.token))[0], 403)
+        self.assertEqual(self.sse(self.scope('http', 1))[0], 401)
+
+
+class PostgresBrokerTests(APITestCase):
+    """
+    Registro de canales con interesados de :class:`api.realtime.PostgresBroker`.
+    """
+
+    def test_canales_con_suscriptores(self):
+        escucha, escritor = PostgresBroker(), PostgresBroker()
+        escucha.register_interest(connection.connection, {ticket_channel(1)})
+        self.assertTrue(escritor.has_subscribers(ticket_channel(1)))
+        self.assertFalse(escritor.has_subscribers(ticket_channel(2)))
+
+        escucha.register_interest(connection.connection, set())
+        # La lista de canales se reutiliza durante INTERES_CACHE segundos
+        self.assertTrue(escritor.has_subscribers(ticket_channel(1)))
+        escritor._interes = (None, frozenset())
+        self.assertFalse(escritor.has_subscribers(ticket_channel(1)))
@@ -0,0 +1,285 @@
+import hashlib
+import os
+import uuid
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from PIL import Image, ImageOps
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotAcceptable, NotFound, ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.response import Response
+
+from api.downloads import AttachmentDownloadMixin, attachment_response
+from api.models import MiniaturaPendiente
+from api.storage import content_digest, content_storage
+
+# Directorio del almacenamiento con las miniaturas, indexadas por el digest de la imagen de origen
+MINIATURAS_DIR = 'files/miniaturas'
+
+# Lado máximo (en pixeles) de cada tamaño de miniatura
+MINIATURA_TAMANOS = {
+    'chica': 160,
+    'mediana': 640,
+}
+MINIATURA_TAMANO_DEFECTO = 'chica'
+
+# Formatos generados: formato de Pillow, extensión y opciones de guardado
+MINIATURA_FORMATOS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Intentos de generación antes de dejar una imagen como fallida
+MINIATURA_MAX_INTENTOS = 3
+
+# Segundos sugeridos al cliente (Retry-After) mientras la miniatura se genera
+MINIATURA_REINTENTO = 2
+
+
+def thumbnail_key(nombre):
+    """
+    Función que retorna la llave de las miniaturas de una imagen: su SHA-256 si está direccionada por contenido (ver
+    :mod:`api.storage`), por lo que una misma imagen adjunta varias veces comparte miniaturas, o el SHA-256 de su
+    nombre para los archivos anteriores.
+    """
+    return content_digest(nombre) or hashlib.sha256(nombre.encode()).hexdigest()
+
+
+def thumbnail_name(nombre, tamano, formato):
+    """
+    Función que construye el nombre en el almacenamiento de una miniatura.
+
+    :param nombre: Nombre de la imagen de origen en el almacenamiento.
+    :param tamano: Llave de :data:`MINIATURA_TAMANOS`.
+    :param formato: Llave de :data:`MINIATURA_FORMATOS`.
+    :return: Cadena de texto con el nombre.
+    """
+    llave = thumbnail_key(nombre)
+    return f'{MINIATURAS_DIR}/{llave[:2]}/{llave}-{tamano}.{MINIATURA_FORMATOS[formato][1]}'
+
+
+def thumbnail_targets(nombre):
+    """
+    Función que retorna las miniaturas a generar de una imagen, como argumento de :func:`render_thumbnails`.
+
+    :param nombre: Nombre de la imagen de origen en el almacenamiento.
+    :return: Lista de tuplas ``(lado, formato de Pillow, opciones, ruta)``.
+    """
+    return [
+        (lado, MINIATURA_FORMATOS[formato][0], MINIATURA_FORMATOS[formato][2],
+         content_storage.path(thumbnail_name(nombre, tamano, formato)))
+        for tamano, lado in MINIATURA_TAMANOS.items()
+        for formato in MINIATURA_FORMATOS
+    ]
+
+
+def thumbnails_ready(nombre):
+    """
+    Función que indica si todas las miniaturas de una imagen ya están en disco.
+    """
+    return all(os.path.exists(path) for _lado, _formato, _opciones, path in thumbnail_targets(nombre))
+
+
+def render_thumbnails(origen, destinos):
+    """
+    Función que genera las miniaturas de una imagen. Es independiente de Django para ejecutarse en otro proceso (ver
+    el comando ``generar_miniaturas``). Para JPEG se usa el modo ``draft`` de Pillow, que decodifica directamente a
+    1/2, 1/4 o 1/8 de la resolución sin pasar por la imagen completa. Los tamaños se generan de mayor a menor, cada
+    uno a partir del anterior, y cada archivo se escribe en un temporal que luego se renombra, para que nunca se sirva
+    una miniatura a medio escribir.
+
+    :param origen: Ruta de la imagen de origen.
+    :param destinos: Lista de tuplas ``(lado, formato de Pillow, opciones, ruta)`` (ver :func:`thumbnail_targets`).
+    :return: Cantidad de miniaturas escritas.
+    """
+    lados = sorted({destino[0] for destino in destinos}, reverse=True)
+    with Image.open(origen) as imagen:
+        # Solo tiene efecto en JPEG; conserva al menos el lado mayor pedido en ambas dimensiones
+        imagen.draft('RGB', (lados[0], lados[0]))
+        imagen = ImageOps.exif_transpose(imagen)
+        transparente = imagen.mode in ('RGBA', 'LA', 'PA') or 'transparency' in imagen.info
+        imagen = imagen.convert('RGBA' if transparente else 'RGB')
+
+    escritas = 0
+    for lado in lados:
+        imagen.thumbnail((lado, lado), Image.LANCZOS)
+        for _lado, formato, opciones, path in (destino for destino in destinos if destino[0] == lado):
+            salida = imagen
+            if formato == 'JPEG' and imagen.mode == 'RGBA':
+                # JPEG no tiene transparencia: se compone sobre fondo blanco
+                salida = Image.new('RGB', imagen.size, (255, 255, 255))
+                salida.paste(imagen, mask=imagen.getchannel('A'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporal = f'{path}.{uuid.uuid4().hex}.tmp'
+            try:
+                salida.save(temporal, formato, **opciones)
+                os.replace(temporal, path)
+            finally:
+                if os.path.exists(temporal):
+                    os.remove(temporal)
+            escritas += 1
+    return escritas
+
+
+def enqueue_thumbnails(nombres):
+    """
+    Función que agrega imágenes a la cola de miniaturas (:class:`api.models.MiniaturaPendiente`). Las que ya están
+    en la cola se ignoran.
+
+    :param nombres: Lista de nombres de imágenes en el almacenamiento.
+    """
+    MiniaturaPendiente.objects.bulk_create(
+        [MiniaturaPendiente(nombre=nombre) for nombre in nombres], ignore_conflicts=True
+    )
+
+
+def schedule_thumbnails(sender, instance, raw=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.ArchivoMensaje` que encola la generación de miniaturas de la
+    imagen, salvo que ya existan (por ejemplo, de la misma imagen adjunta en otro mensaje). La fila se inserta en la
+    misma transacción que el archivo, por lo que se descarta si esta se revierte.
+    """
+    if raw:
+        return
+    nombre = instance.archivo.name
+    if nombre and not thumbnails_ready(nombre):
+        enqueue_thumbnails([nombre])
+
+
+def discard_thumbnails(nombre):
+    """
+    Función que elimina las miniaturas de una imagen (ver :func:`api.storage.collect_garbage`).
+
+    :param nombre: Nombre de la imagen de origen en el almacenamiento.
+    :return: Bytes liberados.
+    """
+    liberados = 0
+    for _lado, _formato, _opciones, path in thumbnail_targets(nombre):
+        try:
+            liberados += os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return liberados
+
+
+def _run_now(funcion, *args):
+    futuro = Future()
+    try:
+        futuro.set_result(funcion(*args))
+    except Exception as error:
+        futuro.set_exception(error)
+    return futuro
+
+
+def process_thumbnails(executor=None, batch_size=20, max_intentos=MINIATURA_MAX_INTENTOS):
+    """
+    process_thumbnails es una función que genera las miniaturas de un lote de la cola. Las filas se bloquean con
+    ``SELECT ... FOR UPDATE SKIP LOCKED``, por lo que se pueden ejecutar varios procesos en paralelo, y las imágenes
+    del lote se reparten entre los procesos de ``executor``. Las imágenes con error se reintentan en lotes siguientes
+    hasta ``max_intentos``; las que ya no existen en disco se descartan. Si el grupo de procesos se rompe se levanta
+    ``BrokenProcessPool`` sin modificar la cola.
+
+    :param executor: Objeto :class:`concurrent.futures.Executor` (opcional, por defecto en el proceso actual).
+    :param batch_size: Cantidad máxima de imágenes del lote.
+    :param max_intentos: Cantidad máxima de intentos por imagen.
+    :return: Tupla con la cantidad de imágenes procesadas y con error.
+    """
+    enviar = executor.submit if executor is not None else _run_now
+    generadas = errores = 0
+    with transaction.atomic():
+        lote = list(
+            MiniaturaPendiente.objects.select_for_update(skip_locked=True).filter(
+                intentos__lt=max_intentos
+            ).order_by('created')[:batch_size]
+        )
+        if not lote:
+            return generadas, errores
+
+        tareas = [
+            (pendiente, enviar(render_thumbnails, content_storage.path(pendiente.nombre),
+                               thumbnail_targets(pendiente.nombre)))
+            for pendiente in lote
+        ]
+        listas, fallidas = [], []
+        for pendiente, tarea in tareas:
+            try:
+                tarea.result()
+            except FileNotFoundError:
+                # La imagen se eliminó mientras estaba en la cola
+                listas.append(pendiente.nombre)
+            except BrokenProcessPool:
+                # Un proceso del grupo terminó abruptamente: el error no es de la imagen, por lo que el lote se
+                # revierte sin contar el intento y se reintenta con un grupo nuevo (ver generar_miniaturas)
+                raise
+            except Exception as error:
+                errores += 1
+                pendiente.intentos += 1
+                pendiente.ultimo_error = f'{type(error).__name__}: {error}'
+                fallidas.append(pendiente)
+            else:
+                generadas += 1
+                listas.append(pendiente.nombre)
+        MiniaturaPendiente.objects.filter(nombre__in=listas).delete()
+        MiniaturaPendiente.objects.bulk_update(fallidas, ['intentos', 'ultimo_error'])
+    return generadas, errores
+
+
+def preferred_format(request):
+    """
+    Función que elige el formato de la miniatura según el encabezado ``Accept``: WebP si el cliente lo acepta,
+    JPEG en otro caso.
+    """
+    return 'webp' if 'image/webp' in request.META.get('HTTP_ACCEPT', '') else 'jpeg'
+
+
+class ImageContentNegotiation(DefaultContentNegotiation):
+    """
+    Negociación de contenido de la ruta de miniaturas: el encabezado ``Accept`` elige el formato de la imagen (ver
+    :func:`preferred_format`), por lo que un cliente que solo acepta imágenes recibe igual las respuestas JSON
+    (``202`` y errores) en lugar de ``406``.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+
+class ThumbnailMixin(AttachmentDownloadMixin):
+    """
+    La clase ThumbnailMixin es un *mixin* para el ViewSet de imágenes de mensajes que agrega la ruta
+    ``<id>/miniatura/?tamano=chica|mediana&formato=webp|jpeg``, con la misma autorización que ``<id>/descargar/``.
+    Sin ``formato`` se elige según el encabezado ``Accept``. Si la miniatura aún no se genera, se encola y se
+    responde ``202`` con ``Retry-After``.
+    """
+
+    @action(detail=True, methods=['get'], url_path='miniatura', content_negotiation_class=ImageContentNegotiation)
+    def miniatura(self, request, pk=None):
+        tamano = request.query_params.get('tamano', MINIATURA_TAMANO_DEFECTO)
+        if tamano not in MINIATURA_TAMANOS:
+            raise ValidationError({'tamano': _('Opciones válidas: {}.').format(', '.join(MINIATURA_TAMANOS))})
+        formato = request.query_params.get('formato')
+        if formato is not None and formato not in MINIATURA_FORMATOS:
+            raise ValidationError({'formato': _('Opciones válidas: {}.').format(', '.join(MINIATURA_FORMATOS))})
+
+        nombre, _tipo = self.authorized_attachment(request, pk)
+        elegido = formato or preferred_format(request)
+        miniatura = thumbnail_name(nombre, tamano, elegido)
+        if content_storage.exists(miniatura):
+            filename = f'{self.basename}_{pk}_{tamano}.{MINIATURA_FORMATOS[elegido][1]}'
+            response = attachment_response(request, content_storage, miniatura, filename, disposition='inline')
+        else:
+            pendiente, _creada = MiniaturaPendiente.objects.get_or_create(nombre=nombre)
+            if pendiente.intentos >= MINIATURA_MAX_INTENTOS:
+                raise NotFound(_('No se pudo generar la miniatura de la imagen.'))
+            response = Response({'detail': _('La miniatura se está generando.')}, status=status.HTTP_202_ACCEPTED)
+            response['Retry-After'] = MINIATURA_REINTENTO
+        if formato is None:
+            response['Vary'] = 'Accept'
+        return response
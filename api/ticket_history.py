@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+from datetime import datetime
+from threading import local
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from api import models
+from api.bulk import bulk_saved
+
+# Campos de Ticket que no se registran en el historial
+TICKET_HISTORY_EXCLUDE = {'id', 'search_vector', 'created', 'modified'}
+
+# Captura de cambios activa en el hilo (responsable y registros pendientes)
+_captura = local()
+
+_encoder = DjangoJSONEncoder()
+
+
+def tracked_fields():
+    """
+    Función que retorna los campos de :class:`api.models.Ticket` registrados en el historial.
+    """
+    return [field for field in models.Ticket._meta.concrete_fields if field.name not in TICKET_HISTORY_EXCLUDE]
+
+
+def json_value(valor):
+    """
+    Función que convierte el valor de un campo en un valor JSON (las fechas en formato ISO 8601 y las claves foráneas
+    como su id).
+    """
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if isinstance(valor, datetime) and timezone.is_naive(valor):
+        valor = timezone.make_aware(valor)
+    return _encoder.default(valor)
+
+
+def ticket_diff(instance, created=False):
+    """
+    Función que calcula los cambios de un ticket respecto de los valores con que se leyó desde la base de datos (ver
+    :meth:`api.models.Ticket.from_db`), sin volver a consultarlo. Un ticket nuevo registra todos sus valores. Los
+    tickets guardados sin haberse leído (por ejemplo ``Ticket(pk=1, ...).save()``) no tienen con qué compararse y no
+    generan historial.
+
+    :param instance: Objeto :class:`api.models.Ticket` recién guardado.
+    :param created: Indica si el ticket se acaba de crear.
+    :return: Diccionario ``{campo: [anterior, nuevo]}`` (vacío si no hay cambios).
+    """
+    cargados = {} if created else getattr(instance, '_loaded_values', None)
+    if cargados is None:
+        return {}
+    cambios = {}
+    for field in tracked_fields():
+        if not created and field.attname not in cargados:
+            continue
+        anterior, nuevo = cargados.get(field.attname), field.value_from_object(instance)
+        if anterior != nuevo:
+            cambios[field.name] = [json_value(anterior), json_value(nuevo)]
+    return cambios
+
+
+def write_ticket_logs(logs):
+    """
+    Función que inserta los registros de historial en una sola consulta y envía :data:`api.bulk.bulk_saved`, ya que
+    ``bulk_create`` no envía ``post_save`` (ver :func:`api.ticket_metrics.apply_ticket_logs`).
+
+    :param logs: Lista de objetos :class:`api.models.TicketLog` sin guardar.
+    """
+    if logs:
+        models.TicketLog.objects.bulk_create(logs)
+        bulk_saved.send(sender=models.TicketLog, instances=logs)
+
+
+@contextmanager
+def capture_ticket_changes(responsable_id=None):
+    """
+    Contexto que atribuye a ``responsable_id`` los cambios de tickets guardados dentro del bloque y los registra
+    juntos al salir, en la misma transacción que los cambios.
+
+    :param responsable_id: Id del :class:`api.models.Colaborador` que hace los cambios (opcional).
+    """
+    if getattr(_captura, 'estado', None) is not None:
+        yield
+        return
+    _captura.estado = {'responsable_id': responsable_id, 'logs': []}
+    try:
+        with transaction.atomic():
+            yield
+            write_ticket_logs(_captura.estado['logs'])
+    finally:
+        _captura.estado = None
+
+
+def record_ticket_changes(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.Ticket` que registra sus cambios en :class:`api.models.TicketLog`.
+    Dentro de :func:`capture_ticket_changes` el registro queda pendiente hasta el final del bloque; fuera de él se
+    inserta de inmediato, sin responsable.
+    """
+    if raw:
+        return
+    cambios = ticket_diff(instance, created)
+    # Los próximos guardados del mismo objeto se comparan con lo recién guardado
+    diferidos = instance.get_deferred_fields()
+    instance._loaded_values = {
+        field.attname: field.value_from_object(instance)
+        for field in tracked_fields() if field.attname not in diferidos
+    }
+    if not cambios:
+        return
+    estado = getattr(_captura, 'estado', None)
+    log = models.TicketLog(
+        ticket_id=instance.pk,
+        historial=cambios,
+        responsable_id=estado['responsable_id'] if estado is not None else None
+    )
+    if estado is not None:
+        estado['logs'].append(log)
+    else:
+        write_ticket_logs([log])
+
+
+def user_colaborador_id(user):
+    """
+    Función que retorna el id del colaborador del usuario, sin consultarlo si viene en el token (ver
+    :class:`api.authentication.ClaimsUser`).
+
+    :param user: Usuario de la solicitud.
+    :return: Id del colaborador o ``None``.
+    """
+    colaborador_id = getattr(user, 'colaborador_id', None)
+    if colaborador_id is not None:
+        return colaborador_id
+    try:
+        return user.colaborador.pk
+    except (ObjectDoesNotExist, AttributeError):
+        return None
+
+
+class TicketHistoryMixin:
+    """
+    La clase TicketHistoryMixin es un *mixin* para ViewSets que guardan tickets, que atribuye los cambios al
+    colaborador del usuario de la solicitud y los registra al final de la escritura (ver
+    :func:`capture_ticket_changes`).
+    """
+
+    def perform_create(self, serializer):
+        with capture_ticket_changes(user_colaborador_id(self.request.user)):
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with capture_ticket_changes(user_colaborador_id(self.request.user)):
+            super().perform_update(serializer)
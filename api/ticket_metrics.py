@@ -0,0 +1,316 @@
+from collections import Counter, defaultdict
+from itertools import groupby
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from api import models
+from api.models.ticket import ETAPA_TICKET_DESARROLLO, ETAPA_TICKET_FINALIZADA, ETAPA_TICKET_REVISION
+
+# Campo de DificultadTicket con el tiempo máximo (en horas) de cada etapa
+SLA_ETAPAS = {
+    ETAPA_TICKET_REVISION: 'rev_max',
+    ETAPA_TICKET_DESARROLLO: 'dev_max',
+}
+
+# Columnas acumuladas de MetricaTicket
+METRICA_TOTALES = [
+    'entradas', 'salidas', 'segundos_en_etapa', 'salidas_fuera_sla', 'cerrados_fuera_plazo', 'eliminados',
+]
+
+# Dimensiones de agrupación de las métricas de tickets
+METRICA_DIMENSIONES = ['etapa_ticket', 'prioridad', 'area_ticket']
+
+# Períodos de las métricas de tickets y su unidad de truncado en PostgreSQL
+METRICA_PERIODOS = {
+    'dia': 'day',
+    'semana': 'week',
+    'mes': 'month',
+}
+
+# Columnas de Ticket necesarias para registrar sus cambios de etapa
+TICKET_INFO_FIELDS = [
+    'pk', 'etapa_ticket', 'prioridad', 'fecha_limite', 'created',
+    'dificultad_ticket__area_ticket', 'dificultad_ticket__rev_max', 'dificultad_ticket__dev_max',
+]
+
+
+def parse_stage_change(historial):
+    """
+    Función que obtiene el cambio de etapa registrado en el historial de un :class:`api.models.TicketLog`, con el
+    formato ``{"etapa_ticket": [anterior, nueva]}`` (``anterior`` es ``null`` al crear el ticket).
+
+    :param historial: Diccionario del historial.
+    :return: Tupla ``(anterior, nueva)`` o ``None`` si el historial no registra un cambio de etapa.
+    """
+    cambio = historial.get('etapa_ticket') if isinstance(historial, dict) else None
+    if not isinstance(cambio, (list, tuple)) or len(cambio) != 2 or not isinstance(cambio[1], int):
+        return None
+    return cambio[0], cambio[1]
+
+
+def bucket_key(fecha_hora, etapa, info):
+    """
+    Función que retorna la llave de :class:`api.models.MetricaTicket` de un ticket en una etapa.
+
+    :param fecha_hora: Fecha y hora del evento (se agrupa por su fecha local).
+    :param etapa: Id de la etapa.
+    :param info: Diccionario con las columnas :data:`TICKET_INFO_FIELDS` del ticket.
+    :return: Tupla ``(fecha, etapa, prioridad, area)``.
+    """
+    return timezone.localdate(fecha_hora), etapa, info['prioridad'], info['dificultad_ticket__area_ticket']
+
+
+def stage_entry(etapa, fecha_hora, info):
+    """
+    Función que retorna los contadores de la entrada de un ticket a una etapa y su nuevo estado.
+
+    :param etapa: Id de la etapa.
+    :param fecha_hora: Fecha y hora de entrada.
+    :param info: Diccionario con las columnas :data:`TICKET_INFO_FIELDS` del ticket.
+    :return: Tupla con la lista de ``(llave, contadores)`` y el :class:`api.models.EstadoMetricaTicket` sin guardar.
+    """
+    llave = bucket_key(fecha_hora, etapa, info)
+    contadores = {'entradas': 1}
+    if etapa == ETAPA_TICKET_FINALIZADA and info['fecha_limite'] and llave[0] > info['fecha_limite']:
+        contadores['cerrados_fuera_plazo'] = 1
+    estado = models.EstadoMetricaTicket(
+        ticket_id=info['pk'],
+        etapa_ticket_id=llave[1],
+        prioridad_id=llave[2],
+        area_ticket_id=llave[3],
+        desde=fecha_hora
+    )
+    return [(llave, contadores)], estado
+
+
+def stage_transition(estado, etapa, fecha_hora, info):
+    """
+    Función que retorna los contadores del paso de un ticket desde su etapa actual a otra: la salida se registra en
+    el mismo grupo en el que entró (ver :class:`api.models.EstadoMetricaTicket`), con el tiempo en la etapa y su
+    comparación con el máximo de :class:`api.models.DificultadTicket`.
+
+    :param estado: Estado actual del ticket.
+    :param etapa: Id de la nueva etapa.
+    :param fecha_hora: Fecha y hora del cambio.
+    :param info: Diccionario con las columnas :data:`TICKET_INFO_FIELDS` del ticket.
+    :return: Tupla con la lista de ``(llave, contadores)`` y el nuevo estado sin guardar.
+    """
+    segundos = max(int((fecha_hora - estado.desde).total_seconds()), 0)
+    salida = {'salidas': 1, 'segundos_en_etapa': segundos}
+    campo_sla = SLA_ETAPAS.get(estado.etapa_ticket_id)
+    maximo = info[f'dificultad_ticket__{campo_sla}'] if campo_sla else None
+    if maximo is not None and segundos > maximo * 3600:
+        salida['salidas_fuera_sla'] = 1
+    llave_salida = (
+        timezone.localdate(fecha_hora), estado.etapa_ticket_id, estado.prioridad_id, estado.area_ticket_id
+    )
+    cambios, nuevo_estado = stage_entry(etapa, fecha_hora, info)
+    return [(llave_salida, salida)] + cambios, nuevo_estado
+
+
+def bucket_filter(llave):
+    fecha, etapa, prioridad, area = llave
+    return {'fecha': fecha, 'etapa_ticket_id': etapa, 'prioridad_id': prioridad, 'area_ticket_id': area}
+
+
+def increment_metrics(cambios):
+    """
+    Función que suma los contadores a las filas de :class:`api.models.MetricaTicket`, creándolas si no existen.
+
+    :param cambios: Lista de tuplas ``(llave, contadores)``.
+    """
+    for llave, contadores in cambios:
+        filtro = bucket_filter(llave)
+        incrementos = {campo: F(campo) + valor for campo, valor in contadores.items()}
+        if models.MetricaTicket.objects.filter(**filtro).update(**incrementos):
+            continue
+        try:
+            with transaction.atomic():
+                models.MetricaTicket.objects.create(**filtro, **contadores)
+        except IntegrityError:
+            # Otra transacción creó la fila del grupo en paralelo
+            models.MetricaTicket.objects.filter(**filtro).update(**incrementos)
+
+
+def ticket_info(ticket_id):
+    return models.Ticket.objects.filter(pk=ticket_id).values(*TICKET_INFO_FIELDS).first()
+
+
+def register_ticket_metrics(sender, instance, created=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.Ticket` que registra la entrada de los tickets nuevos a su etapa
+    inicial.
+    """
+    if not created or kwargs.get('raw'):
+        return
+    info = ticket_info(instance.pk)
+    with transaction.atomic():
+        cambios, estado = stage_entry(info['etapa_ticket'], info['created'], info)
+        estado.save(force_insert=True)
+        increment_metrics(cambios)
+
+
+def apply_ticket_log(sender, instance, created=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.TicketLog` que registra los cambios de etapa (ver
+    :func:`parse_stage_change`). El estado del ticket se bloquea con ``SELECT ... FOR UPDATE`` y los cambios hacia la
+    misma etapa se ignoran, por lo que registrar dos veces un cambio no duplica los contadores.
+    """
+    if kwargs.get('raw'):
+        return
+    cambio = parse_stage_change(instance.historial) if created else None
+    if cambio is None:
+        return
+    with transaction.atomic():
+        info = ticket_info(instance.ticket_id)
+        estado = models.EstadoMetricaTicket.objects.select_for_update().filter(ticket_id=instance.ticket_id).first()
+        cambios = []
+        if estado is None:
+            cambios, estado = stage_entry(cambio[0] or cambio[1], info['created'], info)
+        if estado.etapa_ticket_id != cambio[1]:
+            transicion, estado = stage_transition(estado, cambio[1], instance.fecha_modificacion, info)
+            cambios += transicion
+        if cambios:
+            models.EstadoMetricaTicket.objects.update_or_create(
+                ticket_id=estado.ticket_id,
+                defaults={
+                    'etapa_ticket_id': estado.etapa_ticket_id,
+                    'prioridad_id': estado.prioridad_id,
+                    'area_ticket_id': estado.area_ticket_id,
+                    'desde': estado.desde,
+                }
+            )
+            increment_metrics(cambios)
+
+
+def apply_ticket_logs(sender, instances, **kwargs):
+    """
+    Receptor de :data:`api.bulk.bulk_saved` de :class:`api.models.TicketLog` (registros insertados en lote por
+    :mod:`api.ticket_history`), que aplica :func:`apply_ticket_log` a cada uno.
+    """
+    for instance in instances:
+        apply_ticket_log(sender, instance, created=True)
+
+
+def discard_ticket_metrics(sender, instance, **kwargs):
+    """
+    Receptor de ``pre_delete`` de :class:`api.models.Ticket` que registra en el grupo del día la eliminación de los
+    tickets abiertos, para que no queden en el backlog. Las entradas históricas no se modifican.
+    """
+    if kwargs.get('raw'):
+        return
+    estado = models.EstadoMetricaTicket.objects.filter(ticket_id=instance.pk).first()
+    if estado is not None and estado.etapa_ticket_id != ETAPA_TICKET_FINALIZADA:
+        llave = (timezone.localdate(), estado.etapa_ticket_id, estado.prioridad_id, estado.area_ticket_id)
+        increment_metrics([(llave, {'eliminados': 1})])
+
+
+def rebuild_ticket_metrics():
+    """
+    Función que reconstruye las métricas de tickets desde el historial completo: cada ticket entra a su etapa
+    inicial al crearse y luego se aplican sus cambios de etapa en orden. La prioridad, el área y los tiempos
+    máximos usados son los actuales de cada ticket.
+
+    :return: Cantidad de filas de :class:`api.models.MetricaTicket` creadas.
+    """
+    tickets = {info['pk']: info for info in models.Ticket.objects.values(*TICKET_INFO_FIELDS).iterator()}
+    logs = models.TicketLog.objects.filter(historial__has_key='etapa_ticket').order_by(
+        'ticket', 'fecha_modificacion', 'pk'
+    ).values_list('ticket', 'historial', 'fecha_modificacion').iterator()
+    cambios_por_ticket = defaultdict(list)
+    for ticket_id, filas in groupby(logs, key=lambda fila: fila[0]):
+        for _ticket_id, historial, fecha_hora in filas:
+            cambio = parse_stage_change(historial)
+            if cambio is not None:
+                cambios_por_ticket[ticket_id].append((cambio, fecha_hora))
+
+    contadores = defaultdict(Counter)
+    estados = []
+    for ticket_id, info in tickets.items():
+        cambios = cambios_por_ticket.get(ticket_id, [])
+        if cambios and cambios[0][0][0] is None:
+            (_anterior, etapa), desde = cambios.pop(0)
+        else:
+            etapa, desde = (cambios[0][0][0] if cambios else info['etapa_ticket']), info['created']
+        registro, estado = stage_entry(etapa, desde, info)
+        for (_anterior, nueva), fecha_hora in cambios:
+            if nueva != estado.etapa_ticket_id:
+                transicion, estado = stage_transition(estado, nueva, fecha_hora, info)
+                registro += transicion
+        for llave, valores in registro:
+            contadores[llave].update(valores)
+        estados.append(estado)
+
+    with transaction.atomic():
+        models.MetricaTicket.objects.all().delete()
+        models.EstadoMetricaTicket.objects.all().delete()
+        models.EstadoMetricaTicket.objects.bulk_create(estados, batch_size=1000)
+        metricas = models.MetricaTicket.objects.bulk_create([
+            models.MetricaTicket(**bucket_filter(llave), **valores) for llave, valores in contadores.items()
+        ], batch_size=1000)
+    return len(metricas)
+
+
+def filter_metrics(queryset, desde=None, hasta=None, **filtros):
+    """
+    Función que filtra las métricas por rango de fechas y por id de cada dimensión.
+    """
+    if desde is not None:
+        queryset = queryset.filter(fecha__gte=desde)
+    if hasta is not None:
+        queryset = queryset.filter(fecha__lte=hasta)
+    for dimension, valor in filtros.items():
+        if valor is not None:
+            queryset = queryset.filter(**{dimension: valor})
+    return queryset
+
+
+def ticket_flow_report(agrupar, periodo=None, desde=None, hasta=None, **filtros):
+    """
+    Función que calcula el flujo de tickets (entradas y salidas por etapa, tiempo promedio en la etapa y salidas
+    fuera de SLA) desde :class:`api.models.MetricaTicket`. El *throughput* corresponde a las entradas a la etapa
+    final.
+
+    :param agrupar: Lista de dimensiones (de :data:`METRICA_DIMENSIONES`).
+    :param periodo: Período de agrupación (llave de :data:`METRICA_PERIODOS`, opcional).
+    :param desde: Fecha inicial, inclusiva (opcional).
+    :param hasta: Fecha final, inclusiva (opcional).
+    :param filtros: Ids por dimensión para restringir el reporte.
+    :return: Lista de diccionarios con las dimensiones, ``periodo``, los totales y ``horas_promedio_en_etapa``.
+    """
+    queryset = filter_metrics(models.MetricaTicket.objects.all(), desde, hasta, **filtros)
+    periodos = {'periodo': Trunc('fecha', METRICA_PERIODOS[periodo])} if periodo is not None else {}
+    filas = list(queryset.values(*agrupar, **periodos).annotate(
+        **{f'total_{total}': Sum(total) for total in METRICA_TOTALES}
+    ).order_by(*periodos, *agrupar))
+    for fila in filas:
+        for total in METRICA_TOTALES:
+            fila[total] = fila.pop(f'total_{total}')
+        fila['horas_promedio_en_etapa'] = (
+            round(fila['segundos_en_etapa'] / fila['salidas'] / 3600, 2) if fila['salidas'] else None
+        )
+    return filas
+
+
+def ticket_backlog(agrupar, fecha=None, **filtros):
+    """
+    Función que calcula el backlog (tickets abiertos por etapa) al final de una fecha, como la suma de entradas menos
+    salidas y eliminados de :class:`api.models.MetricaTicket` hasta esa fecha.
+
+    :param agrupar: Lista de dimensiones (de :data:`METRICA_DIMENSIONES`).
+    :param fecha: Fecha de corte, inclusiva (opcional, por defecto hoy).
+    :param filtros: Ids por dimensión para restringir el reporte.
+    :return: Lista de diccionarios con las dimensiones y ``abiertos``.
+    """
+    queryset = filter_metrics(
+        models.MetricaTicket.objects.exclude(etapa_ticket=ETAPA_TICKET_FINALIZADA),
+        hasta=fecha or timezone.localdate(),
+        **filtros
+    )
+    filas = queryset.values(*agrupar).annotate(
+        abiertos=Sum('entradas') - Sum('salidas') - Sum('eliminados')
+    ).filter(abiertos__gt=0).order_by(*agrupar)
+    return list(filas)
@@ -0,0 +1,296 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import Lag, Lead
+from django.utils import timezone
+
+from api import models
+from api.models.ticket import ETAPA_TICKET_DESARROLLO, ETAPA_TICKET_FINALIZADA, ETAPA_TICKET_REVISION
+from api.ticket_metrics import parse_stage_change
+
+# Campos de DificultadTicket con el tiempo mínimo y máximo (en horas) de cada etapa
+LIMITES_ETAPAS = {
+    ETAPA_TICKET_REVISION: ('rev_min', 'rev_max'),
+    ETAPA_TICKET_DESARROLLO: ('dev_min', 'dev_max'),
+}
+
+# Dimensiones de agrupación del reporte de tiempos en etapa
+TIEMPO_ETAPA_DIMENSIONES = ['etapa_ticket', 'prioridad', 'area_ticket']
+
+# Columnas de Ticket necesarias para calcular sus tiempos en etapa. ``estado_metrica__desde`` (entrada a la etapa
+# actual, ver api.ticket_metrics) valida los intervalos en cache de los tickets finalizados
+TICKET_ETAPAS_FIELDS = [
+    'pk', 'etapa_ticket', 'prioridad', 'created', 'dificultad_ticket__area_ticket',
+    'dificultad_ticket__rev_min', 'dificultad_ticket__rev_max',
+    'dificultad_ticket__dev_min', 'dificultad_ticket__dev_max', 'estado_metrica__desde',
+]
+
+# Segundos que se mantienen en cache los intervalos de un ticket finalizado
+ETAPAS_TIMEOUT = 60 * 60 * 24
+
+# Tickets leídos por consulta en el reporte de tiempos en etapa
+TIEMPO_ETAPA_LOTE = 1000
+
+# Rango de fechas de creación del reporte de tiempos en etapa: por defecto y máximo, en días
+TIEMPO_ETAPA_DIAS = 30
+TIEMPO_ETAPA_MAX_DIAS = 366
+
+
+def stage_cache_key(ticket_id):
+    """
+    Función que construye la llave de los intervalos de etapa de un ticket en el cache de Django.
+
+    :param ticket_id: Id del ticket.
+    :return: Cadena de texto con la llave.
+    """
+    return f'api:etapas-ticket:{ticket_id}'
+
+
+def stage_changes(ticket_ids):
+    """
+    Función que obtiene, en una consulta, los cambios de etapa de los tickets indicados junto con la fecha del cambio
+    anterior (``LAG``) y del siguiente (``LEAD``) del mismo ticket, usando el índice ``(ticket, fecha_modificacion)``
+    de :class:`api.models.TicketLog`.
+
+    :param ticket_ids: Lista de ids de tickets.
+    :return: QuerySet de diccionarios ordenado por ticket y fecha.
+    """
+    ventana = {
+        'partition_by': [F('ticket')],
+        'order_by': [F('fecha_modificacion').asc(), F('pk').asc()],
+    }
+    return models.TicketLog.objects.filter(
+        ticket__in=ticket_ids, historial__has_key='etapa_ticket'
+    ).annotate(
+        cambio=KeyTransform('etapa_ticket', 'historial'),
+        cambio_anterior=Window(Lag('fecha_modificacion'), **ventana),
+        cambio_siguiente=Window(Lead('fecha_modificacion'), **ventana),
+    ).values(
+        'ticket', 'cambio', 'fecha_modificacion', 'cambio_anterior', 'cambio_siguiente'
+    ).order_by('ticket', 'fecha_modificacion', 'pk')
+
+
+def build_intervals(info, cambios):
+    """
+    Función que arma los intervalos de etapa de un ticket a partir de sus cambios de etapa: cada cambio cierra el
+    intervalo de la etapa anterior (que empezó en el cambio previo o, para el primero, al crearse el ticket) y el
+    último abre el de la etapa actual. Los intervalos consecutivos en la misma etapa se unen y la etapa final no
+    genera intervalo.
+
+    :param info: Diccionario con las columnas :data:`TICKET_ETAPAS_FIELDS` del ticket.
+    :param cambios: Lista de filas de :func:`stage_changes` del ticket.
+    :return: Lista de tuplas ``(etapa, desde, hasta)``, con ``hasta`` ``None`` para la etapa en curso.
+    """
+    intervalos = []
+
+    def agregar(etapa, desde, hasta):
+        if etapa is None or etapa == ETAPA_TICKET_FINALIZADA:
+            return
+        if intervalos and intervalos[-1][0] == etapa and intervalos[-1][2] == desde:
+            intervalos[-1] = (etapa, intervalos[-1][1], hasta)
+        else:
+            intervalos.append((etapa, desde, hasta))
+
+    ultima = None
+    for fila in cambios:
+        cambio = parse_stage_change({'etapa_ticket': fila['cambio']})
+        if cambio is None:
+            continue
+        anterior, ultima = cambio
+        agregar(anterior, fila['cambio_anterior'] or info['created'], fila['fecha_modificacion'])
+        if fila['cambio_siguiente'] is None:
+            agregar(ultima, fila['fecha_modificacion'], None)
+    if ultima is None:
+        agregar(info['etapa_ticket'], info['created'], None)
+    return intervalos
+
+
+def ticket_intervals(tickets):
+    """
+    Función que retorna los intervalos de etapa de los tickets indicados (ver :func:`infos_intervals`).
+
+    :param tickets: QuerySet de :class:`api.models.Ticket`.
+    :return: Tupla con el diccionario id → columnas :data:`TICKET_ETAPAS_FIELDS` y el diccionario id → intervalos.
+    """
+    infos = {info['pk']: info for info in tickets.order_by().values(*TICKET_ETAPAS_FIELDS)}
+    return infos, infos_intervals(infos)
+
+
+def ticket_batches(tickets, batch_size=TIEMPO_ETAPA_LOTE):
+    """
+    Función que recorre los tickets indicados en lotes ordenados por id (paginación por llave), para acotar la memoria
+    de los reportes al tamaño del lote.
+
+    :param tickets: QuerySet de :class:`api.models.Ticket`.
+    :param batch_size: Cantidad de tickets por lote.
+    :return: Generador de diccionarios id → columnas :data:`TICKET_ETAPAS_FIELDS`.
+    """
+    ultimo = None
+    while True:
+        lote = tickets.order_by('pk') if ultimo is None else tickets.filter(pk__gt=ultimo).order_by('pk')
+        infos = {info['pk']: info for info in lote.values(*TICKET_ETAPAS_FIELDS)[:batch_size]}
+        if not infos:
+            return
+        yield infos
+        if len(infos) < batch_size:
+            return
+        ultimo = max(infos)
+
+
+def infos_intervals(infos):
+    """
+    Función que retorna los intervalos de etapa de los tickets indicados. Los de tickets finalizados se leen del cache
+    cuando están disponibles; el resto se calcula con una sola consulta (ver :func:`stage_changes`) y los de tickets
+    finalizados quedan en cache. Cada entrada guarda la fecha de entrada a la etapa final
+    (:class:`api.models.EstadoMetricaTicket`), que se compara con la actual al leerla: si el ticket se reabrió y
+    volvió a finalizar en otro proceso, la entrada se descarta aunque la invalidación no haya llegado a este cache.
+
+    :param infos: Diccionario id → columnas :data:`TICKET_ETAPAS_FIELDS`.
+    :return: Diccionario id → intervalos.
+    """
+    finalizados = [
+        pk for pk, info in infos.items()
+        if info['etapa_ticket'] == ETAPA_TICKET_FINALIZADA and info['estado_metrica__desde'] is not None
+    ]
+    en_cache = cache.get_many([stage_cache_key(pk) for pk in finalizados])
+    intervalos = {}
+    for pk in finalizados:
+        desde, guardados = en_cache.get(stage_cache_key(pk), (None, None))
+        if desde is not None and desde == infos[pk]['estado_metrica__desde']:
+            intervalos[pk] = guardados
+
+    pendientes = [pk for pk in infos if pk not in intervalos]
+    cambios = defaultdict(list)
+    if pendientes:
+        for fila in stage_changes(pendientes):
+            cambios[fila['ticket']].append(fila)
+    nuevos = {}
+    for pk in pendientes:
+        intervalos[pk] = build_intervals(infos[pk], cambios[pk])
+        if pk in finalizados:
+            nuevos[stage_cache_key(pk)] = (infos[pk]['estado_metrica__desde'], intervalos[pk])
+    if nuevos:
+        cache.set_many(nuevos, ETAPAS_TIMEOUT)
+    return intervalos
+
+
+def stage_time(etapa, desde, hasta, info, ahora):
+    """
+    Función que calcula la duración de un intervalo y la compara con el tiempo mínimo y máximo de la etapa en la
+    :class:`api.models.DificultadTicket` del ticket. Un intervalo en curso se mide hasta ``ahora`` y solo puede quedar
+    sobre el máximo.
+
+    :return: Diccionario con la etapa, las fechas, ``horas``, ``minimo``, ``maximo``, ``en_curso`` y ``estado``
+        (``bajo_minimo``, ``en_rango``, ``sobre_maximo``, o ``None`` si la etapa no tiene límites).
+    """
+    horas = max(((hasta or ahora) - desde).total_seconds(), 0) / 3600
+    campos = LIMITES_ETAPAS.get(etapa)
+    minimo, maximo = (info[f'dificultad_ticket__{campo}'] for campo in campos) if campos else (None, None)
+    estado = None
+    if maximo is not None and horas > maximo:
+        estado = 'sobre_maximo'
+    elif hasta is not None and minimo is not None and horas < minimo:
+        estado = 'bajo_minimo'
+    elif minimo is not None or maximo is not None:
+        estado = 'en_rango'
+    return {
+        'etapa_ticket': etapa,
+        'desde': desde,
+        'hasta': hasta,
+        'horas': round(horas, 2),
+        'minimo': minimo,
+        'maximo': maximo,
+        'en_curso': hasta is None,
+        'estado': estado,
+    }
+
+
+def ticket_stage_times(tickets):
+    """
+    Función que retorna el tiempo en cada etapa de los tickets indicados.
+
+    :param tickets: QuerySet de :class:`api.models.Ticket`.
+    :return: Diccionario id → lista de intervalos (ver :func:`stage_time`).
+    """
+    infos, intervalos = ticket_intervals(tickets)
+    ahora = timezone.now()
+    return {
+        pk: [stage_time(*intervalo, infos[pk], ahora) for intervalo in intervalos[pk]]
+        for pk in infos
+    }
+
+
+def stage_time_report(tickets, agrupar, etapa_ticket=None):
+    """
+    Función que calcula, para los tickets indicados, el tiempo en etapa agrupado por etapa, prioridad o área (la
+    prioridad y el área son las actuales de cada ticket). Los tickets se procesan en lotes (ver
+    :func:`ticket_batches`), por lo que la memoria depende de la cantidad de grupos y no de tickets.
+
+    :param tickets: QuerySet de :class:`api.models.Ticket`.
+    :param agrupar: Lista de dimensiones (de :data:`TIEMPO_ETAPA_DIMENSIONES`).
+    :param etapa_ticket: Id de etapa para restringir los intervalos (opcional).
+    :return: Lista de diccionarios con las dimensiones, ``cantidad``, ``en_curso``, ``horas_promedio`` (de los
+        intervalos terminados), ``horas_maximas``, ``bajo_minimo`` y ``sobre_maximo``.
+    """
+    ahora = timezone.now()
+    grupos = {}
+    for infos in ticket_batches(tickets):
+        intervalos = infos_intervals(infos)
+        for pk, info in infos.items():
+            for intervalo in intervalos[pk]:
+                if etapa_ticket is not None and intervalo[0] != etapa_ticket:
+                    continue
+                tiempo = stage_time(*intervalo, info, ahora)
+                dimensiones = {
+                    'etapa_ticket': tiempo['etapa_ticket'],
+                    'prioridad': info['prioridad'],
+                    'area_ticket': info['dificultad_ticket__area_ticket'],
+                }
+                llave = tuple(dimensiones[dimension] for dimension in agrupar)
+                grupo = grupos.setdefault(llave, {
+                    'cantidad': 0, 'en_curso': 0, 'horas_terminados': 0, 'horas_maximas': 0,
+                    'bajo_minimo': 0, 'sobre_maximo': 0,
+                })
+                grupo['cantidad'] += 1
+                if tiempo['en_curso']:
+                    grupo['en_curso'] += 1
+                else:
+                    grupo['horas_terminados'] += tiempo['horas']
+                    grupo['horas_maximas'] = max(grupo['horas_maximas'], tiempo['horas'])
+                if tiempo['estado'] in ('bajo_minimo', 'sobre_maximo'):
+                    grupo[tiempo['estado']] += 1
+
+    filas = []
+    for llave in sorted(grupos, key=lambda llave: tuple((valor is None, valor or 0) for valor in llave)):
+        grupo = grupos[llave]
+        terminados = grupo['cantidad'] - grupo['en_curso']
+        horas = grupo.pop('horas_terminados')
+        grupo['horas_promedio'] = round(horas / terminados, 2) if terminados else None
+        filas.append({**dict(zip(agrupar, llave)), **grupo})
+    return filas
+
+
+def discard_ticket_stages(sender, instance, created=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.TicketLog` y de ``post_delete`` de :class:`api.models.Ticket`
+    que elimina del cache los intervalos del ticket (por ejemplo si se reabre un ticket finalizado). Con un cache
+    local solo alcanza a este proceso; en los demás la entrada se descarta al leerla (ver :func:`infos_intervals`).
+    """
+    if sender is models.TicketLog:
+        if created and parse_stage_change(instance.historial) is not None:
+            cache.delete(stage_cache_key(instance.ticket_id))
+    else:
+        cache.delete(stage_cache_key(instance.pk))
+
+
+def discard_tickets_stages(sender, instances, **kwargs):
+    """
+    Receptor de :data:`api.bulk.bulk_saved` de :class:`api.models.TicketLog` que elimina del cache los intervalos de
+    los tickets con cambios de etapa en el lote.
+    """
+    cache.delete_many({
+        stage_cache_key(instance.ticket_id) for instance in instances
+        if parse_stage_change(instance.historial) is not None
+    })
@@ -0,0 +1,256 @@
+from contextlib import contextmanager
+from functools import reduce
+from operator import or_
+from threading import local
+
+from django.db import transaction
+from django.db.models import Count, F, Func, IntegerField, Q, Sum
+from django.db.models.functions import Coalesce, Trunc
+
+from api import models
+
+# Dimensiones de agrupación del reporte de horas y su ruta desde ResumenActividad
+RESUMEN_DIMENSIONES = {
+    'colaborador': 'colaborador',
+    'proyecto': 'proyecto',
+    'cliente': 'proyecto__cliente',
+    'datos_actividad': 'datos_actividad',
+    'cargo': 'datos_actividad__cargo',
+}
+
+# Períodos del reporte de horas y su unidad de truncado en PostgreSQL
+RESUMEN_PERIODOS = {
+    'dia': 'day',
+    'semana': 'week',
+    'mes': 'month',
+}
+
+# Cantidad por defecto y máxima de actividades fuera de rango por consulta
+FUERA_DE_RANGO_LIMIT = 100
+FUERA_DE_RANGO_MAX_LIMIT = 1000
+
+# Columnas acumuladas de ResumenActividad
+RESUMEN_TOTALES = ['cantidad', 'minutos', 'sin_termino', 'bajo_minimo', 'sobre_maximo']
+
+# Días pendientes de recalcular dentro de deferred_resumen, por hilo
+_pendientes = local()
+
+
+class DuracionMinutos(Func):
+    """
+    Expresión con la duración en minutos entre ``hora_inicio`` y ``hora_termino`` de una :class:`Actividad`. Si la
+    hora de término es anterior a la de inicio, la actividad cruzó la medianoche y se suma un día. Es ``NULL`` para
+    las actividades sin hora de término.
+    """
+    template = "MOD((EXTRACT(EPOCH FROM (%(expressions)s))::integer / 60) + 1440, 1440)"
+    arg_joiner = ' - '
+    output_field = IntegerField()
+
+    def __init__(self, **extra):
+        super().__init__(F('hora_termino'), F('hora_inicio'), **extra)
+
+
+def resumen_rows(actividades):
+    """
+    Función que agrega las actividades con la llave de :class:`api.models.ResumenActividad` (colaborador, fecha,
+    proyecto y datos de actividad), calculando en la base de datos la duración y su comparación con
+    ``tiempo_minimo``/``tiempo_maximo`` de los datos de actividad.
+
+    :param actividades: QuerySet de :class:`api.models.Actividad`.
+    :return: QuerySet de diccionarios con los campos de :class:`api.models.ResumenActividad`.
+    """
+    return actividades.order_by().annotate(
+        duracion=DuracionMinutos()
+    ).values(
+        'colaborador', 'fecha', 'proyecto', 'datos_actividad'
+    ).annotate(
+        cantidad=Count('pk'),
+        minutos=Coalesce(Sum('duracion'), 0),
+        sin_termino=Count('pk', filter=Q(hora_termino__isnull=True)),
+        bajo_minimo=Count('pk', filter=Q(duracion__lt=F('datos_actividad__tiempo_minimo'))),
+        sobre_maximo=Count('pk', filter=Q(duracion__gt=F('datos_actividad__tiempo_maximo'))),
+    )
+
+
+def refresh_resumen(filtro):
+    """
+    Función que recalcula las filas de :class:`api.models.ResumenActividad` que cumplen ``filtro`` a partir de las
+    actividades que lo cumplen. El filtro solo puede usar campos de la llave del resumen, comunes a ambos modelos
+    (``colaborador``, ``fecha``, ``proyecto`` y ``datos_actividad``).
+
+    :param filtro: Objeto :class:`Q` sobre la llave del resumen.
+    """
+    with transaction.atomic():
+        models.ResumenActividad.objects.filter(filtro).delete()
+        models.ResumenActividad.objects.bulk_create([
+            models.ResumenActividad(
+                colaborador_id=fila.pop('colaborador'),
+                proyecto_id=fila.pop('proyecto'),
+                datos_actividad_id=fila.pop('datos_actividad'),
+                **fila
+            )
+            for fila in resumen_rows(models.Actividad.objects.filter(filtro))
+        ])
+
+
+def refresh_colaborador_days(dias):
+    """
+    Función que recalcula el resumen de los días de colaboradores indicados. Las filas de los colaboradores se
+    bloquean con ``SELECT ... FOR UPDATE`` para que dos escrituras concurrentes sobre un mismo colaborador no
+    recalculen el mismo día en paralelo.
+
+    :param dias: Conjunto de tuplas ``(colaborador_id, fecha)``.
+    """
+    dias = {(colaborador, fecha) for colaborador, fecha in dias if colaborador is not None and fecha is not None}
+    if not dias:
+        return
+    with transaction.atomic():
+        list(models.Colaborador.objects.select_for_update().filter(
+            pk__in={colaborador for colaborador, _fecha in dias}
+        ).order_by('pk').values_list('pk', flat=True))
+        refresh_resumen(reduce(or_, (Q(colaborador_id=colaborador, fecha=fecha) for colaborador, fecha in dias)))
+
+
+def actividad_days(instance):
+    """
+    Función que retorna los días de colaborador afectados por una actividad: el actual y, si cambió, el que tenía al
+    leerse desde la base de datos (ver :meth:`api.models.Actividad.from_db`).
+
+    :param instance: Objeto :class:`api.models.Actividad`.
+    :return: Conjunto de tuplas ``(colaborador_id, fecha)``.
+    """
+    dias = {(instance.colaborador_id, instance.fecha)}
+    cargados = getattr(instance, '_loaded_values', None)
+    if cargados and 'colaborador_id' in cargados and 'fecha' in cargados:
+        dias.add((cargados['colaborador_id'], cargados['fecha']))
+    return dias
+
+
+@contextmanager
+def deferred_resumen():
+    """
+    Contexto que acumula los días afectados por las actividades guardadas o eliminadas dentro del bloque y los
+    recalcula juntos al salir, en lugar de una vez por actividad. Se usa en las escrituras en lote (ver
+    :class:`api.bulk.BulkMixin`), dentro de su transacción.
+    """
+    if getattr(_pendientes, 'dias', None) is not None:
+        yield
+        return
+    _pendientes.dias = set()
+    try:
+        yield
+        refresh_colaborador_days(_pendientes.dias)
+    finally:
+        _pendientes.dias = None
+
+
+def schedule_days(dias):
+    """
+    Función que recalcula los días indicados, o los acumula si hay un :func:`deferred_resumen` activo.
+
+    :param dias: Conjunto de tuplas ``(colaborador_id, fecha)``.
+    """
+    pendientes = getattr(_pendientes, 'dias', None)
+    if pendientes is not None:
+        pendientes.update(dias)
+    else:
+        refresh_colaborador_days(dias)
+
+
+def update_actividad_resumen(sender, instance, **kwargs):
+    """
+    Receptor de ``post_save`` y ``post_delete`` de :class:`api.models.Actividad` que recalcula los días afectados.
+    """
+    schedule_days(actividad_days(instance))
+
+
+def update_actividades_resumen(sender, instances, **kwargs):
+    """
+    Receptor de :data:`api.bulk.bulk_saved` de :class:`api.models.Actividad` que recalcula, en una sola pasada, los
+    días afectados por el lote.
+    """
+    schedule_days(set().union(*(actividad_days(instance) for instance in instances)))
+
+
+def update_datos_actividad_resumen(sender, instance, created=False, **kwargs):
+    """
+    Receptor de ``post_save`` de :class:`api.models.DatosActividad` que recalcula los resúmenes de sus actividades,
+    ya que pueden haber cambiado ``tiempo_minimo`` o ``tiempo_maximo``.
+    """
+    if not created:
+        refresh_resumen(Q(datos_actividad_id=instance.pk))
+
+
+def rebuild_resumen():
+    """
+    Función que reconstruye la tabla de resumen completa, para la carga inicial o luego de escrituras que no pasan
+    por los receptores (por ejemplo ``QuerySet.update``).
+    """
+    refresh_resumen(Q())
+
+
+def filter_dimensions(queryset, desde=None, hasta=None, **filtros):
+    """
+    Función que filtra actividades o resúmenes por rango de fechas y por id de cada dimensión. Las rutas de
+    :data:`RESUMEN_DIMENSIONES` son válidas para ambos modelos.
+
+    :param queryset: QuerySet de :class:`api.models.Actividad` o :class:`api.models.ResumenActividad`.
+    :param desde: Fecha inicial, inclusiva (opcional).
+    :param hasta: Fecha final, inclusiva (opcional).
+    :param filtros: Ids por dimensión (por ejemplo ``cliente=1``).
+    :return: QuerySet filtrado.
+    """
+    if desde is not None:
+        queryset = queryset.filter(fecha__gte=desde)
+    if hasta is not None:
+        queryset = queryset.filter(fecha__lte=hasta)
+    for dimension, valor in filtros.items():
+        if valor is not None:
+            queryset = queryset.filter(**{RESUMEN_DIMENSIONES[dimension]: valor})
+    return queryset
+
+
+def timesheet_report(agrupar, periodo=None, desde=None, hasta=None, **filtros):
+    """
+    Función que calcula, desde :class:`api.models.ResumenActividad`, los totales de actividades agrupados por las
+    dimensiones indicadas y, opcionalmente, por período.
+
+    :param agrupar: Lista de dimensiones (llaves de :data:`RESUMEN_DIMENSIONES`).
+    :param periodo: Período de agrupación (llave de :data:`RESUMEN_PERIODOS`, opcional).
+    :param desde: Fecha inicial, inclusiva (opcional).
+    :param hasta: Fecha final, inclusiva (opcional).
+    :param filtros: Ids por dimensión (por ejemplo ``cliente=1``) para restringir el reporte.
+    :return: Lista de diccionarios con las dimensiones, ``periodo``, los totales y ``horas``.
+    """
+    queryset = filter_dimensions(models.ResumenActividad.objects.all(), desde, hasta, **filtros)
+    rutas = [RESUMEN_DIMENSIONES[dimension] for dimension in agrupar]
+    periodos = {'periodo': Trunc('fecha', RESUMEN_PERIODOS[periodo])} if periodo is not None else {}
+    filas = list(queryset.values(*rutas, **periodos).annotate(
+        **{f'total_{total}': Sum(total) for total in RESUMEN_TOTALES}
+    ).order_by(*periodos, *rutas))
+    for fila in filas:
+        for total in RESUMEN_TOTALES:
+            fila[total] = fila.pop(f'total_{total}')
+        for dimension, ruta in zip(agrupar, rutas):
+            fila[dimension] = fila.pop(ruta)
+        fila['horas'] = round(fila['minutos'] / 60, 2)
+    return filas
+
+
+def actividades_fuera_de_rango(actividades):
+    """
+    Función que retorna las actividades cuya duración está fuera de ``tiempo_minimo``/``tiempo_maximo`` de sus
+    datos de actividad, con la duración calculada en la base de datos.
+
+    :param actividades: QuerySet de :class:`api.models.Actividad`.
+    :return: QuerySet de diccionarios ordenado por fecha y hora de inicio.
+    """
+    return actividades.annotate(
+        duracion=DuracionMinutos()
+    ).filter(
+        Q(duracion__lt=F('datos_actividad__tiempo_minimo')) | Q(duracion__gt=F('datos_actividad__tiempo_maximo'))
+    ).values(
+        'id', 'colaborador', 'fecha', 'hora_inicio', 'hora_termino', 'proyecto', 'datos_actividad', 'duracion',
+        tiempo_minimo=F('datos_actividad__tiempo_minimo'),
+        tiempo_maximo=F('datos_actividad__tiempo_maximo'),
+    ).order_by('fecha', 'hora_inicio')
@@ -0,0 +1,380 @@
+import base64
+import binascii
+import fcntl
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import timedelta
+from threading import Lock
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from PIL import Image
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotFound, PermissionDenied, ValidationError
+from rest_framework.fields import ImageField
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+
+from api import models
+from api.downloads import participant_queryset
+
+# Tamaño máximo de un archivo cargado por partes y de cada parte, en bytes
+CARGA_MAX_TAMANO = 2 * 1024 ** 3
+CARGA_MAX_PARTE = 16 * 1024 ** 2
+
+# Bytes leídos desde la solicitud por cada escritura en disco
+CARGA_BLOQUE = 64 * 1024
+
+# Directorio del almacenamiento con los archivos temporales de las cargas en curso
+CARGAS_DIR = 'files/cargas'
+
+# Tiempo sin recibir partes tras el cual una carga se considera abandonada (ver limpiar_cargas_archivos)
+CARGA_EXPIRACION = timedelta(days=1)
+
+# SHA-256 en curso por carga en este proceso: id → (bytes procesados, objeto hashlib). Es un cache acotado; si la
+# parte siguiente llega a otro proceso, el SHA-256 se calcula leyendo el archivo al completar la carga
+CARGA_DIGESTS_MAX = 256
+_digests = OrderedDict()
+_digests_lock = Lock()
+
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('La posición de la parte no coincide con los bytes recibidos.')
+    default_code = 'conflict'
+
+
+def upload_storage():
+    """
+    Función que retorna el almacenamiento de los archivos de tickets y mensajes.
+    """
+    return models.ArchivoTicket._meta.get_field('archivo').storage
+
+
+def upload_temp_path(carga):
+    """
+    Función que retorna la ruta en disco del archivo temporal de una carga. Se ubica en el mismo almacenamiento que
+    los archivos finales para enlazarlo sin copiarlo al completar la carga, por lo que requiere un almacenamiento en
+    disco local (``FileSystemStorage``).
+
+    :param carga: Objeto :class:`api.models.CargaArchivo`.
+    :return: Cadena de texto con la ruta absoluta.
+    """
+    return upload_storage().path(f'{CARGAS_DIR}/{carga.pk}.part')
+
+
+def parse_checksum(valor):
+    """
+    Función que lee el SHA-256 de una parte desde el encabezado ``Upload-Checksum`` (formato ``sha256 <base64>``,
+    igual que el protocolo tus).
+
+    :param valor: Valor del encabezado, o ``None``.
+    :return: Digest en bytes, o ``None`` si no se envió.
+    """
+    if not valor:
+        return None
+    algoritmo, _separador, digest = valor.strip().partition(' ')
+    if algoritmo.lower() != 'sha256':
+        raise ValidationError({'Upload-Checksum': [_('Solo se admite sha256.')]})
+    try:
+        digest = base64.b64decode(digest.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        digest = b''
+    if len(digest) != hashlib.sha256().digest_size:
+        raise ValidationError({'Upload-Checksum': [_('Use el formato "sha256 <base64>".')]})
+    return digest
+
+
+def running_digest(carga, offset):
+    """
+    Función que retorna el SHA-256 en curso de la carga si este proceso tiene procesados exactamente ``offset``
+    bytes, o ``None``.
+    """
+    with _digests_lock:
+        procesados, digest = _digests.get(carga.pk, (None, None))
+        return digest.copy() if procesados == offset else None
+
+
+def store_digest(carga, offset, digest):
+    with _digests_lock:
+        _digests[carga.pk] = (offset, digest)
+        _digests.move_to_end(carga.pk)
+        while len(_digests) > CARGA_DIGESTS_MAX:
+            _digests.popitem(last=False)
+
+
+def discard_digest(carga_id):
+    with _digests_lock:
+        _digests.pop(carga_id, None)
+
+
+def file_digest(path):
+    """
+    Función que calcula el SHA-256 de un archivo leyéndolo por bloques.
+
+    :param path: Ruta del archivo.
+    :return: Digest hexadecimal.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(CARGA_BLOQUE), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def start_upload(carga):
+    """
+    Función que crea el archivo temporal vacío de una carga recién creada.
+
+    :param carga: Objeto :class:`api.models.CargaArchivo` guardado.
+    """
+    path = upload_temp_path(carga)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    store_digest(carga, 0, hashlib.sha256())
+
+
+def write_chunk(carga, stream, offset, largo, checksum=None):
+    """
+    Función que escribe una parte de la carga directamente desde la solicitud al archivo temporal, por bloques de
+    :data:`CARGA_BLOQUE` y calculando su SHA-256 (y el del archivo, si este proceso tiene el anterior) a medida que
+    se escribe. Si la conexión se corta a mitad de la parte se conservan los bytes recibidos, salvo que la parte
+    traiga ``checksum``: en ese caso, igual que si no coincide, la parte se descarta completa.
+
+    Mientras se recibe la parte no hay una transacción abierta: el archivo temporal se bloquea con ``flock``, por lo
+    que solo una solicitud escribe la carga a la vez (las demás reciben ``409``), y la fila de la carga solo se lee
+    antes de escribir y se actualiza al terminar.
+
+    :param carga: Objeto :class:`api.models.CargaArchivo`; su ``recibido`` se actualiza con los bytes escritos.
+    :param stream: Objeto con ``read(n)`` con el cuerpo de la solicitud.
+    :param offset: Byte de inicio de la parte (debe ser igual a ``carga.recibido``).
+    :param largo: Largo de la parte, en bytes.
+    :param checksum: SHA-256 esperado de la parte, en bytes (opcional).
+    """
+    if largo > CARGA_MAX_PARTE or offset + largo > carga.tamano:
+        raise ValidationError({'Content-Length': [
+            _('Cada parte puede tener hasta %(parte)d bytes, sin superar el tamaño del archivo.') % {
+                'parte': CARGA_MAX_PARTE,
+            }
+        ]})
+
+    try:
+        archivo = open(upload_temp_path(carga), 'r+b')
+    except FileNotFoundError:
+        # La carga se canceló o expiró
+        raise NotFound()
+    with archivo:
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict(_('Otra parte de la carga se está recibiendo.'))
+        # Con el archivo bloqueado, recibido solo cambia en esta solicitud
+        try:
+            carga.refresh_from_db(fields=['recibido'])
+        except models.CargaArchivo.DoesNotExist:
+            raise NotFound()
+        if offset != carga.recibido:
+            raise UploadConflict()
+
+        digest_parte = hashlib.sha256()
+        digest_archivo = running_digest(carga, offset)
+        escritos = 0
+        archivo.seek(offset)
+        while escritos < largo:
+            try:
+                bloque = stream.read(min(CARGA_BLOQUE, largo - escritos))
+            except OSError:
+                # Conexión cortada por el cliente (UnreadablePostError)
+                bloque = b''
+            if not bloque:
+                break
+            archivo.write(bloque)
+            digest_parte.update(bloque)
+            if digest_archivo is not None:
+                digest_archivo.update(bloque)
+            escritos += len(bloque)
+
+        completa = escritos == largo
+        valida = checksum is None or (completa and digest_parte.digest() == checksum)
+        if not valida:
+            escritos = 0
+        archivo.truncate(offset + escritos)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+
+        if valida:
+            # Se actualiza antes de liberar el archivo; si la carga se canceló mientras tanto no hay fila
+            if not models.CargaArchivo.objects.filter(pk=carga.pk, recibido=offset).update(
+                recibido=offset + escritos, modified=timezone.now()
+            ):
+                raise NotFound()
+
+    if not valida:
+        if completa:
+            raise ValidationError({'Upload-Checksum': [_('El SHA-256 de la parte no coincide.')]})
+        return
+    if digest_archivo is not None:
+        store_digest(carga, offset + escritos, digest_archivo)
+    carga.recibido = offset + escritos
+
+
+def complete_upload(carga):
+    """
+    Función que crea el :class:`api.models.ArchivoTicket` o :class:`api.models.ArchivoMensaje` de una carga completa.
+    El archivo temporal se enlaza con el nombre de su contenido (ver :class:`api.storage.ContentAddressedStorage`),
+    sin copiarlo, y la carga se elimina. Si el SHA-256 no coincide con el declarado, o el archivo de un mensaje no es
+    una imagen, se levanta :class:`ValidationError` sin crear el archivo.
+
+    :param carga: Objeto :class:`api.models.CargaArchivo` bloqueado, con ``recibido == tamano``.
+    :return: Objeto del archivo creado.
+    """
+    path = upload_temp_path(carga)
+    digest = running_digest(carga, carga.tamano)
+    sha256 = digest.hexdigest() if digest is not None else file_digest(path)
+    if carga.sha256 and sha256 != carga.sha256:
+        raise ValidationError({'sha256': [_('El SHA-256 del archivo no coincide; la carga se descartó.')]})
+
+    if carga.mensaje_id is not None:
+        try:
+            with Image.open(path) as imagen:
+                imagen.verify()
+        except Exception:
+            raise ValidationError({'archivo': [ImageField.default_error_messages['invalid_image']]})
+        instance = models.ArchivoMensaje(mensaje_id=carga.mensaje_id)
+    else:
+        instance = models.ArchivoTicket(ticket_id=carga.ticket_id)
+
+    # Se enlaza con el nombre de su contenido; si el contenido ya existe no se escribe nada
+    nombre = instance._meta.get_field('archivo').storage.save_existing(path, sha256, carga.nombre)
+    instance.archivo.name = nombre
+    instance.save()
+    carga.delete()
+    return instance
+
+
+def discard_upload_file(sender, instance, **kwargs):
+    """
+    Receptor de ``post_delete`` de :class:`api.models.CargaArchivo` que elimina su archivo temporal (cargas
+    completadas, canceladas, expiradas o de tickets eliminados).
+    """
+    discard_digest(instance.pk)
+    path = upload_temp_path(instance)
+
+    def remove():
+        if os.path.exists(path):
+            os.remove(path)
+    transaction.on_commit(remove)
+
+
+def purge_expired_uploads(ahora=None):
+    """
+    Función que elimina las cargas sin partes recibidas durante :data:`CARGA_EXPIRACION`.
+
+    :return: Cantidad de cargas eliminadas.
+    """
+    limite = (ahora or timezone.now()) - CARGA_EXPIRACION
+    eliminadas = 0
+    for carga in models.CargaArchivo.objects.filter(modified__lt=limite).iterator():
+        carga.delete()
+        eliminadas += 1
+    return eliminadas
+
+
+class ChunkedUploadMixin:
+    """
+    La clase ChunkedUploadMixin es un *mixin* para los ViewSets de archivos de tickets y mensajes que agrega la carga
+    por partes reanudable (similar al protocolo tus), sin mantener el archivo completo en memoria. Solo se puede
+    cargar a tickets en que participa el usuario (ver :func:`api.downloads.participant_queryset`), y cada carga solo
+    la puede consultar, continuar o cancelar el usuario que la inició:
+
+    - ``POST cargas/`` con ``{"<destino>": id, "nombre": ..., "tamano": ..., "sha256": ...}`` inicia la carga.
+    - ``PATCH cargas/<id>/`` con el contenido de la parte como cuerpo y los encabezados ``Upload-Offset`` (byte de
+      inicio, igual a ``recibido``) y opcionalmente ``Upload-Checksum: sha256 <base64>``. La última parte responde
+      ``201`` con el archivo creado.
+    - ``GET``/``HEAD cargas/<id>/`` retorna ``recibido`` (y el encabezado ``Upload-Offset``) para reanudar.
+    - ``DELETE cargas/<id>/`` cancela la carga.
+
+    Ejemplo:
+    ::
+        PATCH /api/ticket/archivos-ticket/cargas/6f1c.../
+        Upload-Offset: 16777216
+        Content-Type: application/offset+octet-stream
+    """
+    # Campo del modelo de archivo con el ticket o mensaje al que pertenece, y ruta desde él al ticket
+    upload_destino = 'ticket'
+    upload_ticket_path = 'ticket'
+
+    def upload_queryset(self, request):
+        cargas = models.CargaArchivo.objects.filter(
+            **{f'{self.upload_destino}__isnull': False}, usuario_id=request.user.pk
+        )
+        return participant_queryset(cargas, request.user, self.upload_ticket_path)
+
+    def upload_response(self, carga, status_code=status.HTTP_200_OK):
+        # Importación local para evitar la dependencia circular con api.serializers
+        from api.serializers import CargaArchivoSerializer
+
+        response = Response(CargaArchivoSerializer(carga).data, status=status_code)
+        response['Upload-Offset'] = str(carga.recibido)
+        response['Upload-Length'] = str(carga.tamano)
+        return response
+
+    @action(detail=False, methods=['post'], url_path='cargas', parser_classes=[JSONParser])
+    def cargas(self, request):
+        from api.serializers import CargaArchivoSerializer
+
+        serializer = CargaArchivoSerializer(data=request.data, context={'destino': self.upload_destino})
+        serializer.is_valid(raise_exception=True)
+        destino = serializer.validated_data[self.upload_destino]
+        ticket_id = destino.pk if self.upload_destino == 'ticket' else destino.ticket_id
+        if not participant_queryset(models.Ticket.objects.filter(pk=ticket_id), request.user).exists():
+            raise PermissionDenied()
+        carga = serializer.save(usuario_id=request.user.pk)
+        start_upload(carga)
+        return self.upload_response(carga, status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get', 'head', 'patch', 'delete'],
+            url_path=r'cargas/(?P<carga_id>[0-9a-f-]{36})')
+    def carga(self, request, carga_id=None):
+        cargas = self.upload_queryset(request)
+        carga = cargas.filter(pk=carga_id).first()
+        if carga is None:
+            raise NotFound()
+        if request.method in ('GET', 'HEAD'):
+            return self.upload_response(carga)
+        if request.method == 'DELETE':
+            carga.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            largo = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            raise ValidationError({'Upload-Offset': [_('Se requieren Upload-Offset y Content-Length.')]})
+        checksum = parse_checksum(request.headers.get('Upload-Checksum'))
+        # El cuerpo se lee como flujo, sin pasar por los parsers de DRF ni mantener una transacción abierta
+        write_chunk(carga, request.stream, offset, largo, checksum)
+        if carga.recibido < carga.tamano:
+            return self.upload_response(carga)
+
+        with transaction.atomic():
+            carga = cargas.select_for_update().filter(pk=carga_id, recibido=F('tamano')).first()
+            if carga is None:
+                # Otra solicitud completó o canceló la carga
+                raise NotFound()
+            try:
+                instance = complete_upload(carga)
+            except ValidationError as error:
+                # La carga completa no es válida: se descarta para que se reinicie
+                carga.delete()
+                return Response(error.detail, status=status.HTTP_400_BAD_REQUEST)
+        response = Response(
+            self.get_serializer_class()(instance, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+        response['Upload-Offset'] = str(carga.tamano)
+        return response
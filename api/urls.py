@@ -62,7 +62,9 @@ router.register(r'ticket/mensajes', views.MensajeViewSet)
 router.register(r'ticket/archivos-mensaje', views.ArchivoMensajeViewSet)
 router.register(r'ticket/etiquetas', views.EtiquetaViewSet)
 router.register(r'ticket/origenes', views.OrigenViewSet)
+router.register(r'ticket/metricas', views.MetricaTicketViewSet, basename='metrica-ticket')
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path('catalogos/', views.CatalogosView.as_view(), name='catalogos'),
 ]
@@ -1,56 +1,111 @@
-from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from functools import lru_cache
+
+from django.template.loader import get_template
 from django.urls import reverse
 
+from api.outbox import encolar_correos
 
-class Utils:
-    def __init__(self, request):
-        self.current_site = get_current_site(request)
+# Plantillas de correo del sistema (directorio ``templates/emails``)
+EMAIL_TEMPLATES = [
+    'emails/confirm-registration.html',
+    'emails/reset-password.html',
+]
+
+
+@lru_cache(maxsize=None)
+def get_email_template(template_name):
+    """
+    Función que carga y compila una plantilla de correo una sola vez por proceso, evitando la búsqueda y compilación
+    de :func:`django.template.loader.render_to_string` en cada envío.
+
+    :param template_name: Ruta de la plantilla (por ejemplo ``'emails/reset-password.html'``).
+    :return: Plantilla compilada.
+    """
+    return get_template(template_name)
+
+
+def preload_email_templates():
+    """
+    Función que compila por adelantado todas las plantillas de :data:`EMAIL_TEMPLATES`, para que el primer envío no
+    pague el costo de carga.
+    """
+    for template_name in EMAIL_TEMPLATES:
+        get_email_template(template_name)
 
+
+def render_emails(template_name, contexts):
+    """
+    Función que renderiza en lote una plantilla de correo para varios destinatarios.
+
+    :param template_name: Ruta de la plantilla.
+    :param contexts: Lista de diccionarios de contexto, uno por destinatario.
+    :return: Lista con el HTML renderizado para cada contexto.
+    """
+    template = get_email_template(template_name)
+    return [template.render(context) for context in contexts]
+
+
+class Utils:
     @staticmethod
-    def validate_email_registration(subject, token, is_secure=False):
-        send_mail(
-            subject='Confirmación de correo electrónico',
-            message='Si no logra ver este correo, contacte con algún administrador.',
-            from_email=None,
-            recipient_list=[subject],
-            html_message=render_to_string('emails/confirm-registration.html', context={
-                'link_to_confirm': 'http{secure}://{domain}{path}?token={token}'.format(
-                    secure='s' if is_secure else '',
-                    # domain=self.current_site.domain,
-                    domain='localhost:4200',
-                    # Cambiar path al de la vista
-                    path=reverse('auth-email-verify'),
-                    token=token
-                )
-            })
+    def confirmation_link(token, is_secure=False):
+        return 'http{secure}://{domain}{path}?token={token}'.format(
+            secure='s' if is_secure else '',
+            # domain=self.current_site.domain,
+            domain='localhost:4200',
+            # Cambiar path al de la vista
+            path=reverse('auth-email-verify'),
+            token=token
         )
 
     @staticmethod
-    def reset_password(subject, uidb64, token, name, is_secure=False):
-        print('{protocol}://{domain}/{path}?uidb64={uidb64}&token={token}'.format(
+    def reset_password_link(uidb64, token, is_secure=False):
+        return '{protocol}://{domain}/{path}?uidb64={uidb64}&token={token}'.format(
             protocol='https' if is_secure else 'http',
+            # domain=self.current_site.domain,
             domain='localhost:4200',
+            # Cambiar path al de la vista
             path='new-password',
             uidb64=uidb64,
             token=token
-        ))
-        send_mail(
-            subject='Reinicio de contraseña',
-            message='Si no logra ver este correo, contacte con algún administrador.',
-            from_email=None,
-            recipient_list=[subject],
-            html_message=render_to_string('emails/reset-password.html', context={
-                'link_to_confirm': '{protocol}://{domain}/{path}?uidb64={uidb64}&token={token}'.format(
-                    protocol='https' if is_secure else 'http',
-                    # domain=self.current_site.domain,
-                    domain='localhost:4200',
-                    # Cambiar path al de la vista
-                    path='new-password',
-                    uidb64=uidb64,
-                    token=token
-                ),
-                'name': f' {name}' if name else ""
-            })
         )
+
+    @staticmethod
+    def validate_email_registration(subject, token, is_secure=False):
+        Utils.validate_email_registration_batch([(subject, token)], is_secure)
+
+    @staticmethod
+    def validate_email_registration_batch(destinatarios, is_secure=False):
+        """
+        Función que registra en la bandeja de salida los correos de confirmación para varios destinatarios,
+        renderizando la plantilla compilada una vez y guardando los correos con una sola inserción.
+
+        :param destinatarios: Lista de tuplas ``(email, token)``.
+        :param is_secure: Indica si el link de confirmación usa https.
+        :return: Lista de :class:`api.models.CorreoSaliente` creados.
+        """
+        destinatarios = list(destinatarios)
+        html_messages = render_emails('emails/confirm-registration.html', [
+            {'link_to_confirm': Utils.confirmation_link(token, is_secure)} for _email, token in destinatarios
+        ])
+        return encolar_correos([
+            {
+                'subject': 'Confirmación de correo electrónico',
+                'message': 'Si no logra ver este correo, contacte con algún administrador.',
+                'recipient_list': [email],
+                'html_message': html_message,
+            }
+            for (email, _token), html_message in zip(destinatarios, html_messages)
+        ])
+
+    @staticmethod
+    def reset_password(subject, uidb64, token, name, is_secure=False):
+        html_message, = render_emails('emails/reset-password.html', [{
+            'link_to_confirm': Utils.reset_password_link(uidb64, token, is_secure),
+            'name': f' {name}' if name else ""
+        }])
+        encolar_correos([{
+            'subject': 'Reinicio de contraseña',
+            'message': 'Si no logra ver este correo, contacte con algún administrador.',
+            'recipient_list': [subject],
+            'html_message': html_message,
+        }])
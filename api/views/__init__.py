@@ -4,4 +4,5 @@ from api.views.contrato import *
 from api.views.formacion import *
 from api.views.organizacion import *
 from api.views.ticket import *
+from api.views.catalogo import *
 from api.views.auth import *
@@ -1,38 +1,84 @@
+from contextlib import contextmanager
+
+from django.db import transaction
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from api import serializers, models
+from api.bulk import BulkMixin
+from api.catalogs import CatalogCacheMixin
+from api.eager_loading import EagerLoadingMixin
+from api.export import ExportMixin
+from api.fast_read import FastReadMixin
+from api.pagination import CreatedCursorPagination
+from api.search import parse_limit
+from api.timesheets import (FUERA_DE_RANGO_LIMIT, FUERA_DE_RANGO_MAX_LIMIT, actividades_fuera_de_rango,
+                            deferred_resumen, filter_dimensions, timesheet_report)
 
 
-class ActividadViewSet(viewsets.ModelViewSet):
+class ActividadViewSet(BulkMixin, ExportMixin, FastReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ActividadSerializer
     queryset = models.Actividad.objects.all()
+    pagination_class = CreatedCursorPagination
+
+    @contextmanager
+    def bulk_transaction(self):
+        # El resumen de horas se recalcula una vez por lote y no por cada actividad
+        with transaction.atomic(), deferred_resumen():
+            yield
+
+    @action(detail=False, methods=['get'], url_path='resumen')
+    def resumen(self, request):
+        """
+        Reporte de horas desde la tabla de resumen (``?agrupar=colaborador,proyecto&periodo=semana&desde=&hasta=``),
+        con filtros por id de ``colaborador``, ``proyecto``, ``cliente``, ``datos_actividad`` y ``cargo``.
+        """
+        parametros = serializers.ResumenActividadParametrosSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        return Response(timesheet_report(**parametros.validated_data))
+
+    @action(detail=False, methods=['get'], url_path='fuera-de-rango')
+    def fuera_de_rango(self, request):
+        """
+        Actividades cuya duración está fuera de ``tiempo_minimo``/``tiempo_maximo`` de sus datos de actividad, con los
+        mismos filtros del reporte de horas y ``?limit=<n>``.
+        """
+        parametros = serializers.ResumenActividadParametrosSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        filtros = dict(parametros.validated_data)
+        filtros.pop('agrupar')
+        filtros.pop('periodo', None)
+        limit = parse_limit(request.query_params.get('limit'), FUERA_DE_RANGO_LIMIT, FUERA_DE_RANGO_MAX_LIMIT)
+        actividades = filter_dimensions(models.Actividad.objects.all(), **filtros)
+        return Response(list(actividades_fuera_de_rango(actividades)[:limit]))
 
 
-class DatosActividadViewSet(viewsets.ModelViewSet):
+class DatosActividadViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.DatosActividadSerializer
     queryset = models.DatosActividad.objects.all()
 
 
-class ProyectoViewSet(viewsets.ModelViewSet):
+class ProyectoViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ProyectoSerializer
     queryset = models.Proyecto.objects.all()
 
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ClienteSerializer
     queryset = models.Cliente.objects.all()
 
 
-class MesaAyudaViewSet(viewsets.ModelViewSet):
+class MesaAyudaViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.MesaAyudaSerializer
     queryset = models.MesaAyuda.objects.all()
 
 
-class TipoSoporteViewSet(viewsets.ModelViewSet):
+class TipoSoporteViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoSoporteSerializer
     queryset = models.TipoSoporte.objects.all()
 
 
-class ModuloViewSet(viewsets.ModelViewSet):
+class ModuloViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ModuloSerializer
     queryset = models.Modulo.objects.all()
@@ -12,6 +12,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenViewBase
 
 from api import serializers
+from api.authentication import FULL_USER_AUTHENTICATION_CLASSES
 from api.utils import Utils
 from users.models import CustomUser
 
@@ -19,7 +20,7 @@ from users.models import CustomUser
 def send_validation_email(email, request):
     saved_user = CustomUser.objects.get(email=email)
     token = RefreshToken.for_user(saved_user)
-    Utils(request).validate_email_registration(saved_user.email, token)
+    Utils.validate_email_registration(saved_user.email, token)
 
 
 class RegisterView(generics.GenericAPIView):
@@ -56,6 +57,8 @@ class FullRegisterView(generics.GenericAPIView):
 
 
 class ChangePasswordView(generics.UpdateAPIView):
+    # La validación de la contraseña antigua necesita el usuario completo
+    authentication_classes = FULL_USER_AUTHENTICATION_CLASSES
     queryset = CustomUser.objects.all()
     serializer_class = serializers.ChangePasswordSerializer
 
@@ -82,7 +85,7 @@ class ResendEmailConfirmationView(generics.GenericAPIView):
             serializer.is_valid(raise_exception=True)
             user = CustomUser.objects.get(email=request.data['email'])
             token = RefreshToken.for_user(user)
-            Utils(request).validate_email_registration(user.email, token)
+            Utils.validate_email_registration(user.email, token)
             return Response(
                 {'message': _('Nueva validación de correo enviada correctamente')},
                 status=status.HTTP_202_ACCEPTED
@@ -106,7 +109,7 @@ class ResetPasswordRequestView(generics.GenericAPIView):
             uidb64 = urlsafe_base64_encode(smart_bytes(user.id))
             token = PasswordResetTokenGenerator().make_token(user)
             name = user.colaborador.nombre if hasattr(user, 'colaborador') else ''
-            Utils(request).reset_password(user.email, uidb64, token, name)
+            Utils.reset_password(user.email, uidb64, token, name)
             return Response(
                 {'message': _('Email con instrucciones de cambio de contraseña enviado correctamente')},
                 status=status.HTTP_202_ACCEPTED
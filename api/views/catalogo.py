@@ -0,0 +1,36 @@
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from rest_framework.views import APIView
+
+from api import serializers
+from api.catalogs import CATALOG_MODELS, catalog_cache, snapshot_response
+from api.eager_loading import plan_queryset
+
+
+def build_catalogos():
+    """
+    Función que serializa todos los catálogos de :data:`api.catalogs.CATALOG_MODELS` con el serializador de cada
+    modelo (por convención ``<Modelo>Serializer``).
+
+    :return: Diccionario con el nombre del modelo como llave y la lista serializada como valor.
+    """
+    catalogos = {}
+    for catalog_model in CATALOG_MODELS:
+        serializer_class = getattr(serializers, f'{catalog_model.__name__}Serializer')
+        queryset = plan_queryset(catalog_model.objects.order_by('pk'), serializer_class)
+        catalogos[catalog_model._meta.model_name] = list(serializer_class(queryset, many=True).data)
+    return catalogos
+
+
+@method_decorator(gzip_page, name='dispatch')
+class CatalogosView(APIView):
+    """
+    Vista que retorna todos los catálogos del sistema en una sola respuesta comprimida. La respuesta incluye el hash
+    del contenido en ``version`` y en la cabecera ``ETag``; el cliente puede guardarla y revalidarla con
+    ``If-None-Match`` (respuesta ``304 Not Modified`` mientras no cambie ningún catálogo).
+    """
+
+    @staticmethod
+    def get(request):
+        snapshot = catalog_cache.get('catalogos', build_catalogos)
+        return snapshot_response(request, snapshot.etag, {'version': snapshot.digest, 'catalogos': snapshot.data})
@@ -1,67 +1,86 @@
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from api import serializers, models
+from api.catalogs import CatalogCacheMixin
+from api.eager_loading import EagerLoadingMixin
+from api.export import ExportMixin
+from api.pagination import IdCursorPagination
+from api.search import TYPEAHEAD_LIMIT, TYPEAHEAD_MAX_LIMIT, parse_limit, typeahead_colaboradores
 
 
-class ColaboradorViewSet(viewsets.ModelViewSet):
+class ColaboradorViewSet(ExportMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ColaboradorSerializer
     queryset = models.Colaborador.objects.all()
-
-
-class SexoViewSet(viewsets.ModelViewSet):
+    pagination_class = IdCursorPagination
+
+    @action(detail=False, methods=['get'], url_path='autocompletar')
+    def autocompletar(self, request):
+        """
+        Sugerencias de colaboradores por nombre, apellidos o RUN (``?q=<texto>&limit=<n>``), con solo ``id``,
+        ``full_name`` y ``run``.
+        """
+        texto = request.query_params.get('q', '').strip()
+        if not texto:
+            return Response([])
+        limit = parse_limit(request.query_params.get('limit'), TYPEAHEAD_LIMIT, TYPEAHEAD_MAX_LIMIT)
+        return Response(typeahead_colaboradores(texto, limit))
+
+
+class SexoViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.SexoSerializer
     queryset = models.Sexo.objects.all()
 
 
-class EstadoCivilViewSet(viewsets.ModelViewSet):
+class EstadoCivilViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.EstadoCivilSerializer
     queryset = models.EstadoCivil.objects.all()
 
 
-class NacionalidadViewSet(viewsets.ModelViewSet):
+class NacionalidadViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.NacionalidadSerializer
     queryset = models.Nacionalidad.objects.all()
 
 
-class ComunaViewSet(viewsets.ModelViewSet):
+class ComunaViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ComunaSerializer
     queryset = models.Comuna.objects.all()
 
 
-class ProvinciaViewSet(viewsets.ModelViewSet):
+class ProvinciaViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ProvinciaSerializer
     queryset = models.Provincia.objects.all()
 
 
-class RegionViewSet(viewsets.ModelViewSet):
+class RegionViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.RegionSerializer
     queryset = models.Region.objects.all()
 
 
-class HijoViewSet(viewsets.ModelViewSet):
+class HijoViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.HijoSerializer
     queryset = models.Hijo.objects.all()
 
 
-class PersonaContactoViewSet(viewsets.ModelViewSet):
+class PersonaContactoViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.PersonaContactoSerializer
     queryset = models.PersonaContacto.objects.all()
 
 
-class ColaboradorSkillViewSet(viewsets.ModelViewSet):
+class ColaboradorSkillViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ColaboradorSkillSerializer
     queryset = models.ColaboradorSkill.objects.all()
 
 
-class SkillViewSet(viewsets.ModelViewSet):
+class SkillViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.SkillSerializer
     queryset = models.Skill.objects.all()
 
 
-class NivelSkillViewSet(viewsets.ModelViewSet):
+class NivelSkillViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.NivelSkillSerializer
     queryset = models.NivelSkill.objects.all()
@@ -1,33 +1,35 @@
 from rest_framework import viewsets
 
 from api import serializers, models
+from api.catalogs import CatalogCacheMixin
+from api.eager_loading import EagerLoadingMixin
 
 
-class DatosContractualesViewSet(viewsets.ModelViewSet):
+class DatosContractualesViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.DatosContractualesSerializer
     queryset = models.DatosContractuales.objects.all()
 
 
-class TipoContratoViewSet(viewsets.ModelViewSet):
+class TipoContratoViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoContratoSerializer
     queryset = models.TipoContrato.objects.all()
 
 
-class PrevisionAfpViewSet(viewsets.ModelViewSet):
+class PrevisionAfpViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.PrevisionAfpSerializer
     queryset = models.PrevisionAfp.objects.all()
 
 
-class PrevisionSaludViewSet(viewsets.ModelViewSet):
+class PrevisionSaludViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.PrevisionSaludSerializer
     queryset = models.PrevisionSalud.objects.all()
 
 
-class BancoViewSet(viewsets.ModelViewSet):
+class BancoViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.BancoSerializer
     queryset = models.Banco.objects.all()
 
 
-class TipoCuentaViewSet(viewsets.ModelViewSet):
+class TipoCuentaViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoCuentaSerializer
     queryset = models.TipoCuenta.objects.all()
\ No newline at end of file
@@ -1,48 +1,50 @@
 from rest_framework import viewsets
 
 from api import serializers, models
+from api.catalogs import CatalogCacheMixin
+from api.eager_loading import EagerLoadingMixin
 
 
-class DatosFormacionViewSet(viewsets.ModelViewSet):
+class DatosFormacionViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.DatosFormacionSerializer
     queryset = models.DatosFormacion.objects.all()
 
 
-class TipoFormacionViewSet(viewsets.ModelViewSet):
+class TipoFormacionViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoFormacionSerializer
     queryset = models.TipoFormacion.objects.all()
 
 
-class CarreraViewSet(viewsets.ModelViewSet):
+class CarreraViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.CarreraSerializer
     queryset = models.Carrera.objects.all()
 
 
-class EstadoFormacionViewSet(viewsets.ModelViewSet):
+class EstadoFormacionViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.EstadoFormacionSerializer
     queryset = models.EstadoFormacion.objects.all()
 
 
-class InstitucionViewSet(viewsets.ModelViewSet):
+class InstitucionViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.InstitucionSerializer
     queryset = models.Institucion.objects.all()
 
 
-class TipoInstitucionViewSet(viewsets.ModelViewSet):
+class TipoInstitucionViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoInstitucionSerializer
     queryset = models.TipoInstitucion.objects.all()
 
 
-class OtroFormacionViewSet(viewsets.ModelViewSet):
+class OtroFormacionViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.OtroFormacionSerializer
     queryset = models.OtroFormacion.objects.all()
 
 
-class TipoOtroFormacionViewSet(viewsets.ModelViewSet):
+class TipoOtroFormacionViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoOtroFormacionSerializer
     queryset = models.TipoOtroFormacion.objects.all()
 
 
-class DiplomaViewSet(viewsets.ModelViewSet):
+class DiplomaViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.DiplomaSerializer
     queryset = models.Diploma.objects.all()
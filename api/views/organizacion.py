@@ -1,33 +1,35 @@
 from rest_framework import viewsets
 
 from api import serializers, models
+from api.catalogs import CatalogCacheMixin
+from api.eager_loading import EagerLoadingMixin
 
 
-class DatosOrganizacionalesViewSet(viewsets.ModelViewSet):
+class DatosOrganizacionalesViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.DatosOrganizacionalesSerializer
     queryset = models.DatosOrganizacionales.objects.all()
 
 
-class CargoViewSet(viewsets.ModelViewSet):
+class CargoViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.CargoSerializer
     queryset = models.Cargo.objects.all()
 
 
-class UnidadViewSet(viewsets.ModelViewSet):
+class UnidadViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.UnidadSerializer
     queryset = models.Unidad.objects.all()
 
 
-class AreaFuncionalViewSet(viewsets.ModelViewSet):
+class AreaFuncionalViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.AreaFuncionalSerializer
     queryset = models.AreaFuncional.objects.all()
 
 
-class NivelResponsabilidadViewSet(viewsets.ModelViewSet):
+class NivelResponsabilidadViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.NivelResponsabilidadSerializer
     queryset = models.NivelResponsabilidad.objects.all()
 
 
-class CentroCostoViewSet(viewsets.ModelViewSet):
+class CentroCostoViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.CentroCostoSerializer
     queryset = models.CentroCosto.objects.all()
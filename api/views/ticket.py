@@ -1,49 +1,105 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 
 from api import serializers, models
-
-
-class TicketViewSet(viewsets.ModelViewSet):
+from api.catalogs import CatalogCacheMixin
+from api.downloads import AttachmentDownloadMixin
+from api.eager_loading import EagerLoadingMixin
+from api.export import ExportMixin
+from api.fast_read import FastReadMixin
+from api.pagination import CreatedCursorPagination, FechaModificacionCursorPagination
+from api.search import SearchMixin, search_mensajes, search_tickets
+from api.thumbnails import ThumbnailMixin
+from api.ticket_history import TicketHistoryMixin
+from api.ticket_metrics import ticket_backlog, ticket_flow_report
+from api.ticket_stages import stage_time_report, ticket_stage_times
+from api.uploads import ChunkedUploadMixin
+
+
+class TicketViewSet(TicketHistoryMixin, ExportMixin, SearchMixin, FastReadMixin, EagerLoadingMixin,
+                    viewsets.ModelViewSet):
     serializer_class = serializers.TicketSerializer
-    queryset = models.Ticket.objects.all()
-
-
-class TicketLogViewSet(viewsets.ModelViewSet):
+    queryset = models.Ticket.objects.defer('search_vector')
+    pagination_class = CreatedCursorPagination
+    search_function = staticmethod(search_tickets)
+    search_serializer_class = serializers.TicketSearchSerializer
+
+    @action(detail=True, methods=['get'], url_path='etapas')
+    def etapas(self, request, pk=None):
+        """
+        Tiempo del ticket en cada etapa, comparado con los tiempos de su dificultad.
+        """
+        tiempos = ticket_stage_times(self.get_queryset().filter(pk=pk))
+        if not tiempos:
+            raise NotFound()
+        return Response(next(iter(tiempos.values())))
+
+    @action(detail=False, methods=['get'], url_path='tiempos-en-etapa')
+    def tiempos_en_etapa(self, request):
+        """
+        Tiempo en etapa de los tickets agrupado por ``?agrupar=etapa_ticket,prioridad,area_ticket``, para los
+        tickets creados entre ``?desde=`` y ``?hasta=`` (por defecto los últimos 30 días; ver
+        :class:`api.serializers.TiempoEtapaParametrosSerializer`) y filtros por id de cada dimensión.
+        """
+        parametros = serializers.TiempoEtapaParametrosSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        filtros = parametros.validated_data
+        tickets = self.get_queryset().filter(
+            created__date__gte=filtros['desde'], created__date__lte=filtros['hasta']
+        )
+        if filtros.get('prioridad') is not None:
+            tickets = tickets.filter(prioridad=filtros['prioridad'])
+        if filtros.get('area_ticket') is not None:
+            tickets = tickets.filter(dificultad_ticket__area_ticket=filtros['area_ticket'])
+        return Response(stage_time_report(tickets, filtros['agrupar'], filtros.get('etapa_ticket')))
+
+
+class TicketLogViewSet(ExportMixin, FastReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TicketLogSerializer
     queryset = models.TicketLog.objects.all()
+    pagination_class = FechaModificacionCursorPagination
+    # El historial es de solo inserción
+    http_method_names = ['get', 'post', 'head', 'options']
+    filterset_fields = {
+        'ticket': ['exact'],
+        'responsable': ['exact'],
+        'fecha_modificacion': ['gte', 'lt'],
+    }
 
 
-class PrioridadViewSet(viewsets.ModelViewSet):
+class PrioridadViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.PrioridadSerializer
     queryset = models.Prioridad.objects.all()
 
 
-class TipoTicketViewSet(viewsets.ModelViewSet):
+class TipoTicketViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TipoTicketSerializer
     queryset = models.TipoTicket.objects.all()
 
 
-class EtapaTicketViewSet(viewsets.ModelViewSet):
+class EtapaTicketViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.EtapaTicketSerializer
     queryset = models.EtapaTicket.objects.all()
 
 
-class AreaTicketViewSet(viewsets.ModelViewSet):
+class AreaTicketViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.AreaTicketSerializer
     queryset = models.AreaTicket.objects.all()
 
 
-class DificultadTicketViewSet(viewsets.ModelViewSet):
+class DificultadTicketViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.DificultadTicketSerializer
     queryset = models.DificultadTicket.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['area_ticket']
 
 
-class ArchivoTicketViewSet(viewsets.ModelViewSet):
+class ArchivoTicketViewSet(AttachmentDownloadMixin, ChunkedUploadMixin, EagerLoadingMixin,
+                         viewsets.ModelViewSet):
     serializer_class = serializers.ArchivoTicketSerializer
     queryset = models.ArchivoTicket.objects.all()
     parser_classes = [MultiPartParser, FormParser]
@@ -55,12 +111,16 @@ class ArchivoTicketViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class MensajeViewSet(viewsets.ModelViewSet):
+class MensajeViewSet(SearchMixin, FastReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.MensajeSerializer
-    queryset = models.Mensaje.objects.all()
+    queryset = models.Mensaje.objects.defer('search_vector')
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['ticket']
     ordering_fields = ['created']
+    ordering = ['-created']
+    pagination_class = CreatedCursorPagination
+    search_function = staticmethod(search_mensajes)
+    search_serializer_class = serializers.MensajeSearchSerializer
 
     def create(self, request, *args, **kwargs):
         data = request.data
@@ -75,16 +135,44 @@ class MensajeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ArchivoMensajeViewSet(viewsets.ModelViewSet):
+class ArchivoMensajeViewSet(ThumbnailMixin, ChunkedUploadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.ArchivoMensajeSerializer
     queryset = models.ArchivoMensaje.objects.all()
+    upload_destino = 'mensaje'
+    upload_ticket_path = 'mensaje__ticket'
+    download_ticket_path = 'mensaje__ticket'
 
 
-class EtiquetaViewSet(viewsets.ModelViewSet):
+class EtiquetaViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.EtiquetaSerializer
     queryset = models.Etiqueta.objects.all()
 
 
-class OrigenViewSet(viewsets.ModelViewSet):
+class OrigenViewSet(CatalogCacheMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = serializers.OrigenSerializer
     queryset = models.Origen.objects.all()
+
+
+class MetricaTicketViewSet(viewsets.ViewSet):
+    """
+    Métricas de tickets desde los contadores de :class:`api.models.MetricaTicket`, con costo proporcional a la
+    cantidad de grupos consultados (``?agrupar=etapa_ticket,prioridad,area_ticket&periodo=&desde=&hasta=`` y filtros
+    por id de cada dimensión).
+    """
+
+    def list(self, request):
+        parametros = serializers.MetricaTicketParametrosSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        return Response(ticket_flow_report(**parametros.validated_data))
+
+    @action(detail=False, methods=['get'], url_path='backlog')
+    def backlog(self, request):
+        """
+        Tickets abiertos por grupo al final del día ``?hasta=`` (por defecto hoy).
+        """
+        parametros = serializers.MetricaTicketParametrosSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        filtros = dict(parametros.validated_data)
+        filtros.pop('periodo', None)
+        filtros.pop('desde', None)
+        return Response(ticket_backlog(filtros.pop('agrupar'), filtros.pop('hasta', None), **filtros))
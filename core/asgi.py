@@ -4,4 +4,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importación posterior a la configuración de Django, ya que carga los modelos
+from api.realtime import realtime_application  # noqa: E402
+
+# Canales WebSocket/SSE de eventos por ticket (ver api.realtime); el resto lo atiende Django
+application = realtime_application(django_application)
@@ -77,6 +77,12 @@ DATABASES = {
     }
 }
 
+# Cache (variable opcional CACHE_URL; en producción usar un cache compartido entre procesos, ej. memcache://). Las
+# invalidaciones que deben llegar a todos los procesos no dependen de él (ver api.models.VersionCatalogos)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -112,12 +118,28 @@ FIXTURE_DIRS = [
     os.path.join(BASE_DIR, 'fixtures')
 ]
 
+# Descarga de archivos de tickets y mensajes (ver api.downloads): 'django' (FileResponse con rangos), 'nginx'
+# (X-Accel-Redirect a la ubicación interna ARCHIVOS_DESCARGA_PREFIJO) o 'sendfile' (X-Sendfile de Apache/lighttpd)
+ARCHIVOS_DESCARGA = env('ARCHIVOS_DESCARGA', default='django')
+ARCHIVOS_DESCARGA_PREFIJO = env('ARCHIVOS_DESCARGA_PREFIJO', default='/archivos-protegidos/')
+
+# Broker de los eventos en tiempo real por ticket (ver api.realtime): 'api.realtime.InProcessBroker' para un único
+# proceso ASGI o 'api.realtime.PostgresBroker' (NOTIFY/LISTEN) con varios procesos o con la API bajo WSGI
+TIEMPO_REAL_BROKER = env('TIEMPO_REAL_BROKER', default='api.realtime.InProcessBroker')
+
 # Django REST Framework configurations
+# Autenticación JWT sin consulta del usuario por solicitud (ver api.authentication.StatelessJWTAuthentication)
+STATELESS_JWT_AUTH = env.bool('STATELESS_JWT_AUTH', default=False)
+STATELESS_JWT_REVOCATION_TTL = env.int('STATELESS_JWT_REVOCATION_TTL', default=30)
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.StatelessJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ] if STATELESS_JWT_AUTH else [
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -131,7 +153,7 @@ SIMPLE_JWT = {
 }
 
 # Email Backend
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = env('EMAIL_HOST')
 EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')